@@ -43,17 +43,16 @@ class User(AbstractUser):
 
     @property
     def active_company(self):
-        membership = self.company_memberships.filter(is_default=True).first()
-        return membership.company if membership else None
+        from core.tenancy import resolve_tenant
+        return resolve_tenant(self).company
 
     def has_module_permission(self, module, action):
-        membership = self.company_memberships.filter(company=self.active_company).first()
-        if not membership:
-            return False
-        if membership.is_owner:
-            return True
-        return membership.role.role_permissions.filter(permission__code=f"{module}.{action}").exists()
+        from .services.rbac import get_permissions
+        return get_permissions(self).allows(module, action)
 
+    def get_module_actions(self, module):
+        from .services.rbac import get_permissions
+        return get_permissions(self).module_actions(module)
 
 class Role(TimeStampedModel):
     company = models.ForeignKey('organization.Company', on_delete=models.CASCADE, related_name='roles')
@@ -0,0 +1,121 @@
+"""
+Compiled RBAC permission sets.
+
+A user's permission codes in a company are compiled once from
+Role/RolePermission/Permission and kept in a per-process LRU backed by the
+shared Django cache. Cache keys carry a per-company version which the signals
+in ``apps.accounts.signals`` bump whenever roles, role permissions or
+memberships change, so stale sets are never read after a change.
+"""
+import time
+from django.conf import settings
+from django.core.cache import cache
+from core.cache import LRUCache
+
+ACTIONS = ('view', 'create', 'edit', 'delete')
+GLOBAL_VERSION_KEY = 'rbac:version'
+
+
+class CompiledPermissions:
+    """Immutable set of ``module.action`` codes; owners are allowed everything."""
+
+    def __init__(self, codes=(), is_owner=False):
+        self.codes = frozenset(codes)
+        self.is_owner = is_owner
+
+    def allows(self, module, action):
+        return self.is_owner or f'{module}.{action}' in self.codes
+
+    def module_actions(self, module):
+        if self.is_owner:
+            return set(ACTIONS)
+        prefix = f'{module}.'
+        return {code[len(prefix):] for code in self.codes if code.startswith(prefix)}
+
+    def to_cache(self):
+        return {'codes': sorted(self.codes), 'is_owner': self.is_owner}
+
+    @classmethod
+    def from_cache(cls, data):
+        return cls(data['codes'], data['is_owner'])
+
+
+NO_PERMISSIONS = CompiledPermissions()
+
+
+_local_cache = LRUCache(getattr(settings, 'RBAC_LOCAL_CACHE_SIZE', 1024))
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Seed with a timestamp so a flushed cache never reuses an old version
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), None)
+
+
+def _company_version_key(company_id):
+    return f'rbac:version:{company_id}'
+
+
+def compile_permissions(user_id, company_id):
+    """Build the permission set straight from the database."""
+    from apps.accounts.models import UserCompany, Permission
+
+    membership = UserCompany.objects.filter(user_id=user_id, company_id=company_id).values('is_owner', 'role_id').first()
+    if not membership:
+        return NO_PERMISSIONS
+    if membership['is_owner']:
+        return CompiledPermissions(is_owner=True)
+    if not membership['role_id']:
+        return NO_PERMISSIONS
+    codes = Permission.objects.filter(rolepermission__role_id=membership['role_id']).values_list('code', flat=True)
+    return CompiledPermissions(codes)
+
+
+def get_permissions(user, company_id=None):
+    """Return the CompiledPermissions of ``user`` in ``company_id`` (defaults to the active company)."""
+    if user is None or not user.is_authenticated:
+        return NO_PERMISSIONS
+    if company_id is None:
+        from core.tenancy import resolve_tenant
+        company_id = resolve_tenant(user).company_id
+        if company_id is None:
+            return NO_PERMISSIONS
+
+    # Memoize per request on the user instance
+    memo = user.__dict__.setdefault('_compiled_permissions', {})
+    if company_id in memo:
+        return memo[company_id]
+
+    version = (_get_version(GLOBAL_VERSION_KEY), _get_version(_company_version_key(company_id)))
+    key = f'rbac:perms:{company_id}:{version[0]}.{version[1]}:{user.pk}'
+
+    permissions = _local_cache.get(key)
+    if permissions is None:
+        cached = cache.get(key)
+        if cached is not None:
+            permissions = CompiledPermissions.from_cache(cached)
+        else:
+            permissions = compile_permissions(user.pk, company_id)
+            cache.set(key, permissions.to_cache(), getattr(settings, 'RBAC_CACHE_TIMEOUT', 3600))
+        _local_cache.set(key, permissions)
+
+    memo[company_id] = permissions
+    return permissions
+
+
+def invalidate_company(company_id):
+    _bump_version(_company_version_key(company_id))
+
+
+def invalidate_all():
+    _bump_version(GLOBAL_VERSION_KEY)
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Role, Permission, RolePermission, UserCompany
+from .services import rbac
+
+
+@receiver([post_save, post_delete], sender=Role)
+def invalidate_role_permissions(sender, instance, **kwargs):
+    rbac.invalidate_company(instance.company_id)
+
+
+@receiver([post_save, post_delete], sender=RolePermission)
+def invalidate_role_permission(sender, instance, **kwargs):
+    company_id = Role.objects.filter(pk=instance.role_id).values_list('company_id', flat=True).first()
+    if company_id is not None:
+        rbac.invalidate_company(company_id)
+
+
+@receiver([post_save, post_delete], sender=UserCompany)
+def invalidate_membership_permissions(sender, instance, **kwargs):
+    rbac.invalidate_company(instance.company_id)
+
+
+@receiver([post_save, post_delete], sender=Permission)
+def invalidate_all_permissions(sender, instance, **kwargs):
+    rbac.invalidate_all()
@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from core.testing import QueryCountTestCase
+from .models import Permission, Role, RolePermission, UserCompany
+from .services import rbac
+
+
+class RBACCacheTests(QueryCountTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.member = get_user_model().objects.create_user(email='member@example.com', password='x', first_name='Member')
+        cls.role = Role.objects.create(company=cls.company, name='Editor')
+        cls.membership = UserCompany.objects.create(user=cls.member, company=cls.company, role=cls.role, is_default=True)
+        cls.permission = Permission.objects.create(code='customers.view', name='View customers', module='customers')
+
+    def permissions(self):
+        # A fresh instance each time, so the per-request memo on the user does not hide the cache
+        return rbac.get_permissions(get_user_model().objects.get(pk=self.member.pk), self.company.pk)
+
+    def test_compiled_set_is_cached(self):
+        self.permissions()
+        with self.assertNumQueries(1):
+            self.permissions()
+
+    def test_role_permission_changes_invalidate(self):
+        self.assertFalse(self.permissions().allows('customers', 'view'))
+        grant = RolePermission.objects.create(role=self.role, permission=self.permission)
+        self.assertTrue(self.permissions().allows('customers', 'view'))
+        grant.delete()
+        self.assertFalse(self.permissions().allows('customers', 'view'))
+
+    def test_membership_changes_invalidate(self):
+        RolePermission.objects.create(role=self.role, permission=self.permission)
+        self.assertEqual(self.permissions().module_actions('customers'), {'view'})
+        self.membership.is_owner = True
+        self.membership.save()
+        self.assertEqual(self.permissions().module_actions('customers'), set(rbac.ACTIONS))
+        self.membership.delete()
+        self.assertFalse(self.permissions().allows('customers', 'view'))
+
+    def test_permission_changes_invalidate_every_company(self):
+        RolePermission.objects.create(role=self.role, permission=self.permission)
+        self.assertTrue(self.permissions().allows('customers', 'view'))
+        self.permission.code = 'customers.read'
+        self.permission.save()
+        self.assertFalse(self.permissions().allows('customers', 'view'))
@@ -0,0 +1,12 @@
+from rest_framework import serializers
+from .models import AuditLog
+
+class AuditLogSerializer(serializers.ModelSerializer):
+    user_name = serializers.CharField(source='user.get_full_name', read_only=True, default='')
+
+    class Meta:
+        model = AuditLog
+        fields = [
+            'id', 'user', 'user_name', 'action', 'module', 'record_type', 'record_id', 'record_repr',
+            'old_values', 'new_values', 'ip_address', 'user_agent', 'created_at'
+        ]
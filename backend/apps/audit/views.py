@@ -0,0 +1,21 @@
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from django_filters.rest_framework import DjangoFilterBackend
+from core.pagination import KeysetPagination
+from core.permissions import HasModulePermission, IsCompanyMember
+from .models import AuditLog
+from .serializers import AuditLogSerializer
+
+
+class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+    """Audit trail of the active company, newest first, in keyset pages"""
+    queryset = AuditLog.objects.select_related('user')
+    serializer_class = AuditLogSerializer
+    permission_classes = [IsAuthenticated, IsCompanyMember, HasModulePermission]
+    module_name = 'audit'
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['user', 'action', 'module', 'record_type', 'record_id']
+
+    def get_queryset(self):
+        return self.queryset.filter(company_id=self.request.tenant.company_id)
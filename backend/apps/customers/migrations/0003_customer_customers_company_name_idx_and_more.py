@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0002_alter_customer_options_customer_annual_revenue_and_more"),
+        ("organization", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(
+                fields=["company", "company_name"], name="customers_company_name_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(
+                fields=["company", "-created_at"], name="customers_company_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(
+                fields=["company", "status"], name="customers_company_status_idx"
+            ),
+        ),
+    ]
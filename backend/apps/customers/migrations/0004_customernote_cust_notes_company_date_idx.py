@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0003_customer_customers_company_name_idx_and_more"),
+        ("organization", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customernote",
+            index=models.Index(
+                fields=["company", "-contact_date"], name="cust_notes_company_date_idx"
+            ),
+        ),
+    ]
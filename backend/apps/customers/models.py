@@ -103,6 +103,11 @@ class Customer(AuditableModel):
         ordering = ['company_name']
         verbose_name = 'Müşteri'
         verbose_name_plural = 'Müşteriler'
+        indexes = [
+            models.Index(fields=['company', 'company_name'], name='customers_company_name_idx'),
+            models.Index(fields=['company', '-created_at'], name='customers_company_created_idx'),
+            models.Index(fields=['company', 'status'], name='customers_company_status_idx'),
+        ]
 
     def __str__(self):
         return self.company_name
@@ -131,3 +136,4 @@ class CustomerNote(AuditableModel):
     class Meta:
         db_table = 'customer_notes'
         ordering = ['-contact_date']
+        indexes = [models.Index(fields=['company', '-contact_date'], name='cust_notes_company_date_idx')]
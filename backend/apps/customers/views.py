@@ -1,79 +1,53 @@
-from rest_framework import viewsets, permissions, filters
+from rest_framework import filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from core.viewsets import CompanyScopedViewSet
+from apps.search.filters import IndexedSearchFilter
 from .models import Customer, CustomerContact, CustomerNote
 from .serializers import CustomerSerializer, CustomerListSerializer, CustomerContactSerializer, CustomerNoteSerializer
 
-class CustomerViewSet(viewsets.ModelViewSet):
-    permission_classes = [permissions.IsAuthenticated]
+class CustomerViewSet(CompanyScopedViewSet):
+    queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [IndexedSearchFilter, filters.OrderingFilter]
     search_fields = ['company_name', 'contact_person', 'email', 'phone', 'tax_number']
+    search_kind = 'customer'
     ordering_fields = ['company_name', 'created_at']
     ordering = ['-created_at']
+    select_related_fields = ('assigned_to', 'created_by')
+    prefetch_related_fields = ('contacts',)
+    # Customers are always scoped to the active company, even for superusers
+    superuser_sees_all = False
 
     def get_serializer_class(self):
         if self.action == 'list':
             return CustomerListSerializer
         return CustomerSerializer
 
-    def get_queryset(self):
-        # Filter by current user's active company
-        user = self.request.user
-        if not user.active_company:
-            return Customer.objects.none()
-        return Customer.objects.select_related(
-            'assigned_to', 'created_by'
-        ).prefetch_related('contacts').filter(company=user.active_company)
-
-    def perform_create(self, serializer):
-        user = self.request.user
-        if not user.active_company:
-             raise serializers.ValidationError({"company": "Active company not found for user."})
-        serializer.save(created_by=user, company=user.active_company)
 
-class CustomerContactViewSet(viewsets.ModelViewSet):
-    permission_classes = [permissions.IsAuthenticated]
+class CustomerContactViewSet(CompanyScopedViewSet):
+    queryset = CustomerContact.objects.order_by('-is_primary', 'name', 'id')
     serializer_class = CustomerContactSerializer
-    queryset = CustomerContact.objects.all()
+    select_related_fields = ('customer', 'created_by')
+    superuser_sees_all = False
 
     def get_queryset(self):
-        user = self.request.user
-        if not user.active_company:
-            return CustomerContact.objects.none()
-        
-        qs = CustomerContact.objects.select_related('customer', 'created_by').filter(company=user.active_company)
-        
+        qs = super().get_queryset()
         customer_id = self.request.query_params.get('customer')
         if customer_id:
             qs = qs.filter(customer_id=customer_id)
         return qs
 
-    def perform_create(self, serializer):
-        user = self.request.user
-        if not user.active_company:
-             raise serializers.ValidationError({"company": "Active company not found for user."})
-        serializer.save(created_by=user, company=user.active_company)
 
-class CustomerNoteViewSet(viewsets.ModelViewSet):
-    permission_classes = [permissions.IsAuthenticated]
-    serializer_class = CustomerNoteSerializer
+class CustomerNoteViewSet(CompanyScopedViewSet):
     queryset = CustomerNote.objects.all()
-    
-    def get_queryset(self):
-        user = self.request.user
-        if not user.active_company:
-            return CustomerNote.objects.none()
-            
-        qs = CustomerNote.objects.select_related('customer', 'created_by').filter(company=user.active_company)
+    serializer_class = CustomerNoteSerializer
+    select_related_fields = ('customer', 'created_by')
+    superuser_sees_all = False
 
+    def get_queryset(self):
+        qs = super().get_queryset()
         customer_id = self.request.query_params.get('customer')
         if customer_id:
             qs = qs.filter(customer_id=customer_id)
         return qs
-
-    def perform_create(self, serializer):
-        user = self.request.user
-        if not user.active_company:
-             raise serializers.ValidationError({"company": "Active company not found for user."})
-        serializer.save(created_by=user, company=user.active_company)
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("organization", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DashboardSnapshot",
+            fields=[
+                (
+                    "company",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="dashboard_snapshot",
+                        serialize=False,
+                        to="organization.company",
+                    ),
+                ),
+                ("invoices", models.JSONField(default=dict)),
+                ("income", models.JSONField(default=dict)),
+                ("expenses", models.JSONField(default=dict)),
+                ("domains", models.JSONField(default=dict)),
+                ("hostings", models.JSONField(default=dict)),
+                ("tasks", models.JSONField(default=dict)),
+                ("seo", models.JSONField(default=dict)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("rebuilt_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "db_table": "dashboard_snapshots",
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import models
+
+
+class DashboardSnapshot(models.Model):
+    """Şirket başına önceden hesaplanmış gösterge paneli sayaçları"""
+    company = models.OneToOneField('organization.Company', on_delete=models.CASCADE, primary_key=True, related_name='dashboard_snapshot')
+    invoices = models.JSONField(default=dict)
+    income = models.JSONField(default=dict)
+    expenses = models.JSONField(default=dict)
+    domains = models.JSONField(default=dict)
+    hostings = models.JSONField(default=dict)
+    tasks = models.JSONField(default=dict)
+    seo = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+    rebuilt_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'dashboard_snapshots'
+
+    def __str__(self):
+        return f'Dashboard #{self.company_id}'
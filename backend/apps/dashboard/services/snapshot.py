@@ -0,0 +1,178 @@
+"""
+Dashboard snapshot maintenance.
+
+Every section of ``DashboardSnapshot`` is built by one aggregate query over a
+single model. Saving or deleting a row of that model queues a refresh of just
+that section for the row's company: once per transaction, after commit, in a
+Celery task (``apps.dashboard.tasks.refresh_dashboard_section``), so writes
+never wait for the aggregate.
+``rebuild`` recomputes all sections and is used for new snapshots and by the
+periodic repair task (date-relative figures such as "expiring in 30 days"
+drift as days pass without any row changing).
+"""
+import logging
+import threading
+import weakref
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from core.aggregates import count_if, sum_if, status_counts, summarize
+from apps.dashboard.models import DashboardSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+def _invoices(company_id):
+    from apps.finance.models import Invoice
+    summary = summarize(
+        Invoice.objects.for_company(company_id),
+        total=count_if(),
+        total_amount=sum_if('total_amount'),
+        paid_amount=sum_if('paid_amount'),
+        **status_counts('status', Invoice.STATUS_CHOICES)
+    )
+    summary['pending_amount'] = summary['total_amount'] - summary['paid_amount']
+    return summary
+
+
+def _income(company_id):
+    from apps.finance.models import Income
+    today = timezone.localdate()
+    return summarize(
+        Income.objects.for_company(company_id),
+        this_month=sum_if('amount', received_date__gte=today.replace(day=1)),
+        this_year=sum_if('amount', received_date__gte=today.replace(month=1, day=1)),
+    )
+
+
+def _expenses(company_id):
+    from apps.finance.models import Expense
+    from apps.finance.services.expenses import monthly_amount
+    summary = summarize(
+        Expense.objects.for_company(company_id),
+        monthly_recurring=sum_if('amount', period_type='monthly', is_active=True),
+        monthly_equivalent=sum_if(monthly_amount(), is_active=True),
+    )
+    summary['monthly_equivalent'] = round(summary['monthly_equivalent'], 2)
+    return summary
+
+
+def _domains(company_id):
+    from apps.domains.models import Domain
+    today = timezone.localdate()
+    return summarize(
+        Domain.objects.for_company(company_id),
+        total=count_if(),
+        expiring_7_days=count_if(expire_date__lte=today + timedelta(days=7), expire_date__gte=today),
+        expiring_30_days=count_if(expire_date__lte=today + timedelta(days=30), expire_date__gte=today),
+    )
+
+
+def _hostings(company_id):
+    from apps.domains.models import Hosting
+    today = timezone.localdate()
+    return summarize(
+        Hosting.objects.for_company(company_id),
+        total=count_if(),
+        expiring_30_days=count_if(expire_date__lte=today + timedelta(days=30), expire_date__gte=today),
+        total_monthly_cost=sum_if('monthly_cost'),
+    )
+
+
+def _tasks(company_id):
+    from apps.tasks.models import Task
+    open_statuses = [choice for choice in Task.STATUS_CHOICES if choice[0] != 'completed']
+    return summarize(
+        Task.objects.for_company(company_id),
+        open=count_if(status__in=[value for value, _label in open_statuses]),
+        **status_counts('status', open_statuses)
+    )
+
+
+def _seo(company_id):
+    from apps.seo.models import SEOPackage
+    return summarize(
+        SEOPackage.objects.for_company(company_id),
+        active=count_if(status='active'),
+        monthly_revenue=sum_if('monthly_fee', status='active'),
+    )
+
+
+# section -> (model label, builder)
+SECTIONS = {
+    'invoices': ('finance.Invoice', _invoices),
+    'income': ('finance.Income', _income),
+    'expenses': ('finance.Expense', _expenses),
+    'domains': ('domains.Domain', _domains),
+    'hostings': ('domains.Hosting', _hostings),
+    'tasks': ('tasks.Task', _tasks),
+    'seo': ('seo.SEOPackage', _seo),
+}
+
+
+def build_sections(company_id):
+    return {section: builder(company_id) for section, (_label, builder) in SECTIONS.items()}
+
+
+def rebuild(company_id):
+    """Recompute every section of the company's snapshot."""
+    snapshot, _created = DashboardSnapshot.objects.update_or_create(
+        company_id=company_id,
+        defaults={**build_sections(company_id), 'rebuilt_at': timezone.now()},
+    )
+    return snapshot
+
+
+def refresh_section(company_id, section):
+    """Recompute one section; builds the whole snapshot if it does not exist yet."""
+    from apps.organization.models import Company
+    data = SECTIONS[section][1](company_id)
+    updated = DashboardSnapshot.objects.filter(pk=company_id).update(**{section: data, 'updated_at': timezone.now()})
+    if not updated and Company.objects.filter(pk=company_id).exists():
+        rebuild(company_id)
+
+
+def get_snapshot(company_id):
+    """Primary key read of the snapshot, built on first access."""
+    snapshot = DashboardSnapshot.objects.filter(pk=company_id).first()
+    return snapshot or rebuild(company_id)
+
+
+class _RefreshBatch:
+    """
+    Sections queued in one transaction. Django holds ``send`` as an on_commit
+    callback and drops it on commit or rollback (including the rollback of the
+    savepoint it was queued in); only a weak reference is kept here, so the
+    next transaction always starts a new batch.
+    """
+
+    def __init__(self, keys=()):
+        self.keys = set(keys)
+        self.sent = False
+
+    def send(self):
+        from apps.dashboard.tasks import refresh_dashboard_section
+        self.sent = True
+        for company_id, section in self.keys:
+            try:
+                refresh_dashboard_section.delay(company_id, section)
+            except Exception:
+                logger.exception('Dashboard refresh of %s for company %s not queued', section, company_id)
+
+
+_pending = threading.local()
+
+
+def schedule_refresh(company_id, section):
+    """Queue a section refresh after commit, at most once per transaction."""
+    if not transaction.get_connection().in_atomic_block:
+        # Autocommit: the write is already committed, there is nothing to batch
+        _RefreshBatch([(company_id, section)]).send()
+        return
+    ref = getattr(_pending, 'batch', None)
+    batch = ref() if ref else None
+    if batch is None or batch.sent:
+        batch = _RefreshBatch()
+        _pending.batch = weakref.ref(batch)
+        transaction.on_commit(batch.send, robust=True)
+    batch.keys.add((company_id, section))
@@ -0,0 +1,16 @@
+from django.apps import apps
+from django.db.models.signals import post_save, post_delete
+from .services import snapshot
+
+
+def refresh_dashboard_section(sender, instance, raw=False, **kwargs):
+    if raw or not instance.company_id:
+        return
+    snapshot.schedule_refresh(instance.company_id, SECTION_BY_MODEL[sender])
+
+
+SECTION_BY_MODEL = {apps.get_model(label): section for section, (label, _builder) in snapshot.SECTIONS.items()}
+
+for model, section in SECTION_BY_MODEL.items():
+    post_save.connect(refresh_dashboard_section, sender=model, dispatch_uid=f'dashboard-save-{section}')
+    post_delete.connect(refresh_dashboard_section, sender=model, dispatch_uid=f'dashboard-delete-{section}')
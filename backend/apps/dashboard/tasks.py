@@ -0,0 +1,18 @@
+from celery import shared_task
+from apps.organization.models import Company
+from .services import snapshot
+
+
+@shared_task
+def rebuild_dashboard_snapshots(company_id=None):
+    """Recompute dashboard snapshots from scratch (all companies by default)."""
+    company_ids = [company_id] if company_id else Company.objects.values_list('pk', flat=True)
+    for pk in company_ids:
+        snapshot.rebuild(pk)
+    return len(company_ids)
+
+
+@shared_task
+def refresh_dashboard_section(company_id, section):
+    """Recompute one snapshot section after rows of its model changed."""
+    snapshot.refresh_section(company_id, section)
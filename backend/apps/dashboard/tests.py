@@ -0,0 +1,80 @@
+import datetime
+from unittest import mock
+from django.db import transaction
+from django.test import TransactionTestCase
+from core.testing import QueryCountTestCase
+from apps.customers.models import Customer
+from apps.domains.models import Domain
+from apps.organization.models import Company, Group
+from .models import DashboardSnapshot
+from .services import snapshot
+from .tasks import refresh_dashboard_section
+
+
+class SnapshotRefreshTests(QueryCountTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.customer = Customer.objects.create(company=cls.company, company_name='Customer', contact_person='x', email='a@example.com', phone='1')
+
+    def make_domain(self, i):
+        today = datetime.date.today()
+        return Domain.objects.create(company=self.company, customer=self.customer, domain_name=f'd{i}.com', registrar='r',
+                                     register_date=today, expire_date=today)
+
+    def test_one_refresh_per_transaction(self):
+        with mock.patch.object(refresh_dashboard_section, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                for i in range(3):
+                    self.make_domain(i)
+        delay.assert_called_once_with(self.company.pk, 'domains')
+
+    def test_refresh_queued_again_after_savepoint_rollback(self):
+        with mock.patch.object(refresh_dashboard_section, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                try:
+                    with transaction.atomic():
+                        self.make_domain(0)
+                        raise ValueError
+                except ValueError:
+                    pass
+                self.make_domain(1)
+        delay.assert_called_once_with(self.company.pk, 'domains')
+
+    def test_task_recomputes_section(self):
+        snapshot.rebuild(self.company.pk)
+        with mock.patch.object(refresh_dashboard_section, 'delay'):
+            self.make_domain(0)
+        refresh_dashboard_section(self.company.pk, 'domains')
+        self.assertEqual(DashboardSnapshot.objects.get(pk=self.company.pk).domains['total'], 1)
+
+
+class SnapshotRefreshCommitTests(TransactionTestCase):
+    """Real commits and rollbacks, which the savepoints of TestCase cannot show."""
+
+    def setUp(self):
+        group = Group.objects.create(name='Test Group', slug='test-group')
+        self.company = Company.objects.create(group=group, name='Test Company')
+        self.customer = Customer.objects.create(company=self.company, company_name='Customer', contact_person='x',
+                                                email='a@example.com', phone='1')
+
+    @transaction.atomic
+    def make_domain(self, i, fail=False):
+        today = datetime.date.today()
+        Domain.objects.create(company=self.company, customer=self.customer, domain_name=f'd{i}.com', registrar='r',
+                              register_date=today, expire_date=today)
+        if fail:
+            raise ValueError
+
+    def test_each_decorated_transaction_queues_a_refresh(self):
+        with mock.patch.object(refresh_dashboard_section, 'delay') as delay:
+            self.make_domain(0)
+            self.make_domain(1)
+        self.assertEqual(delay.call_count, 2)
+
+    def test_refresh_queued_after_rolled_back_transaction(self):
+        with mock.patch.object(refresh_dashboard_section, 'delay') as delay:
+            with self.assertRaises(ValueError):
+                self.make_domain(0, fail=True)
+            self.make_domain(1)
+        delay.assert_called_once_with(self.company.pk, 'domains')
@@ -0,0 +1,17 @@
+from rest_framework import views
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from core.permissions import IsCompanyMember
+from .services import snapshot
+
+
+class DashboardView(views.APIView):
+    """Precomputed dashboard counters of the active company"""
+    permission_classes = [IsAuthenticated, IsCompanyMember]
+
+    def get(self, request):
+        data = snapshot.get_snapshot(request.tenant.company_id)
+        return Response({
+            **{section: getattr(data, section) for section in snapshot.SECTIONS},
+            'updated_at': data.updated_at,
+        })
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0003_customer_customers_company_name_idx_and_more"),
+        ("domains", "0001_initial"),
+        ("organization", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="domain",
+            index=models.Index(
+                fields=["company", "expire_date"], name="domains_company_expire_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="hosting",
+            index=models.Index(
+                fields=["company", "expire_date"], name="hostings_company_expire_idx"
+            ),
+        ),
+    ]
@@ -20,6 +20,7 @@ class Domain(AuditableModel):
     class Meta:
         db_table = 'domains'
         ordering = ['expire_date']
+        indexes = [models.Index(fields=['company', 'expire_date'], name='domains_company_expire_idx')]
 
     @property
     def days_until_expiry(self):
@@ -45,3 +46,4 @@ class Hosting(AuditableModel):
     class Meta:
         db_table = 'hostings'
         ordering = ['expire_date']
+        indexes = [models.Index(fields=['company', 'expire_date'], name='hostings_company_expire_idx')]
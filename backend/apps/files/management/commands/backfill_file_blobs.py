@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from apps.files.models import File
+from apps.files.services.blobs import ensure_blob
+
+
+class Command(BaseCommand):
+    help = 'Moves files stored before the content-addressed blob layer into it, deduplicating identical content.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', type=int, help='Only backfill files of this company')
+
+    def handle(self, *args, **options):
+        queryset = File.objects.filter(blob__isnull=True).exclude(file='').exclude(file__isnull=True)
+        if options['company']:
+            queryset = queryset.filter(company_id=options['company'])
+
+        moved = missing = 0
+        for file_obj in queryset.iterator():
+            try:
+                ensure_blob(file_obj)
+                moved += 1
+            except FileNotFoundError:
+                missing += 1
+        self.stdout.write(self.style.SUCCESS(f'{moved} file(s) moved into blobs, {missing} missing on storage.'))
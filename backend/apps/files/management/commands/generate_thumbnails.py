@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from apps.files.models import Blob, File
+from apps.files.tasks import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Queues thumbnail and preview generation for stored content that has none yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retry', action='store_true', help='Also retry failed and unsupported content (e.g. after installing PyMuPDF)')
+
+    def handle(self, *args, **options):
+        if options['retry']:
+            Blob.objects.filter(thumbnail_status__in=['failed', 'unsupported']).update(thumbnail_status='pending')
+
+        queued = 0
+        pending = File.objects.filter(blob__thumbnail_status='pending').order_by('blob_id', 'pk').distinct('blob_id')
+        for blob_id, mime_type in pending.values_list('blob_id', 'mime_type').iterator():
+            generate_thumbnails.delay(blob_id, mime_type)
+            queued += 1
+        self.stdout.write(self.style.SUCCESS(f'{queued} blob(s) queued for thumbnails.'))
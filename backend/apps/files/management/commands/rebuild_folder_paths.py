@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.files.models import Folder
+from apps.files.services.folder_paths import rebuild_paths
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the materialized path and depth of folders from their parent links.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--company', type=int, help='Only rebuild folders of this company')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            changed = rebuild_paths(Folder, options['company'])
+        self.stdout.write(self.style.SUCCESS(f'{changed} folder path(s) updated.'))
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0004_customernote_cust_notes_company_date_idx"),
+        ("files", "0004_align_file_share_company"),
+        ("organization", "0001_initial"),
+        ("projects", "0002_project_projects_company_created_idx_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="file",
+            index=models.Index(
+                fields=["company", "-created_at"], name="files_company_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:24
+
+from django.db import migrations, models
+
+
+def fill_paths(apps, schema_editor):
+    from apps.files.services.folder_paths import rebuild_paths
+    rebuild_paths(apps.get_model('files', 'Folder'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("files", "0005_file_files_company_created_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="folder",
+            name="depth",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="folder",
+            name="path",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=1000
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="folder",
+            index=models.Index(
+                fields=["path"],
+                name="folders_path_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
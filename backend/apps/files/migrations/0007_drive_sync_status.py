@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:27
+
+from django.db import migrations, models
+
+
+def copy_sync_flag(apps, schema_editor):
+    apps.get_model('files', 'File').objects.filter(is_synced_to_drive=True).update(drive_sync_status='synced')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("files", "0006_folder_path"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="file",
+            name="drive_sync_error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="file",
+            name="drive_sync_status",
+            field=models.CharField(
+                choices=[
+                    ("local", "Yerel"),
+                    ("pending", "Bekliyor"),
+                    ("syncing", "Senkronize Ediliyor"),
+                    ("synced", "Senkronize"),
+                    ("failed", "Başarısız"),
+                ],
+                default="local",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="file",
+            name="sha256",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.RunPython(copy_sync_flag, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="file",
+            name="is_synced_to_drive",
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:29
+
+import apps.files.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("files", "0007_drive_sync_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Blob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("sha256", models.CharField(max_length=64, unique=True)),
+                (
+                    "file",
+                    models.FileField(
+                        max_length=255, upload_to=apps.files.models.blob_upload_to
+                    ),
+                ),
+                ("size", models.PositiveBigIntegerField(default=0)),
+                ("ref_count", models.IntegerField(default=0)),
+            ],
+            options={
+                "db_table": "file_blobs",
+                "indexes": [
+                    models.Index(
+                        fields=["ref_count", "updated_at"], name="file_blobs_gc_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddField(
+            model_name="file",
+            name="blob",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="files",
+                to="files.blob",
+            ),
+        ),
+    ]
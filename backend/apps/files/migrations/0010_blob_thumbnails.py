@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:35
+
+import apps.files.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("files", "0009_drive_sync_state"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blob",
+            name="preview",
+            field=models.FileField(
+                blank=True,
+                max_length=255,
+                upload_to=apps.files.models.derivative_upload_to,
+            ),
+        ),
+        migrations.AddField(
+            model_name="blob",
+            name="thumbnail",
+            field=models.FileField(
+                blank=True,
+                max_length=255,
+                upload_to=apps.files.models.derivative_upload_to,
+            ),
+        ),
+        migrations.AddField(
+            model_name="blob",
+            name="thumbnail_status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Bekliyor"),
+                    ("ready", "Hazır"),
+                    ("unsupported", "Desteklenmiyor"),
+                    ("failed", "Başarısız"),
+                ],
+                default="pending",
+                max_length=12,
+            ),
+        ),
+    ]
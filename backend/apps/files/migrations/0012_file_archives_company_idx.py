@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("files", "0011_file_archives"),
+        ("organization", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="filearchive",
+            index=models.Index(
+                fields=["company", "-created_at"], name="file_archives_company_idx"
+            ),
+        ),
+    ]
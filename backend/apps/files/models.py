@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
-from core.models import AuditableModel
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+from core.models import AuditableModel, CompanyOwnedModel, TimeStampedModel
 
 class Folder(AuditableModel):
     FOLDER_TYPES = [('general', 'Genel'), ('customer', 'Müşteri'), ('project', 'Proje'), ('template', 'Şablon')]
@@ -13,16 +15,100 @@ class Folder(AuditableModel):
     # Google Drive sync
     drive_folder_id = models.CharField(max_length=255, blank=True, null=True)
 
+    # Materialized path: ancestor ids and own id, e.g. "3/17/42/"
+    path = models.CharField(max_length=1000, blank=True, default='', editable=False)
+    depth = models.PositiveIntegerField(default=0, editable=False)
+
     class Meta:
         db_table = 'folders'
+        indexes = [models.Index(fields=['path'], name='folders_path_idx', opclasses=['varchar_pattern_ops'])]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'parent' not in update_fields:
+            return super().save(*args, **kwargs)
+
+        old_path, old_depth = self.path, self.depth
+        parent_path = ''
+        if self.parent_id:
+            parent_path = Folder.objects.filter(pk=self.parent_id).values_list('path', flat=True).first() or ''
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'path', 'depth'}
+        if self.pk is None:
+            super().save(*args, **kwargs)
+            self.path, self.depth = f'{parent_path}{self.pk}/', parent_path.count('/')
+            Folder.objects.filter(pk=self.pk).update(path=self.path, depth=self.depth)
+            return
+
+        self.path, self.depth = f'{parent_path}{self.pk}/', parent_path.count('/')
+        super().save(*args, **kwargs)
+        if old_path and old_path != self.path:
+            # Re-root the whole subtree in one statement
+            Folder.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(Value(self.path), Substr('path', len(old_path) + 1)),
+                depth=F('depth') + (self.depth - old_depth),
+            )
+
+    def descendants(self):
+        return Folder.objects.filter(path__startswith=self.path).exclude(pk=self.pk)
+
+    def ancestors(self):
+        ids = [int(pk) for pk in self.path.split('/')[:-2] if pk]
+        return Folder.objects.filter(pk__in=ids).order_by('depth')
+
+    def is_descendant_of(self, folder):
+        return bool(folder.path) and self.path.startswith(folder.path)
+
+    def subtree_files(self):
+        return File.objects.filter(folder__path__startswith=self.path)
+
+    def delete_subtree(self):
+        """Delete the folder, its subfolders and their files with per-table statements instead of per-level cascades."""
+        File.objects.filter(folder__path__startswith=self.path).delete()
+        return Folder.objects.filter(path__startswith=self.path).delete()
+
+    @property
+    def breadcrumbs(self):
+        return [{'id': folder.id, 'name': folder.name} for folder in [*self.ancestors(), self]]
 
     @property
     def full_path(self):
-        return f"{self.parent.full_path}/{self.name}" if self.parent else self.name
+        return '/'.join(crumb['name'] for crumb in self.breadcrumbs)
+
+
+def blob_upload_to(instance, filename):
+    return f'blobs/{instance.sha256[:2]}/{instance.sha256[2:4]}/{instance.sha256}'
+
+
+def derivative_upload_to(instance, filename):
+    return f'thumbs/{instance.sha256[:2]}/{instance.sha256[2:4]}/{filename}'
+
+
+class Blob(TimeStampedModel):
+    """İçerik adresli dosya verisi; aynı içerik tek kez saklanır"""
+    THUMBNAIL_STATUS_CHOICES = [('pending', 'Bekliyor'), ('ready', 'Hazır'), ('unsupported', 'Desteklenmiyor'), ('failed', 'Başarısız')]
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to=blob_upload_to, max_length=255)
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.IntegerField(default=0)
+
+    # Önizleme türevleri (küçük resim ve büyük önizleme)
+    thumbnail = models.FileField(upload_to=derivative_upload_to, max_length=255, blank=True)
+    preview = models.FileField(upload_to=derivative_upload_to, max_length=255, blank=True)
+    thumbnail_status = models.CharField(max_length=12, choices=THUMBNAIL_STATUS_CHOICES, default='pending')
 
+    class Meta:
+        db_table = 'file_blobs'
+        indexes = [models.Index(fields=['ref_count', 'updated_at'], name='file_blobs_gc_idx')]
+
+    def __str__(self):
+        return self.sha256
 
 
 class File(AuditableModel):
+    DRIVE_SYNC_CHOICES = [('local', 'Yerel'), ('pending', 'Bekliyor'), ('syncing', 'Senkronize Ediliyor'), ('synced', 'Senkronize'), ('failed', 'Başarısız')]
+
     folder = models.ForeignKey(Folder, on_delete=models.CASCADE, related_name='files', null=True, blank=True)
     name = models.CharField(max_length=255)
     original_name = models.CharField(max_length=255)
@@ -34,16 +120,51 @@ class File(AuditableModel):
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
     is_public = models.BooleanField(default=False)
     download_count = models.PositiveIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True)
+    blob = models.ForeignKey(Blob, on_delete=models.PROTECT, null=True, blank=True, related_name='files')
     
     # Google Drive fields
     drive_file_id = models.CharField(max_length=255, blank=True, null=True)
     drive_view_link = models.URLField(max_length=500, blank=True, null=True)
     drive_download_link = models.URLField(max_length=500, blank=True, null=True)
-    is_synced_to_drive = models.BooleanField(default=False)
+    drive_sync_status = models.CharField(max_length=10, choices=DRIVE_SYNC_CHOICES, default='local')
+    drive_sync_error = models.TextField(blank=True)
 
     class Meta:
         db_table = 'files'
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['company', '-created_at'], name='files_company_created_idx')]
+
+    @property
+    def is_synced_to_drive(self):
+        return self.drive_sync_status == 'synced'
+
+
+class FileArchive(AuditableModel):
+    """Arka planda hazırlanan çoklu dosya ZIP arşivi"""
+    STATUS_CHOICES = [('pending', 'Bekliyor'), ('building', 'Hazırlanıyor'), ('ready', 'Hazır'), ('failed', 'Başarısız')]
+
+    name = models.CharField(max_length=255)
+    folder = models.ForeignKey(Folder, on_delete=models.SET_NULL, null=True, blank=True, related_name='archives')
+    file_ids = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    file = models.FileField(upload_to='archives/%Y/%m/', max_length=255, blank=True)
+    size = models.PositiveBigIntegerField(default=0)
+    file_count = models.PositiveIntegerField(default=0)
+    skipped = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True)
+    expires_at = models.DateTimeField()
+
+    mime_type = 'application/zip'
+
+    class Meta:
+        db_table = 'file_archives'
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['company', '-created_at'], name='file_archives_company_idx')]
+
+    @property
+    def original_name(self):
+        return f'{self.name}.zip'
 
 
 class FileShare(AuditableModel):
@@ -56,3 +177,14 @@ class FileShare(AuditableModel):
     class Meta:
         db_table = 'file_shares'
         unique_together = ['file', 'shared_with']
+
+
+class DriveSyncState(CompanyOwnedModel):
+    """Drive changes feed cursor of a connected user"""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='drive_sync_state')
+    page_token = models.CharField(max_length=255, blank=True)
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'drive_sync_states'
@@ -2,6 +2,7 @@ from rest_framework import views, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.conf import settings
+from .models import DriveSyncState
 from .services.google_drive_oauth import drive_oauth_service
 
 
@@ -80,6 +81,8 @@ class GoogleDriveDisconnectView(views.APIView):
         request.user.google_drive_token = None
         request.user.google_drive_connected = False
         request.user.save()
+        # A later connection starts over with a full sync
+        DriveSyncState.objects.filter(user=request.user).delete()
         return Response({'status': 'disconnected'})
 
 
@@ -1,24 +1,33 @@
 from rest_framework import serializers
-from .models import Folder, File, FileShare
+from django.conf import settings
+from core.aggregates import related_count
+from .models import Folder, File, FileArchive, FileShare
 
 
 class FolderSerializer(serializers.ModelSerializer):
-    file_count = serializers.SerializerMethodField()
-    subfolder_count = serializers.SerializerMethodField()
+    annotations = {
+        'file_count': related_count(File.objects.all(), 'folder'),
+        'subfolder_count': related_count(Folder.objects.all(), 'parent'),
+    }
+
+    file_count = serializers.IntegerField(read_only=True, default=0)
+    subfolder_count = serializers.IntegerField(read_only=True, default=0)
 
     class Meta:
         model = Folder
         fields = [
             'id', 'parent', 'name', 'folder_type', 'customer', 'project',
-            'file_count', 'subfolder_count', 'created_at'
+            'depth', 'file_count', 'subfolder_count', 'created_at'
         ]
-        read_only_fields = ['id', 'file_count', 'subfolder_count', 'created_at']
-
-    def get_file_count(self, obj):
-        return obj.files.count()
+        read_only_fields = ['id', 'depth', 'file_count', 'subfolder_count', 'created_at']
 
-    def get_subfolder_count(self, obj):
-        return obj.subfolders.count()
+    def validate_parent(self, parent):
+        request = self.context.get('request')
+        if parent and request and parent.company_id != request.tenant.company_id:
+            raise serializers.ValidationError('Folder not found')
+        if parent and self.instance and (parent.pk == self.instance.pk or parent.is_descendant_of(self.instance)):
+            raise serializers.ValidationError('Cannot move a folder into itself or its subfolders')
+        return parent
 
 
 class FileSerializer(serializers.ModelSerializer):
@@ -27,6 +36,7 @@ class FileSerializer(serializers.ModelSerializer):
     customer_name = serializers.CharField(source='customer.company_name', read_only=True)
     project_name = serializers.CharField(source='project.name', read_only=True)
     size_display = serializers.SerializerMethodField()
+    is_synced_to_drive = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = File
@@ -36,13 +46,14 @@ class FileSerializer(serializers.ModelSerializer):
             'project', 'project_name', 'uploaded_by', 'uploaded_by_name',
             'is_public', 'download_count',
             'drive_file_id', 'drive_view_link', 'drive_download_link', 'is_synced_to_drive',
-            'created_at', 'updated_at'
+            'drive_sync_status', 'drive_sync_error', 'sha256', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'folder_name', 'uploaded_by_name', 'customer_name',
                            'project_name', 'size_display', 'download_count', 'size',
                            'original_name', 'mime_type', 'uploaded_by',
                            'drive_file_id', 'drive_view_link', 'drive_download_link',
-                           'is_synced_to_drive', 'created_at', 'updated_at']
+                           'is_synced_to_drive', 'drive_sync_status', 'drive_sync_error',
+                           'sha256', 'created_at', 'updated_at']
 
     def get_size_display(self, obj):
         size = obj.size
@@ -57,15 +68,20 @@ class FileSerializer(serializers.ModelSerializer):
 class FileListSerializer(serializers.ModelSerializer):
     folder_name = serializers.CharField(source='folder.name', read_only=True)
     size_display = serializers.SerializerMethodField()
+    is_synced_to_drive = serializers.BooleanField(read_only=True)
+    has_thumbnail = serializers.SerializerMethodField()
 
     class Meta:
         model = File
         fields = [
             'id', 'folder', 'folder_name', 'name', 'original_name',
             'size', 'size_display', 'mime_type', 'is_synced_to_drive',
-            'drive_view_link', 'created_at'
+            'drive_sync_status', 'drive_view_link', 'has_thumbnail', 'created_at'
         ]
 
+    def get_has_thumbnail(self, obj):
+        return obj.blob_id is not None and obj.blob.thumbnail_status == 'ready'
+
     def get_size_display(self, obj):
         size = obj.size
         if size < 1024:
@@ -76,6 +92,37 @@ class FileListSerializer(serializers.ModelSerializer):
             return f"{size / (1024 * 1024):.1f} MB"
 
 
+class FileArchiveSerializer(serializers.ModelSerializer):
+    file_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+    class Meta:
+        model = FileArchive
+        fields = [
+            'id', 'name', 'folder', 'file_ids', 'status', 'size', 'file_count',
+            'skipped', 'error', 'expires_at', 'created_at'
+        ]
+        read_only_fields = ['id', 'status', 'size', 'file_count', 'skipped', 'error', 'expires_at', 'created_at']
+        extra_kwargs = {'name': {'required': False}}
+
+    def validate_folder(self, folder):
+        request = self.context.get('request')
+        if folder and request and folder.company_id != request.tenant.company_id:
+            raise serializers.ValidationError('Folder not found')
+        return folder
+
+    def validate(self, attrs):
+        folder, file_ids = attrs.get('folder'), attrs.get('file_ids')
+        if bool(folder) == bool(file_ids):
+            raise serializers.ValidationError('Provide either folder or file_ids')
+        limit = settings.FILES_ARCHIVE_MAX_FILES
+        count = folder.subtree_files().count() if folder else len(set(file_ids))
+        if count > limit:
+            raise serializers.ValidationError(f'An archive can hold at most {limit} files')
+        if not attrs.get('name'):
+            attrs['name'] = folder.name if folder else 'files'
+        return attrs
+
+
 class FileShareSerializer(serializers.ModelSerializer):
     file_name = serializers.CharField(source='file.name', read_only=True)
     shared_with_name = serializers.CharField(source='shared_with.get_full_name', read_only=True)
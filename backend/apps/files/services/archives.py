@@ -0,0 +1,135 @@
+"""
+ZIP archives of folders and file selections.
+
+Archives are built by the ``build_file_archive`` Celery task into a temporary
+file on disk, one member at a time from local storage or Google Drive, so
+memory use stays at one chunk regardless of archive size. The finished ZIP
+is stored on ``FileArchive.file`` and served like any other download,
+including Range requests.
+"""
+import logging
+import os
+import tempfile
+import zipfile
+from django.core.files import File as DjangoFile
+from django.utils import timezone
+from core import counters
+from apps.files.models import File, Folder
+from .google_drive_oauth import drive_oauth_service
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+PRECOMPRESSED_PREFIXES = ('image/', 'video/', 'audio/')
+PRECOMPRESSED_TYPES = {
+    'application/zip', 'application/gzip', 'application/x-7z-compressed', 'application/x-rar-compressed',
+    'application/pdf', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+}
+
+
+def archive_files(archive):
+    """Files the archive covers, each with its path inside the ZIP"""
+    if archive.folder_id:
+        root = archive.folder
+        subtree = list(Folder.objects.filter(path__startswith=root.path).values_list('pk', 'name', 'path'))
+        names = {pk: name for pk, name, _ in subtree}
+        folder_paths = {}
+        for pk, _, path in subtree:
+            # Directory inside the ZIP: the folder names below the archived folder
+            ids = [int(i) for i in path[len(root.path):].split('/') if i]
+            folder_paths[pk] = ''.join(f'{_safe(names[i])}/' for i in ids)
+        files = root.subtree_files().filter(company_id=archive.company_id).order_by('folder__path', 'name')
+        entries = [(f, folder_paths.get(f.folder_id, '')) for f in files]
+    else:
+        files = File.objects.filter(company_id=archive.company_id, pk__in=archive.file_ids).order_by('name')
+        entries = [(f, '') for f in files]
+
+    seen = set()
+    for file_obj, directory in entries:
+        yield file_obj, _unique(f'{directory}{_safe(file_obj.original_name or file_obj.name)}', seen)
+
+
+def _safe(name):
+    return (name or 'file').replace('/', '_').replace('\\', '_')
+
+
+def _unique(arcname, seen):
+    stem, ext = os.path.splitext(arcname)
+    candidate, n = arcname, 1
+    while candidate.lower() in seen:
+        n += 1
+        candidate = f'{stem} ({n}){ext}'
+    seen.add(candidate.lower())
+    return candidate
+
+
+def _member_chunks(file_obj, token_data):
+    """Chunk iterator over the file's bytes, or None when they are not reachable"""
+    if file_obj.file:
+        try:
+            handle = file_obj.file.storage.open(file_obj.file.name, 'rb')
+        except FileNotFoundError:
+            handle = None
+        if handle is not None:
+            def local():
+                with handle:
+                    yield from handle.chunks(CHUNK_SIZE)
+            return local()
+    if file_obj.drive_file_id and token_data:
+        chunks = drive_oauth_service.iter_file(token_data, file_obj.drive_file_id, chunksize=CHUNK_SIZE)
+        try:
+            # Fetch the first chunk up front so an unreachable file is skipped, not half-written
+            first = next(chunks, b'')
+        except Exception as e:
+            logger.warning('Error fetching %s from Drive, leaving it out of the archive: %s', file_obj.drive_file_id, e)
+            return None
+
+        def remote():
+            yield first
+            yield from chunks
+        return remote()
+    return None
+
+
+def _compress_type(mime_type):
+    mime_type = mime_type or ''
+    if mime_type.startswith(PRECOMPRESSED_PREFIXES) or mime_type in PRECOMPRESSED_TYPES:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def build(archive):
+    """Write the archive's ZIP to storage and record what went in"""
+    user = archive.created_by
+    token_data = user.google_drive_token if user and user.google_drive_connected else None
+
+    included, skipped = [], []
+    with tempfile.TemporaryFile() as tmp:
+        with zipfile.ZipFile(tmp, 'w', allowZip64=True) as zf:
+            for file_obj, arcname in archive_files(archive):
+                chunks = _member_chunks(file_obj, token_data)
+                if chunks is None:
+                    skipped.append(arcname)
+                    continue
+                info = zipfile.ZipInfo(arcname, date_time=timezone.localtime(file_obj.created_at).timetuple()[:6])
+                info.compress_type = _compress_type(file_obj.mime_type)
+                with zf.open(info, 'w', force_zip64=True) as member:
+                    for chunk in chunks:
+                        member.write(chunk)
+                included.append(file_obj.pk)
+
+        archive.size = tmp.tell()
+        tmp.seek(0)
+        archive.file.save(f'{archive.pk}-{_safe(archive.name)}.zip', DjangoFile(tmp), save=False)
+
+    archive.file_ids, archive.file_count, archive.skipped = included, len(included), skipped
+    archive.status, archive.error = 'ready', ''
+    archive.save(update_fields=['file', 'size', 'file_ids', 'file_count', 'skipped', 'status', 'error', 'updated_at'])
+    return archive
+
+
+def count_download(archive):
+    """Count one download for every file in the archive with a single UPDATE"""
+    counters.increment_many(File, archive.file_ids, 'download_count')
@@ -0,0 +1,92 @@
+"""
+Content-addressed blob store.
+
+File rows point at a ``Blob`` keyed by the SHA-256 of its bytes, so identical
+uploads and copies share one stored object. ``ref_count`` follows File rows
+through the signals in ``apps.files.signals``; blobs that drop to zero are
+removed by ``collect_orphans`` after a grace period, which also covers blobs
+stored by an upload whose File row was never committed.
+"""
+import hashlib
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+from apps.files.models import Blob, File
+
+
+def store(content, sha256, size):
+    """Return the blob for ``sha256``, writing ``content`` to storage only if it is new."""
+    blob = Blob.objects.filter(sha256=sha256).first()
+    if blob is not None:
+        return blob
+    blob = Blob(sha256=sha256, size=size)
+    blob.file.save(sha256, content, save=False)
+    try:
+        with transaction.atomic():
+            blob.save()
+    except IntegrityError:
+        # A concurrent upload stored the same content first
+        blob.file.storage.delete(blob.file.name)
+        blob = Blob.objects.get(sha256=sha256)
+    return blob
+
+
+def acquire(blob_id):
+    Blob.objects.filter(pk=blob_id).update(ref_count=F('ref_count') + 1, updated_at=timezone.now())
+
+
+def release(blob_id):
+    Blob.objects.filter(pk=blob_id).update(ref_count=F('ref_count') - 1, updated_at=timezone.now())
+
+
+def ensure_blob(file_obj):
+    """Move a file stored before the blob layer into it; returns the blob or None without content."""
+    if file_obj.blob_id:
+        return file_obj.blob
+    if not file_obj.file:
+        return None
+
+    digest = hashlib.sha256()
+    size = 0
+    with file_obj.file.open('rb') as handle:
+        for chunk in handle.chunks():
+            digest.update(chunk)
+            size += len(chunk)
+        handle.seek(0)
+        blob = store(handle, digest.hexdigest(), size)
+
+    legacy_name = file_obj.file.name
+    File.objects.filter(pk=file_obj.pk).update(blob=blob, file=blob.file.name, sha256=blob.sha256)
+    acquire(blob.pk)
+    if legacy_name != blob.file.name:
+        file_obj.file.storage.delete(legacy_name)
+    file_obj.blob, file_obj.file, file_obj.sha256 = blob, blob.file.name, blob.sha256
+    return blob
+
+
+def _delete_stored(names):
+    for name in names:
+        Blob.file.field.storage.delete(name)
+
+
+def collect_orphans(grace=None):
+    """Delete unreferenced blobs untouched for ``grace`` seconds; returns how many were removed."""
+    grace = grace if grace is not None else getattr(settings, 'FILES_BLOB_GC_GRACE', 3600)
+    cutoff = timezone.now() - timedelta(seconds=grace)
+    orphans = Blob.objects.filter(ref_count__lte=0, updated_at__lt=cutoff).exclude(
+        Exists(File.objects.filter(blob=OuterRef('pk')))
+    )
+    removed = 0
+    for blob in orphans.iterator():
+        with transaction.atomic():
+            # Re-check under lock in case a copy picked the blob up meanwhile
+            locked = Blob.objects.select_for_update().filter(pk=blob.pk, ref_count__lte=0).first()
+            if locked is None or File.objects.filter(blob=locked).exists():
+                continue
+            names = [field.name for field in (locked.file, locked.thumbnail, locked.preview) if field]
+            locked.delete()
+            transaction.on_commit(lambda names=names: _delete_stored(names))
+        removed += 1
+    return removed
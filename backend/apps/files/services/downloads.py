@@ -0,0 +1,146 @@
+"""
+Streaming file delivery.
+
+Local files are sent with ``FileResponse`` (or handed to nginx with
+X-Accel-Redirect when ``FILES_X_ACCEL_REDIRECT`` is on) and Drive files are
+proxied chunk by chunk, so a download never holds the whole file in memory.
+Single-range ``Range`` requests are answered with 206 for resumable downloads.
+"""
+import logging
+import re
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from .google_drive_oauth import drive_oauth_service
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """
+    Return ``(start, end)`` (inclusive) for a single byte range, ``None`` when
+    the header is absent or not a single range, or raise RangeNotSatisfiable.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or not size:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable
+    return start, end
+
+
+def _attachment_headers(response, file_obj):
+    response['Content-Disposition'] = content_disposition_header(True, file_obj.original_name or file_obj.name)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _partial(response, start, end, size):
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+    return response
+
+
+def _unsatisfiable(size):
+    response = HttpResponse(status=416)
+    response['Content-Range'] = f'bytes */{size}'
+    return response
+
+
+def _iter_local(handle, start, length):
+    try:
+        handle.seek(start)
+        while length > 0:
+            data = handle.read(min(CHUNK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        handle.close()
+
+
+def local_file_response(request, file_obj):
+    """Serve ``file_obj.file`` from storage without reading it into memory."""
+    content_type = file_obj.mime_type or 'application/octet-stream'
+    if getattr(settings, 'FILES_X_ACCEL_REDIRECT', False):
+        # nginx serves the bytes (including ranges) from its internal location
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = f"{settings.FILES_X_ACCEL_PREFIX.rstrip('/')}/{file_obj.file.name}"
+        return _attachment_headers(response, file_obj)
+
+    size = file_obj.file.size
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size)
+    except RangeNotSatisfiable:
+        return _unsatisfiable(size)
+
+    handle = file_obj.file.storage.open(file_obj.file.name, 'rb')
+    if byte_range is None:
+        response = FileResponse(handle, content_type=content_type, as_attachment=True,
+                                filename=file_obj.original_name or file_obj.name)
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    start, end = byte_range
+    response = StreamingHttpResponse(_iter_local(handle, start, end - start + 1), status=206, content_type=content_type)
+    return _partial(_attachment_headers(response, file_obj), start, end, size)
+
+
+def drive_file_response(request, token_data, file_obj):
+    """
+    Proxy a Drive file as it downloads. Returns ``None`` when the first chunk
+    cannot be fetched so the caller can fall back to local storage.
+    """
+    size = file_obj.size or None
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size)
+    except RangeNotSatisfiable:
+        return _unsatisfiable(size)
+    start, end = byte_range or (0, None)
+
+    chunks = drive_oauth_service.iter_file(token_data, file_obj.drive_file_id, start, end, CHUNK_SIZE)
+    try:
+        first = next(chunks)
+    except StopIteration:
+        first = b''
+    except Exception as e:
+        logger.warning('Error streaming file %s from Drive, serving the local copy: %s', file_obj.drive_file_id, e)
+        return None
+
+    def stream():
+        yield first
+        yield from chunks
+
+    content_type = file_obj.mime_type or 'application/octet-stream'
+    if byte_range is None:
+        return _attachment_headers(StreamingHttpResponse(stream(), content_type=content_type), file_obj)
+    response = StreamingHttpResponse(stream(), status=206, content_type=content_type)
+    return _partial(_attachment_headers(response, file_obj), start, end, size)
+
+
+def derivative_response(field, content_type, etag):
+    """Serve a stored thumbnail/preview; its content never changes, so browsers may keep it"""
+    if getattr(settings, 'FILES_X_ACCEL_REDIRECT', False):
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = f"{settings.FILES_X_ACCEL_PREFIX.rstrip('/')}/{field.name}"
+    else:
+        response = FileResponse(field.storage.open(field.name, 'rb'), content_type=content_type)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
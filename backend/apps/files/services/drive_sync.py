@@ -0,0 +1,279 @@
+"""
+Incremental Drive-to-CRM sync.
+
+Every connected user keeps a ``DriveSyncState`` holding a Drive changes feed
+cursor. The first run records a start token and then walks the shared
+``GOOGLE_DRIVE_FOLDER_ID`` tree once; later runs only read the changes since
+the stored token. Items under the shared folder are mirrored into the user's
+company as ``Folder``/``File`` rows keyed by their Drive ids. Files removed
+from Drive are deleted locally unless the CRM holds their content, in which
+case they are only unlinked from Drive. Folders and files created in the CRM
+are never deleted by the mirror.
+
+Files the CRM uploads or moves go to the Drive counterpart of their folder
+(``drive_folder_for``), so the mirror reads back the place they already have.
+"""
+from django.db import transaction
+from django.utils import timezone
+from core.tenancy import resolve_tenant
+from apps.files.models import DriveSyncState, File, Folder
+from apps.search.services import index as search_index
+from .google_drive_oauth import FILE_FIELDS, FOLDER_MIME_TYPE, drive_oauth_service
+
+UNLINKED = {'drive_file_id': None, 'drive_view_link': None, 'drive_download_link': None, 'drive_sync_status': 'local'}
+
+
+class DriveMirror:
+    """Applies Drive file resources to one company's folders and files."""
+
+    def __init__(self, company_id, user, root_id):
+        self.company_id = company_id
+        self.user = user
+        self.root_id = root_id
+        self.folders = self._folder_map()
+        self.applied = 0
+
+    def _folder_map(self):
+        return dict(
+            Folder.objects.filter(company_id=self.company_id, drive_folder_id__isnull=False)
+            .values_list('drive_folder_id', 'pk')
+        )
+
+    def parent_of(self, item):
+        """Local parent folder id (None for the shared root), or False when outside the shared tree"""
+        for parent in item.get('parents', []):
+            if parent == self.root_id:
+                return None
+            if parent in self.folders:
+                return self.folders[parent]
+        return False
+
+    def apply(self, changes):
+        """Apply one page of changes (``{'fileId', 'removed', 'file'}`` dicts)"""
+        folders, files = [], []
+        for change in changes:
+            item = change.get('file') or {'id': change['fileId']}
+            removed = change.get('removed') or item.get('trashed', False)
+            is_folder = item.get('mimeType') == FOLDER_MIME_TYPE or change['fileId'] in self.folders
+            (folders if is_folder else files).append((item, removed))
+
+        with transaction.atomic():
+            self._apply_folders(folders)
+            self._apply_files(files)
+
+    def _apply_folders(self, changes):
+        pending = list(changes)
+        # Parents may arrive after their children within a page; retry until nothing moves
+        while pending:
+            deferred = []
+            for item, removed in pending:
+                parent_id = False if removed else self.parent_of(item)
+                if parent_id is False and not removed and self._parent_pending(item, pending):
+                    deferred.append((item, removed))
+                    continue
+                self._apply_folder(item, parent_id)
+            if len(deferred) == len(pending):
+                for item, removed in deferred:
+                    self._apply_folder(item, False)
+                break
+            pending = deferred
+
+    def _parent_pending(self, item, pending):
+        parents = set(item.get('parents', []))
+        return any(other['id'] in parents and not removed for other, removed in pending if other is not item)
+
+    def _apply_folder(self, item, parent_id):
+        drive_id = item['id']
+        folder = Folder.objects.filter(company_id=self.company_id, drive_folder_id=drive_id).first()
+        if parent_id is False:
+            if folder is not None:
+                self._remove_folder(folder)
+                self.folders = self._folder_map()
+                self.applied += 1
+            return
+
+        if folder is None:
+            folder = Folder.objects.create(
+                company_id=self.company_id,
+                created_by=self.user,
+                name=item.get('name', ''),
+                parent_id=parent_id,
+                drive_folder_id=drive_id,
+            )
+            self.folders[drive_id] = folder.pk
+            self.applied += 1
+        elif folder.name != item.get('name', folder.name) or folder.parent_id != parent_id:
+            folder.name = item.get('name', folder.name)
+            folder.parent_id = parent_id
+            folder.save(update_fields=['name', 'parent', 'updated_at'])
+            self.applied += 1
+
+    def _remove_folder(self, folder):
+        """
+        Drop the Drive-linked folders of a subtree removed from Drive and their
+        Drive-only files. Folders and files created in the CRM, and files whose
+        content the CRM holds, move up to the nearest folder that stays.
+        """
+        gone = set(Folder.objects.filter(path__startswith=folder.path, drive_folder_id__isnull=False).values_list('pk', flat=True))
+
+        def nearest_kept(path):
+            return next((int(pk) for pk in reversed(path.split('/')) if pk and int(pk) not in gone), None)
+
+        now = timezone.now()
+        files = File.objects.filter(folder_id__in=gone)
+        files.filter(drive_file_id__isnull=False, blob__isnull=True).delete()
+        targets = {}
+        for pk, path in files.values_list('pk', 'folder__path'):
+            targets.setdefault(nearest_kept(path), []).append(pk)
+        for folder_id, pks in targets.items():
+            File.objects.filter(pk__in=pks).update(folder_id=folder_id, updated_at=now)
+        kept_files = File.objects.filter(pk__in=[pk for pks in targets.values() for pk in pks])
+        kept_files.filter(drive_file_id__isnull=False).update(**UNLINKED)
+
+        local = Folder.objects.filter(parent_id__in=gone, drive_folder_id__isnull=True).values_list('pk', 'parent__path')
+        for pk, parent_path in list(local):
+            # Loaded one by one: moving an earlier folder rewrites the paths below it
+            moved = Folder.objects.get(pk=pk)
+            moved.parent_id = nearest_kept(parent_path)
+            moved.save(update_fields=['parent', 'updated_at'])
+        Folder.objects.filter(pk__in=gone).delete()
+        if targets:
+            # Queryset updates skip model signals, so refresh the moved files' search documents here
+            search_index.reindex('file', kept_files)
+
+    def _apply_files(self, changes):
+        if not changes:
+            return
+        existing = {}
+        for file_obj in File.objects.filter(company_id=self.company_id, drive_file_id__in=[item['id'] for item, _ in changes]):
+            existing.setdefault(file_obj.drive_file_id, []).append(file_obj)
+
+        linked = {None, *self.folders.values()}
+        now = timezone.now()
+        created, updated, removed_ids = [], [], []
+        for item, removed in changes:
+            folder_id = False if removed else self.parent_of(item)
+            rows = existing.get(item['id'], [])
+            if folder_id is False:
+                removed_ids.extend(file_obj.pk for file_obj in rows)
+                continue
+            values = {
+                'name': item.get('name', ''),
+                'mime_type': item.get('mimeType', ''),
+                'size': int(item.get('size') or 0),
+                'folder_id': folder_id,
+                'drive_view_link': item.get('webViewLink'),
+                'drive_download_link': item.get('webContentLink'),
+            }
+            if not rows:
+                created.append(File(
+                    company_id=self.company_id,
+                    created_by=self.user,
+                    uploaded_by=self.user,
+                    original_name=values['name'],
+                    drive_file_id=item['id'],
+                    drive_sync_status='synced',
+                    **values,
+                ))
+                continue
+            for file_obj in rows:
+                # Local content is authoritative for size and type, and a folder without a
+                # Drive counterpart is not one Drive can move the file out of
+                changes_for_row = {field: value for field, value in values.items()
+                                   if not (file_obj.blob_id and field in ('size', 'mime_type'))
+                                   and not (field == 'folder_id' and file_obj.folder_id not in linked)}
+                if any(getattr(file_obj, field) != value for field, value in changes_for_row.items()):
+                    for field, value in changes_for_row.items():
+                        setattr(file_obj, field, value)
+                    file_obj.updated_at = now
+                    updated.append(file_obj)
+
+        if created:
+            File.objects.bulk_create(created)
+        if updated:
+            File.objects.bulk_update(updated, ['name', 'mime_type', 'size', 'folder', 'drive_view_link', 'drive_download_link', 'updated_at'])
+        if removed_ids:
+            gone = File.objects.filter(pk__in=removed_ids)
+            gone.filter(blob__isnull=False).update(updated_at=now, **UNLINKED)
+            gone.filter(blob__isnull=True).delete()
+        if created or updated:
+            # Bulk writes skip model signals, so refresh their search documents here
+            search_index.reindex('file', File.objects.filter(pk__in=[file_obj.pk for file_obj in created + updated]))
+        self.applied += len(created) + len(updated) + len(removed_ids)
+
+
+def drive_folder_for(token_data, folder):
+    """
+    Drive id of ``folder`` (the shared folder for None). A folder created in the
+    CRM gets its Drive counterpart here, under its parent's, which is created
+    the same way when missing.
+    """
+    if folder is None:
+        return drive_oauth_service.get_shared_folder_id()
+    if folder.drive_folder_id:
+        return folder.drive_folder_id
+    parent_id = drive_folder_for(token_data, folder.parent)
+    with transaction.atomic():
+        # Locked so concurrent uploads into a new folder create a single Drive folder
+        locked = Folder.objects.select_for_update().get(pk=folder.pk)
+        if not locked.drive_folder_id:
+            result = drive_oauth_service.create_folder(token_data, locked.name, parent_id)
+            if not result:
+                raise RuntimeError(f'Could not create the Drive folder for {locked.name}')
+            locked.drive_folder_id = result['id']
+            Folder.objects.filter(pk=locked.pk).update(drive_folder_id=locked.drive_folder_id)
+    folder.drive_folder_id = locked.drive_folder_id
+    return folder.drive_folder_id
+
+
+def _initial_listing(token_data, root_id):
+    """Every item under the shared folder, parents before children, shaped as changes"""
+    queue = [root_id]
+    while queue:
+        folder_id = queue.pop(0)
+        items = list(drive_oauth_service.iter_files(
+            token_data, query=f"'{folder_id}' in parents and trashed=false", fields=f'{FILE_FIELDS}, parents'
+        ))
+        yield [{'fileId': item['id'], 'removed': False, 'file': item} for item in items]
+        queue.extend(item['id'] for item in items if item.get('mimeType') == FOLDER_MIME_TYPE)
+
+
+def sync_user(user):
+    """Bring the user's company in line with Drive; returns the number of rows touched"""
+    tenant = resolve_tenant(user)
+    root_id = drive_oauth_service.get_shared_folder_id()
+    if not tenant or not root_id or not user.google_drive_connected or not user.google_drive_token:
+        return 0
+
+    token_data = user.google_drive_token
+    state, _ = DriveSyncState.objects.get_or_create(user=user, defaults={'company_id': tenant.company_id})
+    if state.company_id != tenant.company_id:
+        # The user switched companies: mirror into the new one from scratch
+        state.company_id, state.page_token = tenant.company_id, ''
+
+    mirror = DriveMirror(tenant.company_id, user, root_id)
+    try:
+        if not state.page_token:
+            # Take the cursor first so changes made during the walk are replayed next time
+            start_token = drive_oauth_service.get_start_page_token(token_data)
+            for changes in _initial_listing(token_data, root_id):
+                mirror.apply(changes)
+            state.page_token = start_token
+        else:
+            page_token = state.page_token
+            while page_token:
+                page = drive_oauth_service.list_changes(token_data, page_token)
+                mirror.apply(page.get('changes', []))
+                page_token = page.get('nextPageToken')
+                # Persist progress page by page so a failure resumes where it stopped
+                state.page_token = page_token or page.get('newStartPageToken', state.page_token)
+                DriveSyncState.objects.filter(pk=state.pk).update(page_token=state.page_token)
+    except Exception as e:
+        state.last_error = str(e)
+        state.save(update_fields=['company', 'page_token', 'last_error', 'updated_at'])
+        raise
+
+    state.last_error = ''
+    state.last_synced_at = timezone.now()
+    state.save(update_fields=['company', 'page_token', 'last_error', 'last_synced_at', 'updated_at'])
+    return mirror.applied
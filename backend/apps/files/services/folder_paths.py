@@ -0,0 +1,36 @@
+from collections import defaultdict
+
+
+def rebuild_paths(folder_model, company_id=None, batch_size=1000):
+    """
+    Recompute ``path``/``depth`` of every folder from the parent links.
+
+    Takes the model class so data migrations can pass their historical model.
+    Returns the number of folders whose path changed.
+    """
+    queryset = folder_model.objects.all()
+    if company_id is not None:
+        queryset = queryset.filter(company_id=company_id)
+
+    children = defaultdict(list)
+    current = {}
+    for pk, parent_id, path, depth in queryset.order_by().values_list('id', 'parent_id', 'path', 'depth'):
+        children[parent_id].append(pk)
+        current[pk] = (path, depth)
+
+    # Roots are folders without a parent or whose parent is outside the queryset
+    roots = [pk for parent_id, pks in children.items() if parent_id is None or parent_id not in current for pk in pks]
+    computed = {}
+    queue = [(pk, '') for pk in roots]
+    while queue:
+        next_queue = []
+        for pk, parent_path in queue:
+            if pk in computed:
+                continue
+            computed[pk] = (f'{parent_path}{pk}/', parent_path.count('/'))
+            next_queue.extend((child, computed[pk][0]) for child in children[pk])
+        queue = next_queue
+
+    changed = [folder_model(pk=pk, path=path, depth=depth) for pk, (path, depth) in computed.items() if current[pk] != (path, depth)]
+    folder_model.objects.bulk_update(changed, ['path', 'depth'], batch_size=batch_size)
+    return len(changed)
@@ -0,0 +1,94 @@
+"""
+Folder tree assembly.
+
+The tree is built from two flat queries (the folders, narrowed by materialized
+path and depth for subtrees, then the files of the included folders) and
+stitched together in memory through a parent -> children index, so the number
+of queries does not grow with the number of folders.
+"""
+import hashlib
+from collections import defaultdict
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+from apps.files.models import Folder, File
+
+FILE_FIELDS = ('id', 'name', 'original_name', 'mime_type', 'size')
+
+
+def tree_version(company_id):
+    """Cheap fingerprint of the company's folders and files; changes on every create, update and delete."""
+    folders = Folder.objects.for_company(company_id).order_by().aggregate(updated=Max('updated_at'), count=Count('id'))
+    files = File.objects.for_company(company_id).order_by().aggregate(updated=Max('updated_at'), count=Count('id'))
+    raw = f"{folders['updated']}:{folders['count']}:{files['updated']}:{files['count']}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def build_tree(company_id, root_id=None, max_depth=None):
+    """
+    Return ``{'folders': [...], 'root_files': [...]}`` for the whole company or,
+    with ``root_id``, for the contents of that folder. ``max_depth`` limits how
+    many folder levels are expanded; deeper nodes report ``has_children``.
+    """
+    folders = Folder.objects.for_company(company_id)
+    base_depth = 0
+    if root_id is not None:
+        root = folders.filter(pk=root_id).values('path', 'depth').first()
+        if root is None:
+            raise Folder.DoesNotExist
+        folders = folders.filter(path__startswith=root['path']).exclude(pk=root_id)
+        base_depth = root['depth'] + 1
+    if max_depth is not None:
+        # One level past the limit so the last expanded level can report has_children
+        folders = folders.filter(depth__lte=base_depth + max_depth)
+
+    children = defaultdict(list)
+    names = {}
+    for pk, parent_id, name in folders.order_by('name', 'id').values_list('id', 'parent_id', 'name'):
+        children[parent_id].append(pk)
+        names[pk] = name
+
+    # Breadth-first walk from the root; ``seen`` guards against parent cycles
+    nodes = {}
+    top_level = []
+    seen = set()
+    queue = [(pk, 1, None) for pk in children[root_id]]
+    while queue:
+        next_queue = []
+        for pk, depth, parent_node in queue:
+            if pk in seen:
+                continue
+            seen.add(pk)
+            node = {'id': pk, 'name': names[pk], 'type': 'folder', 'children': [], 'files': [],
+                    'has_children': bool(children[pk])}
+            nodes[pk] = node
+            (parent_node['children'] if parent_node else top_level).append(node)
+            if max_depth is None or depth < max_depth:
+                next_queue.extend((child, depth + 1, node) for child in children[pk])
+        queue = next_queue
+
+    files = File.objects.for_company(company_id).order_by('name', 'id')
+    if root_id is not None or max_depth is not None:
+        root = Q(folder_id=root_id) if root_id is not None else Q(folder__isnull=True)
+        files = files.filter(root | Q(folder_id__in=list(nodes)))
+
+    root_files = []
+    for row in files.values('folder_id', *FILE_FIELDS):
+        folder_id = row.pop('folder_id')
+        if folder_id == root_id:
+            root_files.append(row)
+        elif folder_id in nodes:
+            nodes[folder_id]['files'].append(row)
+
+    return {'folders': top_level, 'root_files': root_files}
+
+
+def get_cached_tree(company_id, root_id=None, max_depth=None, version=None):
+    """Build the tree once per (company, root, depth, version) and share it through the cache."""
+    version = version or tree_version(company_id)
+    key = f'files:tree:{company_id}:{root_id}:{max_depth}:{version}'
+    tree = cache.get(key)
+    if tree is None:
+        tree = build_tree(company_id, root_id, max_depth)
+        cache.set(key, tree, getattr(settings, 'FILES_TREE_CACHE_TIMEOUT', 300))
+    return tree
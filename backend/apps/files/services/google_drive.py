@@ -7,8 +7,10 @@ import io
 from typing import Optional, List, Dict, Any
 from django.conf import settings
 from google.oauth2 import service_account
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload, MediaIoBaseUpload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload, MediaIoBaseUpload, build_http
+from core.instrumentation import TimedHttp
 
 
 class GoogleDriveService:
@@ -30,7 +32,7 @@ class GoogleDriveService:
                 credentials_path,
                 scopes=self.SCOPES
             )
-            self.service = build('drive', 'v3', credentials=self.credentials)
+            self.service = build('drive', 'v3', http=TimedHttp(AuthorizedHttp(self.credentials, http=build_http()), 'drive'))
         else:
             # Try environment variable with JSON content
             credentials_json = getattr(settings, 'GOOGLE_DRIVE_CREDENTIALS_JSON', None)
@@ -41,7 +43,7 @@ class GoogleDriveService:
                     creds_dict,
                     scopes=self.SCOPES
                 )
-                self.service = build('drive', 'v3', credentials=self.credentials)
+                self.service = build('drive', 'v3', http=TimedHttp(AuthorizedHttp(self.credentials, http=build_http()), 'drive'))
     
     @property
     def is_configured(self) -> bool:
@@ -5,19 +5,31 @@ Requires: google-api-python-client, google-auth, google-auth-oauthlib
 import os
 import io
 import json
-from typing import Optional, List, Dict
+import hashlib
+import threading
+from datetime import datetime
+from typing import Optional, List, Dict, Iterator
 from django.conf import settings
-from django.core.cache import cache
 from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
+from google.auth.transport.requests import AuthorizedSession, Request
 from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.http import MediaIoBaseUpload, build_http
+from core.cache import LRUCache
+from core.instrumentation import TimedHttp, external_call
+
+
+FILE_FIELDS = 'id, name, mimeType, size, createdTime, modifiedTime, webViewLink, webContentLink'
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
 
 
 class GoogleDriveOAuthService:
     """Google Drive API wrapper using OAuth 2.0"""
     
+    BATCH_SIZE = 100  # Drive allows at most 100 calls per batch request
+    
     SCOPES = [
         'https://www.googleapis.com/auth/drive.file',
         'https://www.googleapis.com/auth/drive'
@@ -25,6 +37,7 @@ class GoogleDriveOAuthService:
     
     def __init__(self):
         self.client_config = None
+        self._local = threading.local()
         self._load_client_config()
     
     def _load_client_config(self):
@@ -80,7 +93,8 @@ class GoogleDriveOAuthService:
                 'token_uri': credentials.token_uri,
                 'client_id': credentials.client_id,
                 'client_secret': credentials.client_secret,
-                'scopes': list(credentials.scopes)
+                'scopes': list(credentials.scopes),
+                'expiry': credentials.expiry.isoformat() if credentials.expiry else None
             }
         except Exception as e:
             print(f"Error exchanging code: {e}")
@@ -91,13 +105,15 @@ class GoogleDriveOAuthService:
         if not token_data:
             return None
         
+        expiry = token_data.get('expiry')
         credentials = Credentials(
             token=token_data.get('access_token'),
             refresh_token=token_data.get('refresh_token'),
             token_uri=token_data.get('token_uri', 'https://oauth2.googleapis.com/token'),
             client_id=token_data.get('client_id'),
             client_secret=token_data.get('client_secret'),
-            scopes=token_data.get('scopes', self.SCOPES)
+            scopes=token_data.get('scopes', self.SCOPES),
+            expiry=datetime.fromisoformat(expiry) if expiry else None
         )
         
         # Refresh if expired
@@ -107,15 +123,79 @@ class GoogleDriveOAuthService:
             except Exception as e:
                 print(f"Error refreshing token: {e}")
                 return None
+            self._persist_token(token_data, credentials)
         
         return credentials
     
+    def _persist_token(self, token_data: Dict, credentials: Credentials):
+        """Write a refreshed access token back to the user so the next call can reuse it"""
+        token_data['access_token'] = credentials.token
+        token_data['expiry'] = credentials.expiry.isoformat() if credentials.expiry else None
+        if token_data.get('refresh_token'):
+            from apps.accounts.models import User
+            User.objects.filter(
+                google_drive_token__refresh_token=token_data['refresh_token']
+            ).update(google_drive_token=token_data)
+    
+    def _client_key(self, token_data: Dict) -> str:
+        secret = token_data.get('refresh_token') or token_data.get('access_token') or ''
+        return hashlib.sha256(secret.encode()).hexdigest()
+    
+    def _client_cache(self) -> LRUCache:
+        # httplib2 connections are not thread-safe, so every thread keeps its own clients
+        clients = getattr(self._local, 'clients', None)
+        if clients is None:
+            clients = self._local.clients = LRUCache(
+                getattr(settings, 'GOOGLE_DRIVE_CLIENT_CACHE_SIZE', 64),
+                getattr(settings, 'GOOGLE_DRIVE_CLIENT_TTL', 1800)
+            )
+        return clients
+    
     def get_service(self, token_data: Dict):
-        """Get Google Drive service for user"""
+        """Get Google Drive service for user, reusing the thread's cached client and connection"""
+        client = self._get_client(token_data)
+        return client[0] if client else None
+    
+    def _get_client(self, token_data: Dict) -> Optional[tuple]:
+        """(service, credentials, media session) of the user, cached per thread"""
+        if not token_data:
+            return None
+        
+        clients = self._client_cache()
+        key = self._client_key(token_data)
+        cached = clients.get(key)
+        if cached is not None:
+            credentials = cached[1]
+            if credentials.expired and credentials.refresh_token:
+                try:
+                    credentials.refresh(Request())
+                except Exception as e:
+                    print(f"Error refreshing token: {e}")
+                    clients.pop(key)
+                    return None
+            # Tokens refreshed here or transparently after a 401 are written back once
+            if credentials.token != token_data.get('access_token'):
+                self._persist_token(token_data, credentials)
+            return cached
+        
         credentials = self.get_credentials(token_data)
         if not credentials:
             return None
-        return build('drive', 'v3', credentials=credentials)
+        endpoint = getattr(settings, 'GOOGLE_DRIVE_API_ENDPOINT', None)
+        # Same transport build() makes from credentials, timed as 'drive' external calls
+        http = TimedHttp(AuthorizedHttp(credentials, http=build_http()), 'drive')
+        if endpoint:
+            # api_endpoint only moves method calls; uploads and batches use the document's root URL
+            document = json.loads(get_static_doc('drive', 'v3'))
+            document['rootUrl'] = document['mtlsRootUrl'] = endpoint
+            service = build_from_document(document, http=http)
+        else:
+            service = build('drive', 'v3', http=http, cache_discovery=False)
+        # httplib2 reads whole bodies into memory, so media is streamed through requests;
+        # the session keeps its connections open between downloads like the service does
+        client = (service, credentials, AuthorizedSession(credentials))
+        clients.set(key, client)
+        return client
     
     def get_shared_folder_id(self) -> Optional[str]:
         """Get the shared folder ID from settings"""
@@ -123,30 +203,125 @@ class GoogleDriveOAuthService:
     
     def list_files(self, token_data: Dict, folder_id: Optional[str] = None) -> List[Dict]:
         """List files in Drive"""
+        try:
+            return list(self.iter_files(token_data, folder_id))
+        except Exception as e:
+            print(f"Error listing files: {e}")
+            return []
+    
+    def iter_files(self, token_data: Dict, folder_id: Optional[str] = None, query: Optional[str] = None,
+                   page_size: int = 1000, fields: str = FILE_FIELDS) -> Iterator[Dict]:
+        """Yield every file matching the query, following nextPageToken across pages"""
         service = self.get_service(token_data)
         if not service:
-            return []
+            return
         
-        folder_id = folder_id or self.get_shared_folder_id()
-        query = f"'{folder_id}' in parents and trashed=false" if folder_id else "trashed=false"
+        if query is None:
+            folder_id = folder_id or self.get_shared_folder_id()
+            query = f"'{folder_id}' in parents and trashed=false" if folder_id else "trashed=false"
         
-        try:
+        page_token = None
+        while True:
             results = service.files().list(
                 q=query,
-                pageSize=100,
-                fields="files(id, name, mimeType, size, createdTime, webViewLink, webContentLink)"
+                pageSize=page_size,
+                pageToken=page_token,
+                fields=f"nextPageToken, files({fields})"
             ).execute()
-            return results.get('files', [])
-        except Exception as e:
-            print(f"Error listing files: {e}")
-            return []
+            yield from results.get('files', [])
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return
+    
+    def get_start_page_token(self, token_data: Dict) -> str:
+        """Cursor for changes made after this call"""
+        service = self.get_service(token_data)
+        if not service:
+            raise RuntimeError('Google Drive credentials unavailable')
+        return service.changes().getStartPageToken().execute()['startPageToken']
+    
+    def list_changes(self, token_data: Dict, page_token: str, page_size: int = 1000) -> Dict:
+        """
+        One page of the changes feed. The response carries ``nextPageToken``
+        while more pages follow and ``newStartPageToken`` on the last one.
+        """
+        service = self.get_service(token_data)
+        if not service:
+            raise RuntimeError('Google Drive credentials unavailable')
+        return service.changes().list(
+            pageToken=page_token,
+            pageSize=page_size,
+            includeRemoved=True,
+            spaces='drive',
+            fields=f'nextPageToken, newStartPageToken, changes(fileId, removed, file({FILE_FIELDS}, parents, trashed))'
+        ).execute()
+    
+    def batch_execute(self, token_data: Dict, build_request, file_ids: List[str]) -> Dict[str, tuple]:
+        """
+        Run ``build_request(files_resource, file_id)`` for every id through Drive
+        batch requests (100 calls per HTTP round trip). Returns
+        ``{file_id: (response, exception)}``.
+        """
+        service = self.get_service(token_data)
+        if not service:
+            raise RuntimeError('Google Drive credentials unavailable')
+        
+        file_ids = list(dict.fromkeys(file_ids))
+        results = {}
+        
+        def callback(request_id, response, exception):
+            results[request_id] = (response, exception)
+        
+        for offset in range(0, len(file_ids), self.BATCH_SIZE):
+            batch = service.new_batch_http_request(callback=callback)
+            for file_id in file_ids[offset:offset + self.BATCH_SIZE]:
+                batch.add(build_request(service.files(), file_id), request_id=file_id)
+            batch.execute()
+        return results
+    
+    def get_files_info(self, token_data: Dict, file_ids: List[str]) -> Dict[str, Dict]:
+        """Metadata of many files; missing or inaccessible ids are left out"""
+        results = self.batch_execute(
+            token_data, lambda files, file_id: files.get(fileId=file_id, fields=f'{FILE_FIELDS}, parents'), file_ids
+        )
+        return {file_id: response for file_id, (response, exception) in results.items() if exception is None}
+    
+    def delete_files(self, token_data: Dict, file_ids: List[str]) -> Dict[str, bool]:
+        """Delete many files; returns success per id"""
+        results = self.batch_execute(token_data, lambda files, file_id: files.delete(fileId=file_id), file_ids)
+        return {file_id: exception is None for file_id, (response, exception) in results.items()}
+    
+    def move_files(self, token_data: Dict, file_ids: List[str], parent_id: str) -> Dict[str, bool]:
+        """Move many files under ``parent_id``; one batch to read current parents, one to move"""
+        current = self.get_files_info(token_data, file_ids)
+        results = self.batch_execute(
+            token_data,
+            lambda files, file_id: files.update(
+                fileId=file_id,
+                addParents=parent_id,
+                removeParents=','.join(current[file_id].get('parents', [])),
+                fields='id, parents'
+            ),
+            list(current)
+        )
+        moved = {file_id: exception is None for file_id, (response, exception) in results.items()}
+        return {file_id: moved.get(file_id, False) for file_id in file_ids}
     
     def upload_file(self, token_data: Dict, file_content: bytes, filename: str, 
                     mime_type: str, folder_id: Optional[str] = None) -> Optional[Dict]:
         """Upload a file to Google Drive"""
+        try:
+            return self.upload_stream(token_data, io.BytesIO(file_content), filename, mime_type, folder_id)
+        except Exception as e:
+            print(f"Error uploading file: {e}")
+            return None
+
+    def upload_stream(self, token_data: Dict, stream, filename: str, mime_type: str,
+                      folder_id: Optional[str] = None, chunksize: int = 8 * 1024 * 1024) -> Dict:
+        """Resumable chunked upload from a file object; raises on failure"""
         service = self.get_service(token_data)
         if not service:
-            return None
+            raise RuntimeError('Google Drive credentials unavailable')
         
         folder_id = folder_id or self.get_shared_folder_id()
         
@@ -154,41 +329,50 @@ class GoogleDriveOAuthService:
         if folder_id:
             file_metadata['parents'] = [folder_id]
         
-        try:
-            media = MediaIoBaseUpload(
-                io.BytesIO(file_content),
-                mimetype=mime_type,
-                resumable=True
-            )
-            file = service.files().create(
-                body=file_metadata,
-                media_body=media,
-                fields='id, name, mimeType, size, webViewLink, webContentLink'
-            ).execute()
-            return file
-        except Exception as e:
-            print(f"Error uploading file: {e}")
-            return None
+        media = MediaIoBaseUpload(
+            stream,
+            mimetype=mime_type or 'application/octet-stream',
+            chunksize=chunksize,
+            resumable=True
+        )
+        request = service.files().create(
+            body=file_metadata,
+            media_body=media,
+            fields='id, name, mimeType, size, webViewLink, webContentLink'
+        )
+        response = None
+        while response is None:
+            status, response = request.next_chunk(num_retries=3)
+        return response
     
     def download_file(self, token_data: Dict, file_id: str) -> Optional[bytes]:
         """Download a file from Google Drive"""
-        service = self.get_service(token_data)
-        if not service:
-            return None
-        
         try:
-            request = service.files().get_media(fileId=file_id)
-            file_buffer = io.BytesIO()
-            downloader = MediaIoBaseDownload(file_buffer, request)
-            
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
-            
-            return file_buffer.getvalue()
+            return b''.join(self.iter_file(token_data, file_id))
         except Exception as e:
             print(f"Error downloading file: {e}")
             return None
+
+    def iter_file(self, token_data: Dict, file_id: str, start: int = 0, end: Optional[int] = None,
+                  chunksize: int = 1024 * 1024) -> Iterator[bytes]:
+        """Yield the file's bytes (optionally only ``start``-``end`` inclusive) as one streamed response"""
+        client = self._get_client(token_data)
+        if not client:
+            raise RuntimeError('Google Drive credentials unavailable')
+        service, _credentials, session = client
+
+        request = service.files().get_media(fileId=file_id)
+        headers = {}
+        if start or end is not None:
+            headers['Range'] = f"bytes={start}-{'' if end is None else end}"
+        with external_call('drive'):
+            response = session.get(request.uri, headers=headers, stream=True, timeout=60)
+        try:
+            response.raise_for_status()
+            yield from response.iter_content(chunksize)
+        finally:
+            # A fully read response hands its connection back to the session's pool
+            response.close()
     
     def create_folder(self, token_data: Dict, folder_name: str, 
                       parent_id: Optional[str] = None) -> Optional[Dict]:
@@ -232,6 +416,22 @@ class GoogleDriveOAuthService:
             print(f"Error getting file info: {e}")
             return None
 
+    def copy_file(self, token_data: Dict, file_id: str, name: str) -> Optional[Dict]:
+        """Server-side copy of a Drive file; no content passes through us"""
+        service = self.get_service(token_data)
+        if not service:
+            return None
+        
+        try:
+            return service.files().copy(
+                fileId=file_id,
+                body={'name': name},
+                fields='id, name, mimeType, size, webViewLink, webContentLink'
+            ).execute()
+        except Exception as e:
+            print(f"Error copying file: {e}")
+            return None
+
     def delete_file(self, token_data: Dict, file_id: str) -> bool:
         """Delete a file from Google Drive"""
         service = self.get_service(token_data)
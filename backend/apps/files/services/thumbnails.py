@@ -0,0 +1,104 @@
+"""
+Thumbnail and preview derivatives.
+
+Derivatives belong to the content-addressed ``Blob``, so every file sharing
+the same bytes shares one thumbnail and one preview. Images are decoded with
+Pillow; PDFs have their first page rendered with PyMuPDF (in
+requirements/base.txt; without it PDFs are marked ``unsupported``).
+Generation runs in Celery (``apps.files.tasks.generate_thumbnails``), queued
+when a file with stored content is created.
+"""
+import io
+import logging
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps
+
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+from apps.files.models import Blob
+
+logger = logging.getLogger(__name__)
+
+FORMAT, CONTENT_TYPE, EXTENSION = 'WEBP', 'image/webp', 'webp'
+
+
+def is_supported(mime_type):
+    mime_type = mime_type or ''
+    if mime_type.startswith('image/') and mime_type != 'image/svg+xml':
+        return True
+    return mime_type == 'application/pdf' and pymupdf is not None
+
+
+def _sizes():
+    return getattr(settings, 'FILES_PREVIEW_SIZE', 1024), getattr(settings, 'FILES_THUMBNAIL_SIZE', 256)
+
+
+def _open_image(handle, preview_size):
+    image = Image.open(handle)
+    # JPEG can decode at a reduced scale, which skips most of the work for large photos
+    image.draft('RGB', (preview_size, preview_size))
+    return ImageOps.exif_transpose(image)
+
+
+def _render_pdf(handle, preview_size):
+    with pymupdf.open(stream=handle.read(), filetype='pdf') as document:
+        page = document[0]
+        zoom = preview_size / max(page.rect.width, page.rect.height)
+        pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+        return Image.frombytes('RGB', (pixmap.width, pixmap.height), pixmap.samples)
+
+
+def _encode(image):
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, FORMAT, quality=80, method=4)
+    return ContentFile(buffer.getvalue())
+
+
+def generate(blob, mime_type):
+    """Render and store the blob's preview and thumbnail; returns the resulting status."""
+    if not is_supported(mime_type):
+        Blob.objects.filter(pk=blob.pk).update(thumbnail_status='unsupported')
+        return 'unsupported'
+
+    preview_size, thumbnail_size = _sizes()
+    try:
+        with blob.file.open('rb') as handle:
+            if mime_type == 'application/pdf':
+                image = _render_pdf(handle, preview_size)
+            else:
+                image = _open_image(handle, preview_size)
+            image.thumbnail((preview_size, preview_size), Image.Resampling.LANCZOS)
+            preview = _encode(image)
+            image.thumbnail((thumbnail_size, thumbnail_size), Image.Resampling.LANCZOS)
+            thumbnail = _encode(image)
+    except Exception:
+        logger.exception('Error generating thumbnail for blob %s', blob.pk)
+        Blob.objects.filter(pk=blob.pk).update(thumbnail_status='failed')
+        return 'failed'
+
+    blob.preview.save(f'{blob.sha256}-{preview_size}.{EXTENSION}', preview, save=False)
+    blob.thumbnail.save(f'{blob.sha256}-{thumbnail_size}.{EXTENSION}', thumbnail, save=False)
+    blob.thumbnail_status = 'ready'
+    Blob.objects.filter(pk=blob.pk).update(thumbnail=blob.thumbnail.name, preview=blob.preview.name, thumbnail_status='ready')
+    return 'ready'
+
+
+def schedule(file_obj):
+    """Queue derivative generation for the file's blob once the surrounding transaction commits."""
+    blob = file_obj.blob
+    if blob is None or blob.thumbnail_status != 'pending':
+        return False
+    if not is_supported(file_obj.mime_type):
+        Blob.objects.filter(pk=blob.pk).update(thumbnail_status='unsupported')
+        blob.thumbnail_status = 'unsupported'
+        return False
+    from apps.files.tasks import generate_thumbnails
+    transaction.on_commit(lambda: generate_thumbnails.delay(blob.pk, file_obj.mime_type), robust=True)
+    return True
@@ -0,0 +1,12 @@
+import hashlib
+
+
+def digest_upload(uploaded_file, chunk_size=1024 * 1024):
+    """SHA-256 hex digest and size of an upload, read chunk by chunk and rewound afterwards."""
+    sha256 = hashlib.sha256()
+    size = 0
+    for chunk in uploaded_file.chunks(chunk_size):
+        sha256.update(chunk)
+        size += len(chunk)
+    uploaded_file.seek(0)
+    return sha256.hexdigest(), size
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import File
+from .services import blobs, thumbnails
+
+
+@receiver(post_save, sender=File)
+def acquire_blob(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.blob_id:
+        blobs.acquire(instance.blob_id)
+        thumbnails.schedule(instance)
+
+
+@receiver(post_delete, sender=File)
+def release_blob(sender, instance, **kwargs):
+    if instance.blob_id:
+        blobs.release(instance.blob_id)
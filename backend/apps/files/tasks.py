@@ -0,0 +1,107 @@
+from celery import shared_task
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from .models import Blob, File, FileArchive
+from .services import archives, blobs, drive_sync, thumbnails
+from .services.google_drive_oauth import drive_oauth_service
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def sync_file_to_drive(self, file_id, user_id):
+    """Upload a stored file to the user's Google Drive with a chunked resumable upload."""
+    # Claim the file so concurrent workers do not upload it twice
+    claimed = File.objects.filter(pk=file_id, drive_sync_status__in=['pending', 'failed']).update(drive_sync_status='syncing')
+    if not claimed:
+        return None
+
+    file_obj = File.objects.select_related('folder').get(pk=file_id)
+    user = get_user_model().objects.filter(pk=user_id, google_drive_connected=True).first()
+    if not user or not user.google_drive_token or not file_obj.file:
+        File.objects.filter(pk=file_id).update(drive_sync_status='failed', drive_sync_error='Google Drive not connected or no file content')
+        return None
+
+    try:
+        # Into the folder's Drive counterpart, or the mirror would move the file to the shared root
+        parent_id = drive_sync.drive_folder_for(user.google_drive_token, file_obj.folder)
+        with file_obj.file.open('rb') as handle:
+            result = drive_oauth_service.upload_stream(user.google_drive_token, handle, file_obj.original_name,
+                                                       file_obj.mime_type, parent_id)
+    except Exception as e:
+        File.objects.filter(pk=file_id).update(drive_sync_status='failed', drive_sync_error=str(e))
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+        return None
+
+    File.objects.filter(pk=file_id).update(
+        drive_sync_status='synced',
+        drive_sync_error='',
+        drive_file_id=result.get('id'),
+        drive_view_link=result.get('webViewLink'),
+        drive_download_link=result.get('webContentLink'),
+    )
+    return result.get('id')
+
+
+@shared_task
+def generate_thumbnails(blob_id, mime_type):
+    """Render the thumbnail and preview of a stored blob."""
+    blob = Blob.objects.filter(pk=blob_id, thumbnail_status='pending').first()
+    if blob is None:
+        return None
+    return thumbnails.generate(blob, mime_type)
+
+
+@shared_task
+def collect_orphan_blobs():
+    """Remove stored blobs no file references any more."""
+    return blobs.collect_orphans()
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def sync_drive_changes(self, user_id):
+    """Apply the user's pending Drive changes to the CRM."""
+    user = get_user_model().objects.filter(pk=user_id, google_drive_connected=True).first()
+    if not user:
+        return 0
+    try:
+        return drive_sync.sync_user(user)
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+        return 0
+
+
+@shared_task
+def poll_drive_changes():
+    """Queue a changes sync for every user with Google Drive connected."""
+    user_ids = list(get_user_model().objects.filter(google_drive_connected=True).values_list('pk', flat=True))
+    for user_id in user_ids:
+        sync_drive_changes.delay(user_id)
+    return len(user_ids)
+
+
+@shared_task
+def build_file_archive(archive_id):
+    """Build a requested ZIP archive."""
+    claimed = FileArchive.objects.filter(pk=archive_id, status='pending').update(status='building')
+    if not claimed:
+        return None
+    archive = FileArchive.objects.select_related('folder', 'created_by').get(pk=archive_id)
+    try:
+        archives.build(archive)
+    except Exception as e:
+        FileArchive.objects.filter(pk=archive_id).update(status='failed', error=str(e))
+        return None
+    return archive.file_count
+
+
+@shared_task
+def purge_expired_archives():
+    """Delete archives past their expiry together with their ZIP files."""
+    removed = 0
+    for archive in FileArchive.objects.filter(expires_at__lt=timezone.now()).iterator():
+        if archive.file:
+            archive.file.delete(save=False)
+        archive.delete()
+        removed += 1
+    return removed
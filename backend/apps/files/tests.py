@@ -0,0 +1,382 @@
+import hashlib
+import io
+import json
+import re
+import threading
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import pymupdf
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+from core.testing import QueryCountTestCase
+from .models import File, Folder
+from .services import downloads, drive_sync, thumbnails
+from .services.google_drive_oauth import FOLDER_MIME_TYPE
+from .tasks import sync_file_to_drive
+
+
+class FolderQueryCountTests(QueryCountTestCase):
+    def make_folder(self, i, parent=None):
+        folder = Folder.objects.create(company=self.company, name=f'Folder {i}', parent=parent)
+        Folder.objects.create(company=self.company, name=f'Sub {i}', parent=folder)
+        File.objects.create(company=self.company, folder=folder, name=f'f{i}', original_name='f', mime_type='text/plain')
+        return folder
+
+    def test_folder_list(self):
+        self.assertConstantQueries('/api/v1/files/folders/?parent__isnull=true', self.make_folder)
+        counts = {row['name']: (row['file_count'], row['subfolder_count'])
+                  for row in self.client.get('/api/v1/files/folders/').data['results']}
+        self.assertEqual(counts['Folder 0'], (1, 1))
+        self.assertEqual(counts['Sub 0'], (0, 0))
+
+    def test_folder_descendants(self):
+        root = Folder.objects.create(company=self.company, name='Root')
+        url = f'/api/v1/files/folders/{root.pk}/descendants/'
+        self.assertConstantQueries(url, lambda i: self.make_folder(i, parent=root))
+        counts = {row['name']: (row['file_count'], row['subfolder_count']) for row in self.client.get(url).data['results']}
+        self.assertEqual(counts['Folder 0'], (1, 1))
+        self.assertEqual(counts['Sub 0'], (0, 0))
+
+    def test_file_list(self):
+        folder = Folder.objects.create(company=self.company, name='Docs')
+        self.assertConstantQueries(
+            '/api/v1/files/list/',
+            lambda i: File.objects.create(company=self.company, folder=folder, name=f'f{i}', original_name='f', mime_type='text/plain'),
+        )
+
+
+class FolderTreeTests(QueryCountTestCase):
+    def test_moving_a_folder_re_roots_its_subtree(self):
+        top = Folder.objects.create(company=self.company, name='Top')
+        moved = Folder.objects.create(company=self.company, name='Moved', parent=top)
+        leaf = Folder.objects.create(company=self.company, name='Leaf', parent=moved)
+        other = Folder.objects.create(company=self.company, name='Other')
+
+        moved.parent = other
+        moved.save()
+        leaf.refresh_from_db()
+        self.assertEqual((leaf.path, leaf.depth), (f'{other.pk}/{moved.pk}/{leaf.pk}/', 2))
+        self.assertFalse(top.descendants().exists())
+        self.assertEqual(set(other.descendants()), {moved, leaf})
+
+        moved.parent = None
+        moved.save(update_fields=['parent'])
+        leaf.refresh_from_db()
+        self.assertEqual((leaf.path, leaf.depth), (f'{moved.pk}/{leaf.pk}/', 1))
+        self.assertEqual(list(leaf.ancestors()), [moved])
+
+
+class FileContentTests(QueryCountTestCase):
+    def upload(self, content, name='a.txt', content_type='text/plain'):
+        upload = SimpleUploadedFile(name, content, content_type=content_type)
+        response = self.client.post('/api/v1/files/list/', {'name': name, 'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 201, response.content[:300])
+        return File.objects.get(pk=response.data['id'])
+
+    def test_replacing_content_moves_blob_reference(self):
+        file_obj = self.upload(b'old content')
+        old_blob = file_obj.blob
+
+        response = self.client.patch(f'/api/v1/files/list/{file_obj.pk}/', {'file': SimpleUploadedFile('b.txt', b'new content')},
+                                     format='multipart')
+        self.assertEqual(response.status_code, 200, response.content[:300])
+        file_obj.refresh_from_db()
+        old_blob.refresh_from_db()
+        self.assertNotEqual(file_obj.blob_id, old_blob.pk)
+        self.assertEqual(file_obj.sha256, hashlib.sha256(b'new content').hexdigest())
+        self.assertEqual((file_obj.file.name, file_obj.size, file_obj.original_name), (file_obj.blob.file.name, 11, 'b.txt'))
+        self.assertEqual((old_blob.ref_count, file_obj.blob.ref_count), (0, 1))
+
+        copy = self.client.post(f'/api/v1/files/list/{file_obj.pk}/copy/')
+        self.assertEqual(File.objects.get(pk=copy.data['id']).blob_id, file_obj.blob_id)
+
+    def test_rename_keeps_content(self):
+        file_obj = self.upload(b'content')
+        self.client.patch(f'/api/v1/files/list/{file_obj.pk}/', {'name': 'renamed'}, format='json')
+        file_obj.refresh_from_db()
+        self.assertEqual((file_obj.name, file_obj.blob.ref_count), ('renamed', 1))
+
+    def test_pdf_thumbnail(self):
+        document = pymupdf.open()
+        document.new_page(width=595, height=842).insert_text((72, 72), 'Teklif')
+        file_obj = self.upload(document.tobytes(), name='teklif.pdf', content_type='application/pdf')
+        self.assertEqual(file_obj.mime_type, 'application/pdf')
+
+        self.assertEqual(thumbnails.generate(file_obj.blob, file_obj.mime_type), 'ready')
+        response = self.client.get(f'/api/v1/files/list/{file_obj.pk}/thumbnail/')
+        self.assertEqual((response.status_code, response['Content-Type']), (200, 'image/webp'))
+        with Image.open(io.BytesIO(b''.join(response.streaming_content))) as image:
+            self.assertEqual(max(image.size), 256)
+
+
+class FakeDrive(BaseHTTPRequestHandler):
+    """
+    The Drive v3 calls the CRM makes, answered from ``server.items``, ``server.changes``
+    and ``server.media``. Writes update ``server.items`` and add to the changes feed.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if parse_qs(url.query).get('alt') == ['media']:
+            return self.send_media(self.server.media[url.path.rsplit('/', 1)[-1]])
+        self.send_json(*self.api('GET', self.path, b''))
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        if urlsplit(self.path).path.startswith('/batch/'):
+            return self.send_batch(body)
+        if parse_qs(urlsplit(self.path).query).get('uploadType') == ['resumable']:
+            # Resumable session: the metadata now, the content in the PUT to Location
+            self.server.uploads.append(json.loads(body))
+            self.send_response(200)
+            self.send_header('Location', f"http://{self.headers['Host']}{self.path}&upload_id={len(self.server.uploads) - 1}")
+            self.send_header('Content-Length', '0')
+            return self.end_headers()
+        self.send_json(*self.api('POST', self.path, body))
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        metadata = self.server.uploads[int(parse_qs(urlsplit(self.path).query)['upload_id'][0])]
+        item = self.write({**metadata, 'size': str(len(body))})
+        self.server.media[item['id']] = body
+        self.send_json(200, item)
+
+    def do_PATCH(self):
+        self.send_json(*self.api('PATCH', self.path, self.rfile.read(int(self.headers['Content-Length']))))
+
+    def api(self, method, path, body):
+        url = urlsplit(path)
+        query = parse_qs(url.query)
+        file_id = url.path.rsplit('/', 1)[-1]
+        if method == 'POST':
+            return 200, self.write(json.loads(body))
+        if method == 'PATCH':
+            parents = [parent for parent in self.server.items[file_id]['parents'] if parent not in query.get('removeParents', [])]
+            return 200, self.write({**self.server.items[file_id], 'parents': parents + query.get('addParents', [])})
+        if url.path.endswith('/changes/startPageToken'):
+            return 200, {'startPageToken': '1'}
+        if url.path.endswith('/changes'):
+            changes, self.server.changes = self.server.changes, []
+            return 200, {'changes': changes, 'newStartPageToken': '2'}
+        if file_id in self.server.items:
+            return 200, self.server.items[file_id]
+        if file_id != 'files':
+            return 404, {'error': {'code': 404, 'message': 'File not found'}}
+        parent = re.match(r"'([^']+)' in parents", query['q'][0]).group(1)
+        return 200, {'files': [item for item in self.server.items.values() if parent in item['parents']]}
+
+    def write(self, item):
+        item = {'parents': ['root'], **item}
+        item.setdefault('id', f'drive-{len(self.server.items)}')
+        self.server.items[item['id']] = item
+        self.server.changes.append({'fileId': item['id'], 'file': item})
+        return item
+
+    def send_batch(self, body):
+        message = BytesParser().parsebytes(f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body)
+        parts = []
+        for part in message.get_payload():
+            request_line, _, rest = part.get_payload().partition('\n')
+            method, path, _version = request_line.split(' ')
+            status, response = self.api(method, path, rest.partition('\n\n')[2].encode())
+            parts.append(f"--batch\r\nContent-Type: application/http\r\nContent-ID: <response-{part['Content-ID'][1:-1]}>\r\n\r\n"
+                         f"HTTP/1.1 {status} OK\r\nContent-Type: application/json\r\n\r\n{json.dumps(response)}\r\n")
+        self.send(200, (''.join(parts) + '--batch--\r\n').encode(), 'multipart/mixed; boundary=batch')
+
+    def send_json(self, status, body):
+        self.send(status, json.dumps(body).encode(), 'application/json')
+
+    def send_media(self, content):
+        self.server.media_connections.add(self.client_address)
+        match = re.match(r'bytes=(\d+)-(\d*)$', self.headers.get('Range', ''))
+        if not match:
+            return self.send(200, content, 'application/octet-stream')
+        start = int(match[1])
+        end = int(match[2]) if match[2] else len(content) - 1
+        self.send(206, content[start:end + 1], 'application/octet-stream')
+
+    def send(self, status, content, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeDriveTestCase(QueryCountTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeDrive)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+        cls.enterClassContext(override_settings(
+            GOOGLE_DRIVE_API_ENDPOINT=f'http://127.0.0.1:{cls.server.server_port}/',
+            GOOGLE_DRIVE_FOLDER_ID='root',
+        ))
+
+    def setUp(self):
+        super().setUp()
+        # Clients are cached per token, so each server gets its own
+        self.user.google_drive_token = {'access_token': f'token-{self.server.server_port}'}
+        self.user.google_drive_connected = True
+        self.user.save(update_fields=['google_drive_token', 'google_drive_connected'])
+        self.server.items, self.server.changes, self.server.media = {}, [], {}
+        self.server.media_connections, self.server.uploads = set(), []
+
+
+class DriveMirrorTests(FakeDriveTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server.items = {
+            'docs': {'id': 'docs', 'name': 'Docs', 'mimeType': FOLDER_MIME_TYPE, 'parents': ['root']},
+            'old': {'id': 'old', 'name': 'Old', 'mimeType': FOLDER_MIME_TYPE, 'parents': ['docs']},
+            'report': {'id': 'report', 'name': 'report.txt', 'mimeType': 'text/plain', 'size': '5', 'parents': ['old']},
+        }
+        drive_sync.sync_user(self.user)
+
+    def sync(self, *changes):
+        self.server.changes = list(changes)
+        return drive_sync.sync_user(self.user)
+
+    def test_initial_listing(self):
+        docs = Folder.objects.get(drive_folder_id='docs')
+        old = Folder.objects.get(drive_folder_id='old')
+        self.assertEqual((docs.parent_id, old.parent_id), (None, docs.pk))
+        self.assertEqual(old.path, f'{docs.pk}/{old.pk}/')
+        self.assertEqual(File.objects.get(drive_file_id='report').folder_id, old.pk)
+
+    def test_rename_and_move(self):
+        self.sync(
+            {'fileId': 'old', 'file': {'id': 'old', 'name': 'Archive', 'mimeType': FOLDER_MIME_TYPE, 'parents': ['root']}},
+            {'fileId': 'report', 'file': {**self.server.items['report'], 'name': 'final.txt', 'parents': ['docs']}},
+        )
+        archive = Folder.objects.get(drive_folder_id='old')
+        self.assertEqual((archive.name, archive.parent_id, archive.path), ('Archive', None, f'{archive.pk}/'))
+        report = File.objects.get(drive_file_id='report')
+        self.assertEqual((report.name, report.folder_id), ('final.txt', Folder.objects.get(drive_folder_id='docs').pk))
+
+    def test_remote_delete_keeps_crm_rows(self):
+        docs = Folder.objects.get(drive_folder_id='docs')
+        old = Folder.objects.get(drive_folder_id='old')
+        notes = Folder.objects.create(company=self.company, name='Notes', parent=old)
+        draft = File.objects.create(company=self.company, folder=old, name='draft', original_name='draft', mime_type='text/plain')
+
+        self.sync({'fileId': 'old', 'removed': True})
+
+        self.assertFalse(Folder.objects.filter(drive_folder_id='old').exists())
+        self.assertFalse(File.objects.filter(drive_file_id='report').exists())
+        notes.refresh_from_db()
+        self.assertEqual((notes.parent_id, notes.path), (docs.pk, f'{docs.pk}/{notes.pk}/'))
+        draft.refresh_from_db()
+        self.assertEqual(draft.folder_id, docs.pk)
+
+
+class DriveWriteBackTests(FakeDriveTestCase):
+    """Changes the CRM makes on Drive come back through the changes feed without moving anything."""
+
+    def setUp(self):
+        super().setUp()
+        drive_sync.sync_user(self.user)
+
+    def test_upload_into_folder_then_poll(self):
+        # Created while Drive was not connected, so neither has a Drive folder yet
+        clients = Folder.objects.create(company=self.company, name='Clients')
+        contracts = Folder.objects.create(company=self.company, name='Contracts', parent=clients)
+        upload = SimpleUploadedFile('contract.txt', b'signed', content_type='text/plain')
+        response = self.client.post('/api/v1/files/list/', {'name': 'contract.txt', 'file': upload, 'folder': contracts.pk}, format='multipart')
+        self.assertEqual(response.status_code, 201, response.content[:300])
+        sync_file_to_drive(response.data['id'], self.user.pk)
+
+        file_obj = File.objects.get(pk=response.data['id'])
+        clients.refresh_from_db()
+        contracts.refresh_from_db()
+        self.assertEqual(self.server.items[file_obj.drive_file_id]['parents'], [contracts.drive_folder_id])
+        self.assertEqual(self.server.items[contracts.drive_folder_id]['parents'], [clients.drive_folder_id])
+
+        drive_sync.sync_user(self.user)
+        file_obj.refresh_from_db()
+        contracts.refresh_from_db()
+        self.assertEqual((file_obj.folder_id, contracts.parent_id), (contracts.pk, clients.pk))
+        self.assertEqual(File.objects.count(), 1)
+
+    def test_move_then_poll(self):
+        archive = Folder.objects.create(company=self.company, name='Archive')
+        self.server.items['report'] = {'id': 'report', 'name': 'report.txt', 'mimeType': 'text/plain', 'size': '5', 'parents': ['root']}
+        file_obj = File.objects.create(company=self.company, name='report.txt', original_name='report.txt', mime_type='text/plain',
+                                       drive_file_id='report', drive_sync_status='synced')
+
+        response = self.client.post(f'/api/v1/files/list/{file_obj.pk}/move_to_folder/', {'folder_id': archive.pk}, format='json')
+        self.assertEqual(response.status_code, 200)
+        archive.refresh_from_db()
+        self.assertEqual(self.server.items['report']['parents'], [archive.drive_folder_id])
+
+        drive_sync.sync_user(self.user)
+        file_obj.refresh_from_db()
+        self.assertEqual(file_obj.folder_id, archive.pk)
+
+    def test_poll_keeps_files_in_crm_only_folders(self):
+        notes = Folder.objects.create(company=self.company, name='Notes')
+        file_obj = File.objects.create(company=self.company, folder=notes, name='memo.txt', original_name='memo.txt', mime_type='text/plain',
+                                       drive_file_id='memo', drive_sync_status='synced')
+        self.server.changes = [{'fileId': 'memo', 'file': {'id': 'memo', 'name': 'memo-v2.txt', 'mimeType': 'text/plain', 'parents': ['root']}}]
+
+        drive_sync.sync_user(self.user)
+        file_obj.refresh_from_db()
+        self.assertEqual((file_obj.name, file_obj.folder_id), ('memo-v2.txt', notes.pk))
+
+
+class DriveDownloadTests(FakeDriveTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server.media['report'] = bytes(range(256)) * 4
+        self.file = File.objects.create(company=self.company, name='report.bin', original_name='report.bin', mime_type='application/octet-stream',
+                                        size=1024, drive_file_id='report', drive_sync_status='synced')
+        self.url = f'/api/v1/files/list/{self.file.pk}/download/'
+
+    def test_full_download(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.server.media['report'])
+
+    def test_downloads_reuse_the_connection(self):
+        for header in ('bytes=0-99', 'bytes=100-'):
+            b''.join(self.client.get(self.url, HTTP_RANGE=header).streaming_content)
+        self.assertEqual(len(self.server.media_connections), 1)
+
+    def test_range_is_sent_to_drive(self):
+        for header, expected in (('bytes=1000-', (1000, 1023)), ('bytes=10-19', (10, 19)), ('bytes=-4', (1020, 1023))):
+            response = self.client.get(self.url, HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(response['Content-Range'], f'bytes {expected[0]}-{expected[1]}/1024')
+            self.assertEqual(b''.join(response.streaming_content), self.server.media['report'][expected[0]:expected[1] + 1])
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_single_ranges(self):
+        for header, expected in (
+            (None, None),
+            ('bytes=0-99', (0, 99)),
+            ('bytes=100-', (100, 999)),
+            ('bytes=900-5000', (900, 999)),
+            ('bytes=-100', (900, 999)),
+            ('bytes=-5000', (0, 999)),
+            ('bytes=-', None),
+            ('bytes=0-1,5-6', None),
+            ('items=0-1', None),
+        ):
+            with self.subTest(header=header):
+                self.assertEqual(downloads.parse_range(header, 1000), expected)
+        self.assertIsNone(downloads.parse_range('bytes=0-99', 0))
+
+    def test_unsatisfiable(self):
+        for header in ('bytes=1000-', 'bytes=10-5'):
+            with self.subTest(header=header), self.assertRaises(downloads.RangeNotSatisfiable):
+                downloads.parse_range(header, 1000)
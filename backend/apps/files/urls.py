@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import FolderViewSet, FileViewSet, FileShareViewSet
+from .views import FolderViewSet, FileViewSet, FileArchiveViewSet, FileShareViewSet
 from .oauth_views import (
     GoogleDriveConnectView, GoogleDriveCallbackView,
     GoogleDriveDisconnectView, GoogleDriveStatusView
@@ -10,6 +10,7 @@ router = DefaultRouter()
 router.register(r'folders', FolderViewSet)
 router.register(r'list', FileViewSet)
 router.register(r'shares', FileShareViewSet)
+router.register(r'archives', FileArchiveViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,53 +1,50 @@
-from rest_framework import viewsets, permissions, filters, status
+import logging
+from datetime import timedelta
+from rest_framework import filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
 from django_filters.rest_framework import DjangoFilterBackend
-from django.http import HttpResponse
-from .models import Folder, File, FileShare
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
+from core import counters
+from core.pagination import PageOrKeysetPagination
+from core.viewsets import CompanyScopedViewSet
+from apps.search.filters import IndexedSearchFilter
+from apps.search.services import index as search_index
+from .models import DriveSyncState, Folder, File, FileArchive, FileShare
 from .serializers import (
     FolderSerializer, FileSerializer, FileListSerializer,
-    FileShareSerializer, DriveFileSerializer
+    FileArchiveSerializer, FileShareSerializer, DriveFileSerializer
 )
+from .services import archives, blobs, downloads, drive_sync, folder_tree, thumbnails
 from .services.google_drive_oauth import drive_oauth_service
+from .services.uploads import digest_upload
+from .tasks import build_file_archive, sync_drive_changes, sync_file_to_drive
 
+logger = logging.getLogger(__name__)
 
 
-class FolderViewSet(viewsets.ModelViewSet):
-    queryset = Folder.objects.all()
+class FolderViewSet(CompanyScopedViewSet):
+    queryset = Folder.objects.order_by('name', 'id')
     serializer_class = FolderSerializer
-    permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['parent', 'folder_type', 'customer', 'project']
 
-    def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser:
-            return Folder.objects.all()
-        active_company = user.active_company
-        if active_company:
-            return Folder.objects.filter(company=active_company)
-        return Folder.objects.none()
-
     def perform_create(self, serializer):
         user = self.request.user
-        folder = serializer.save(company=user.active_company, created_by=user)
+        folder = serializer.save(**self.get_create_kwargs())
         
         # Sync to Drive if user is connected
         if user.google_drive_connected and user.google_drive_token:
-            parent_id = None
-            if folder.parent and folder.parent.drive_folder_id:
-                parent_id = folder.parent.drive_folder_id
-            
-            result = drive_oauth_service.create_folder(
-                user.google_drive_token,
-                folder.name,
-                parent_id
-            )
-            if result:
-                folder.drive_folder_id = result.get('id')
-                folder.save()
+            try:
+                # Under the parent's Drive folder, created too when missing, so the mirror keeps the nesting
+                drive_sync.drive_folder_for(user.google_drive_token, folder)
+            except Exception as e:
+                logger.warning('Error creating Drive folder for folder %s: %s', folder.pk, e)
 
     def perform_destroy(self, instance):
         user = self.request.user
@@ -59,54 +56,59 @@ class FolderViewSet(viewsets.ModelViewSet):
             except Exception as e:
                 print(f"Error deleting folder from Drive: {e}")
         
-        instance.delete()
+        instance.delete_subtree()
+
+    @action(detail=True, methods=['get'])
+    def breadcrumbs(self, request, pk=None):
+        """Get the folder's ancestors from the root down"""
+        return Response(self.get_object().breadcrumbs)
+
+    @action(detail=True, methods=['get'])
+    def descendants(self, request, pk=None):
+        """List all subfolders at any depth"""
+        folder = self.get_object()
+        queryset = self.eager_load(folder.descendants()).order_by('path')
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
 
     @action(detail=False, methods=['get'])
     def tree(self, request):
-        """Get folder tree structure with files"""
-        def build_tree(parent_id=None):
-            folders = self.get_queryset().filter(parent_id=parent_id)
-            result = []
-            for folder in folders:
-                files = File.objects.filter(
-                    folder=folder,
-                    company=request.user.active_company
-                ).values('id', 'name', 'original_name', 'mime_type', 'size')
-                
-                result.append({
-                    'id': folder.id,
-                    'name': folder.name,
-                    'type': 'folder',
-                    'children': build_tree(folder.id),
-                    'files': list(files)
-                })
-            return result
-        
-        # Root folders
-        tree = build_tree()
-        
-        # Root files (no folder)
-        root_files = File.objects.filter(
-            folder__isnull=True,
-            company=request.user.active_company
-        ).values('id', 'name', 'original_name', 'mime_type', 'size')
-        
-        return Response({
-            'folders': tree,
-            'root_files': list(root_files)
-        })
+        """Get folder tree structure with files (?folder=<id> for a subtree, ?depth=<n> to limit levels)"""
+        root_id = request.query_params.get('folder')
+        depth = request.query_params.get('depth')
+        if (root_id and not root_id.isdigit()) or (depth and not depth.isdigit()):
+            return Response({'error': 'folder and depth must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        root_id = int(root_id) if root_id else None
+        depth = int(depth) if depth else None
+
+        company_id = request.tenant.company_id
+        version = folder_tree.tree_version(company_id)
+        etag = quote_etag(f'{version}:{root_id}:{depth}')
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
 
+        try:
+            tree = folder_tree.get_cached_tree(company_id, root_id, depth, version)
+        except Folder.DoesNotExist:
+            return Response({'error': 'Folder not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(tree, headers={'ETag': etag, 'Cache-Control': 'private, no-cache'})
 
-class FileViewSet(viewsets.ModelViewSet):
+
+class FileViewSet(CompanyScopedViewSet):
     queryset = File.objects.all()
     serializer_class = FileSerializer
-    permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['customer', 'project', 'is_synced_to_drive']  # folder removed - handled manually
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, filters.OrderingFilter]
+    filterset_fields = ['customer', 'project', 'drive_sync_status']  # folder removed - handled manually
     search_fields = ['name', 'original_name']
+    search_kind = 'file'
     ordering = ['-created_at']
+    select_related_fields = ('folder', 'blob')
+    pagination_class = PageOrKeysetPagination
+    bulk_limit = 1000
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -114,22 +116,21 @@ class FileViewSet(viewsets.ModelViewSet):
         return FileSerializer
 
     def get_queryset(self):
-        user = self.request.user
-        queryset = File.objects.none()
-        
-        if user.is_superuser:
-            queryset = File.objects.all()
-        else:
-            active_company = user.active_company
-            if active_company:
-                queryset = File.objects.filter(company=active_company)
-        
+        queryset = super().get_queryset()
+
         # Handle folder filter manually
         folder_param = self.request.query_params.get('folder', None)
         if folder_param == 'root' or folder_param == '':
             queryset = queryset.filter(folder__isnull=True)
         elif folder_param and folder_param.isdigit():
             queryset = queryset.filter(folder_id=int(folder_param))
+
+        # Backwards compatible boolean filter
+        synced_param = self.request.query_params.get('is_synced_to_drive')
+        if synced_param in ('true', 'True', '1'):
+            queryset = queryset.filter(drive_sync_status='synced')
+        elif synced_param in ('false', 'False', '0'):
+            queryset = queryset.exclude(drive_sync_status='synced')
         
         return queryset
 
@@ -137,62 +138,97 @@ class FileViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         uploaded_file = self.request.FILES.get('file')
         
-        # Dosya içeriğini önce oku (sonra okuyamazsın)
-        file_content = None
+        # Hash and measure in chunks; Django keeps large uploads spooled on disk
+        sha256, size = digest_upload(uploaded_file) if uploaded_file else ('', 0)
+        
+        # Identical content is stored once and shared by reference
+        content = {}
         if uploaded_file:
-            file_content = uploaded_file.read()
-            uploaded_file.seek(0)  # File pointer'ı başa al
+            blob = blobs.store(uploaded_file, sha256, size)
+            content = {'blob': blob, 'file': blob.file.name}
         
         file_instance = serializer.save(
-            company=self.request.user.active_company,
-            created_by=self.request.user,
+            **self.get_create_kwargs(),
+            **content,
             uploaded_by=self.request.user,
             original_name=uploaded_file.name if uploaded_file else '',
-            size=uploaded_file.size if uploaded_file else 0,
+            size=size,
+            sha256=sha256,
             mime_type=uploaded_file.content_type if uploaded_file else ''
         )
         
-        # Auto-sync to Google Drive if user connected
+        # Auto-sync to Google Drive in the background if user connected
         user = self.request.user
-        if user.google_drive_connected and user.google_drive_token and file_content:
-            self._sync_to_drive(file_instance, file_content, user)
-
+        if user.google_drive_connected and user.google_drive_token and uploaded_file:
+            self._queue_drive_sync(file_instance, user)
 
-    def _sync_to_drive(self, file_instance, file_content, user):
-        """Sync file to Google Drive using user's OAuth token"""
-        if not user.google_drive_token:
+    def perform_update(self, serializer):
+        uploaded_file = self.request.FILES.get('file')
+        if not uploaded_file:
+            serializer.save()
             return
-        
-        result = drive_oauth_service.upload_file(
-            token_data=user.google_drive_token,
-            file_content=file_content,
-            filename=file_instance.original_name,
-            mime_type=file_instance.mime_type
-        )
-        
-        if result:
-            file_instance.drive_file_id = result.get('id')
-            file_instance.drive_view_link = result.get('webViewLink')
-            file_instance.drive_download_link = result.get('webContentLink')
-            file_instance.is_synced_to_drive = True
-            file_instance.save()
+
+        # Replaced content goes through the blob store like an upload; the old blob is released
+        sha256, size = digest_upload(uploaded_file)
+        blob = blobs.store(uploaded_file, sha256, size)
+        previous = serializer.instance
+        previous_blob_id = previous.blob_id
+        legacy_name = previous.file.name if previous.file and not previous.blob_id else None
+        previous_drive_id = previous.drive_file_id
+        with transaction.atomic():
+            file_instance = serializer.save(
+                blob=blob,
+                file=blob.file.name,
+                original_name=uploaded_file.name,
+                size=size,
+                sha256=sha256,
+                mime_type=uploaded_file.content_type,
+                drive_file_id=None, drive_view_link=None, drive_download_link=None,
+                drive_sync_status='local', drive_sync_error='',
+            )
+            if previous_blob_id != blob.pk:
+                blobs.acquire(blob.pk)
+                if previous_blob_id:
+                    blobs.release(previous_blob_id)
+            if legacy_name:
+                storage = previous.file.storage
+                transaction.on_commit(lambda: storage.delete(legacy_name))
+            thumbnails.schedule(file_instance)
+
+        # The Drive copy holds the old content: remove it and upload the new one
+        user = self.request.user
+        if user.google_drive_connected and user.google_drive_token:
+            if previous_drive_id:
+                try:
+                    drive_oauth_service.delete_file(user.google_drive_token, previous_drive_id)
+                except Exception as e:
+                    logger.warning('Error deleting replaced Drive file %s: %s', previous_drive_id, e)
+            self._queue_drive_sync(file_instance, user)
+
+    def _queue_drive_sync(self, file_instance, user):
+        """Mark the file pending and upload it to Drive from a Celery worker after commit"""
+        File.objects.filter(pk=file_instance.pk).update(drive_sync_status='pending', drive_sync_error='')
+        file_instance.drive_sync_status = 'pending'
+        transaction.on_commit(lambda: sync_file_to_drive.delay(file_instance.pk, user.pk))
 
     @action(detail=True, methods=['post'])
     def sync_to_drive(self, request, pk=None):
-        """Manually sync a file to Google Drive"""
+        """Queue a file for upload to Google Drive"""
         file_obj = self.get_object()
         user = request.user
         
         if not user.google_drive_connected:
             return Response({'error': 'Google Drive not connected'}, status=status.HTTP_400_BAD_REQUEST)
         
-        if file_obj.is_synced_to_drive:
+        if file_obj.drive_sync_status == 'synced':
             return Response({'message': 'File already synced'})
         
+        if file_obj.drive_sync_status in ('pending', 'syncing'):
+            return Response({'status': file_obj.drive_sync_status}, status=status.HTTP_202_ACCEPTED)
+        
         if file_obj.file:
-            file_content = file_obj.file.read()
-            self._sync_to_drive(file_obj, file_content, user)
-            return Response({'status': 'success', 'drive_file_id': file_obj.drive_file_id})
+            self._queue_drive_sync(file_obj, user)
+            return Response({'status': file_obj.drive_sync_status}, status=status.HTTP_202_ACCEPTED)
         
         return Response({'error': 'No file content to sync'}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -204,7 +240,7 @@ class FileViewSet(viewsets.ModelViewSet):
         
         if folder_id:
             try:
-                folder = Folder.objects.get(id=folder_id)
+                folder = Folder.objects.for_tenant(request.tenant).get(id=folder_id)
                 file_obj.folder = folder
             except Folder.DoesNotExist:
                 return Response({'error': 'Folder not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -212,33 +248,61 @@ class FileViewSet(viewsets.ModelViewSet):
             file_obj.folder = None  # Move to root
         
         file_obj.save()
+        
+        user = request.user
+        if file_obj.drive_sync_status == 'synced' and file_obj.drive_file_id and user.google_drive_connected and user.google_drive_token:
+            try:
+                target = drive_sync.drive_folder_for(user.google_drive_token, file_obj.folder)
+                if target:
+                    drive_oauth_service.move_files(user.google_drive_token, [file_obj.drive_file_id], target)
+            except Exception as e:
+                logger.warning('Error moving file %s on Drive: %s', file_obj.drive_file_id, e)
         return Response({'status': 'success'})
 
 
     @action(detail=True, methods=['get'])
     def download(self, request, pk=None):
-        """Download file (from Drive if synced)"""
+        """Download file (from Drive if synced), streamed and with Range support"""
         file_obj = self.get_object()
-        file_obj.download_count += 1
-        file_obj.save()
+        # Resumed ranges continue a download that was already counted
+        range_header = request.headers.get('Range', '')
+        if not range_header or range_header.startswith('bytes=0-'):
+            counters.increment(file_obj, 'download_count')
         
         if file_obj.is_synced_to_drive and file_obj.drive_file_id:
             user = request.user
             if user.google_drive_connected and user.google_drive_token:
-                content = drive_oauth_service.download_file(user.google_drive_token, file_obj.drive_file_id)
-                if content:
-                    response = HttpResponse(content, content_type=file_obj.mime_type)
-                    response['Content-Disposition'] = f'attachment; filename="{file_obj.original_name}"'
+                response = downloads.drive_file_response(request, user.google_drive_token, file_obj)
+                if response is not None:
                     return response
         
         # Fallback to local file
         if file_obj.file:
-            response = HttpResponse(file_obj.file.read(), content_type=file_obj.mime_type)
-            response['Content-Disposition'] = f'attachment; filename="{file_obj.original_name}"'
-            return response
+            return downloads.local_file_response(request, file_obj)
         
         return Response({'error': 'File not found'}, status=status.HTTP_404_NOT_FOUND)
 
+    @action(detail=True, methods=['get'])
+    def thumbnail(self, request, pk=None):
+        """Small image of the file (?size=preview for the larger one), rendered in the background"""
+        file_obj = self.get_object()
+        variant = 'preview' if request.query_params.get('size') == 'preview' else 'thumbnail'
+        blob = blobs.ensure_blob(file_obj) if thumbnails.is_supported(file_obj.mime_type) else None
+        if blob is None:
+            if file_obj.mime_type == 'application/pdf':
+                return Response({'error': 'PDF previews need PyMuPDF on the server'}, status=status.HTTP_404_NOT_FOUND)
+            return Response({'error': 'No preview available'}, status=status.HTTP_404_NOT_FOUND)
+        if blob.thumbnail_status == 'pending':
+            thumbnails.schedule(file_obj)
+            return Response({'status': 'pending'}, status=status.HTTP_202_ACCEPTED)
+        if blob.thumbnail_status != 'ready':
+            return Response({'error': 'No preview available'}, status=status.HTTP_404_NOT_FOUND)
+
+        etag = quote_etag(f'{blob.sha256}:{variant}')
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return downloads.derivative_response(getattr(blob, variant), thumbnails.CONTENT_TYPE, etag)
+
     @action(detail=False, methods=['get'])
     def drive_status(self, request):
         """Check Google Drive connection status"""
@@ -255,10 +319,33 @@ class FileViewSet(viewsets.ModelViewSet):
         if not user.google_drive_connected:
             return Response({'error': 'Google Drive not connected'}, status=status.HTTP_400_BAD_REQUEST)
         
-        files = drive_oauth_service.list_files(user.google_drive_token)
+        state = DriveSyncState.objects.filter(user=user, company_id=request.tenant.company_id).first()
+        if state and state.last_synced_at and request.query_params.get('live') != 'true':
+            # The changes poller keeps the mirror current, so no Drive call is needed
+            mirrored = self.get_queryset().filter(drive_file_id__isnull=False).order_by('name')
+            files = [{
+                'id': f.drive_file_id,
+                'name': f.name,
+                'mimeType': f.mime_type,
+                'size': str(f.size),
+                'createdTime': f.created_at.isoformat(),
+                'modifiedTime': f.updated_at.isoformat(),
+                'webViewLink': f.drive_view_link,
+                'webContentLink': f.drive_download_link,
+            } for f in mirrored]
+        else:
+            files = drive_oauth_service.list_files(user.google_drive_token)
         serializer = DriveFileSerializer(files, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'])
+    def drive_sync(self, request):
+        """Queue an incremental sync of Google Drive changes"""
+        if not request.user.google_drive_connected:
+            return Response({'error': 'Google Drive not connected'}, status=status.HTTP_400_BAD_REQUEST)
+        sync_drive_changes.delay(request.user.pk)
+        return Response({'status': 'queued'}, status=status.HTTP_202_ACCEPTED)
+
     @action(detail=False, methods=['post'])
     def import_from_drive(self, request):
         """Import a file reference from Google Drive"""
@@ -276,7 +363,7 @@ class FileViewSet(viewsets.ModelViewSet):
         
         # Create local reference
         file_obj = File.objects.create(
-            company=request.user.active_company,
+            company=request.tenant.company,
             created_by=request.user,
             uploaded_by=request.user,
             name=drive_file.get('name'),
@@ -286,11 +373,108 @@ class FileViewSet(viewsets.ModelViewSet):
             drive_file_id=drive_file.get('id'),
             drive_view_link=drive_file.get('webViewLink'),
             drive_download_link=drive_file.get('webContentLink'),
-            is_synced_to_drive=True
+            drive_sync_status='synced'
         )
         
         return Response(FileSerializer(file_obj).data, status=status.HTTP_201_CREATED)
 
+    def _bulk_ids(self, request, key='ids'):
+        ids = request.data.get(key)
+        if not isinstance(ids, list) or not ids or len(ids) > self.bulk_limit:
+            return None
+        return ids
+
+    @action(detail=False, methods=['post'])
+    def bulk_delete(self, request):
+        """Delete many files; Drive copies are removed with batched requests"""
+        ids = self._bulk_ids(request)
+        if ids is None:
+            return Response({'error': f'ids must be a list of 1-{self.bulk_limit} file ids'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        files = list(self.get_queryset().filter(pk__in=ids))
+        user = request.user
+        drive_ids = [f.drive_file_id for f in files if f.is_synced_to_drive and f.drive_file_id]
+        if drive_ids and user.google_drive_connected and user.google_drive_token:
+            try:
+                drive_oauth_service.delete_files(user.google_drive_token, drive_ids)
+            except Exception as e:
+                logger.warning('Error deleting %d files from Drive: %s', len(drive_ids), e)
+        
+        # Files outside the blob store own their storage object
+        for file_obj in files:
+            if file_obj.file and not file_obj.blob_id:
+                file_obj.file.delete(save=False)
+        File.objects.filter(pk__in=[f.pk for f in files]).delete()
+        return Response({'deleted': len(files)})
+
+    @action(detail=False, methods=['post'])
+    def bulk_move(self, request):
+        """Move many files to a folder (folder_id null for root) with one update"""
+        ids = self._bulk_ids(request)
+        if ids is None:
+            return Response({'error': f'ids must be a list of 1-{self.bulk_limit} file ids'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        folder = None
+        folder_id = request.data.get('folder_id')
+        if folder_id:
+            folder = Folder.objects.for_tenant(request.tenant).filter(pk=folder_id).first()
+            if folder is None:
+                return Response({'error': 'Folder not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        files = self.get_queryset().filter(pk__in=ids)
+        drive_ids = list(files.filter(drive_sync_status='synced').exclude(drive_file_id=None).values_list('drive_file_id', flat=True))
+        moved = files.update(folder=folder, updated_at=timezone.now())
+        search_index.reindex('file', files)
+        
+        user = request.user
+        if drive_ids and user.google_drive_connected and user.google_drive_token:
+            try:
+                target = drive_sync.drive_folder_for(user.google_drive_token, folder)
+                if target:
+                    drive_oauth_service.move_files(user.google_drive_token, drive_ids, target)
+            except Exception as e:
+                logger.warning('Error moving %d files on Drive: %s', len(drive_ids), e)
+        return Response({'moved': moved})
+
+    @action(detail=False, methods=['post'])
+    def bulk_import_from_drive(self, request):
+        """Import many Drive files with one batched metadata fetch and one insert"""
+        user = request.user
+        if not user.google_drive_connected:
+            return Response({'error': 'Google Drive not connected'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        file_ids = self._bulk_ids(request, 'file_ids')
+        if file_ids is None:
+            return Response({'error': f'file_ids must be a list of 1-{self.bulk_limit} Drive ids'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Skip files this company already references
+        existing = set(self.get_queryset().filter(drive_file_id__in=file_ids).values_list('drive_file_id', flat=True))
+        wanted = [file_id for file_id in file_ids if file_id not in existing]
+        drive_files = drive_oauth_service.get_files_info(user.google_drive_token, wanted) if wanted else {}
+        
+        created = File.objects.bulk_create([
+            File(
+                company=request.tenant.company,
+                created_by=user,
+                uploaded_by=user,
+                name=drive_file.get('name'),
+                original_name=drive_file.get('name'),
+                mime_type=drive_file.get('mimeType', ''),
+                size=int(drive_file.get('size', 0)),
+                drive_file_id=drive_file.get('id'),
+                drive_view_link=drive_file.get('webViewLink'),
+                drive_download_link=drive_file.get('webContentLink'),
+                drive_sync_status='synced'
+            )
+            for drive_file in drive_files.values()
+        ])
+        search_index.reindex('file', File.objects.filter(pk__in=[file_obj.pk for file_obj in created]))
+        return Response({
+            'imported': FileListSerializer(created, many=True).data,
+            'skipped': sorted(existing),
+            'not_found': [file_id for file_id in wanted if file_id not in drive_files],
+        }, status=status.HTTP_201_CREATED)
+
     def perform_destroy(self, instance):
         """Delete file and also delete from Drive if synced"""
         user = self.request.user
@@ -303,20 +487,21 @@ class FileViewSet(viewsets.ModelViewSet):
                 except Exception as e:
                     print(f"Error deleting from Drive: {e}")
         
-        # Delete local file
-        if instance.file:
+        # Delete local file; shared blobs are released by signal and garbage-collected
+        if instance.file and not instance.blob_id:
             instance.file.delete(save=False)
         
         instance.delete()
 
     @action(detail=True, methods=['post'])
     def copy(self, request, pk=None):
-        """Copy a file (and sync copy to Drive if connected)"""
+        """Copy a file by reference (and copy it server-side on Drive if connected)"""
         file_obj = self.get_object()
         user = request.user
         
-        # Create copy
+        # Create copy sharing the same stored content
         new_name = f"{file_obj.name} (kopya)" if file_obj.name else f"{file_obj.original_name} (kopya)"
+        blob = blobs.ensure_blob(file_obj)
         
         new_file = File.objects.create(
             company=file_obj.company,
@@ -325,52 +510,65 @@ class FileViewSet(viewsets.ModelViewSet):
             original_name=new_name,
             mime_type=file_obj.mime_type,
             size=file_obj.size,
+            sha256=file_obj.sha256,
+            blob=blob,
+            file=blob.file.name if blob else None,
             customer=file_obj.customer,
             project=file_obj.project,
             created_by=user,
             uploaded_by=user
         )
         
-        # Copy local file if exists
-        if file_obj.file:
-            from django.core.files.base import ContentFile
-            new_file.file.save(new_name, ContentFile(file_obj.file.read()))
-        
-        # Copy to Drive if connected and original is synced
+        # Copy on Drive if connected and original is synced
         if user.google_drive_connected and user.google_drive_token:
             if file_obj.is_synced_to_drive and file_obj.drive_file_id:
-                # Download from Drive and re-upload as copy
-                content = drive_oauth_service.download_file(user.google_drive_token, file_obj.drive_file_id)
-                if content:
-                    result = drive_oauth_service.upload_file(
-                        user.google_drive_token,
-                        content,
-                        new_name,
-                        file_obj.mime_type
-                    )
-                    if result:
-                        new_file.drive_file_id = result.get('id')
-                        new_file.drive_view_link = result.get('webViewLink')
-                        new_file.drive_download_link = result.get('webContentLink')
-                        new_file.is_synced_to_drive = True
-                        new_file.save()
+                result = drive_oauth_service.copy_file(user.google_drive_token, file_obj.drive_file_id, new_name)
+                if result:
+                    new_file.drive_file_id = result.get('id')
+                    new_file.drive_view_link = result.get('webViewLink')
+                    new_file.drive_download_link = result.get('webContentLink')
+                    new_file.drive_sync_status = 'synced'
+                    new_file.save()
         
         return Response(FileSerializer(new_file).data, status=status.HTTP_201_CREATED)
 
 
 
-class FileShareViewSet(viewsets.ModelViewSet):
-    queryset = FileShare.objects.all()
-    serializer_class = FileShareSerializer
-    permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['file', 'shared_with']
+class FileArchiveViewSet(CompanyScopedViewSet):
+    """ZIP downloads of a folder or a file selection, built in the background"""
+    queryset = FileArchive.objects.all()
+    serializer_class = FileArchiveSerializer
+    http_method_names = ['get', 'post', 'delete', 'head', 'options']
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser:
-            return FileShare.objects.all()
-        return FileShare.objects.filter(file__company=user.active_company)
+        # Archives are private to the user who requested them
+        return super().get_queryset().filter(created_by=self.request.user)
 
     def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
+        expires_at = timezone.now() + timedelta(seconds=settings.FILES_ARCHIVE_TTL)
+        archive = serializer.save(expires_at=expires_at, **self.get_create_kwargs())
+        transaction.on_commit(lambda: build_file_archive.delay(archive.pk))
+
+    def perform_destroy(self, instance):
+        if instance.file:
+            instance.file.delete(save=False)
+        instance.delete()
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Download the finished ZIP, with Range support for resuming"""
+        archive = self.get_object()
+        if archive.status != 'ready' or not archive.file:
+            return Response({'error': 'Archive is not ready'}, status=status.HTTP_409_CONFLICT)
+        range_header = request.headers.get('Range', '')
+        if not range_header or range_header.startswith('bytes=0-'):
+            archives.count_download(archive)
+        return downloads.local_file_response(request, archive)
+
+
+class FileShareViewSet(CompanyScopedViewSet):
+    queryset = FileShare.objects.order_by('-created_at', '-id')
+    serializer_class = FileShareSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['file', 'shared_with']
+    select_related_fields = ('file', 'shared_with')
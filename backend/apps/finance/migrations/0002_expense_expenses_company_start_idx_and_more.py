@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0003_customer_customers_company_name_idx_and_more"),
+        ("finance", "0001_initial"),
+        ("organization", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="expense",
+            index=models.Index(
+                fields=["company", "-start_date"], name="expenses_company_start_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="expense",
+            index=models.Index(
+                fields=["company", "-created_at"], name="expenses_company_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="income",
+            index=models.Index(
+                fields=["company", "-received_date"],
+                name="incomes_company_received_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                fields=["company", "-issue_date"], name="invoices_company_issue_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                fields=["company", "status"], name="invoices_company_status_idx"
+            ),
+        ),
+    ]
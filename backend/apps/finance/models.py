@@ -59,6 +59,10 @@ class Invoice(AuditableModel):
     class Meta:
         db_table = 'invoices'
         ordering = ['-issue_date']
+        indexes = [
+            models.Index(fields=['company', '-issue_date'], name='invoices_company_issue_idx'),
+            models.Index(fields=['company', 'status'], name='invoices_company_status_idx'),
+        ]
 
 
 class Income(AuditableModel):
@@ -76,6 +80,7 @@ class Income(AuditableModel):
     class Meta:
         db_table = 'incomes'
         ordering = ['-received_date']
+        indexes = [models.Index(fields=['company', '-received_date'], name='incomes_company_received_idx')]
 
 
 class Expense(AuditableModel):
@@ -102,3 +107,7 @@ class Expense(AuditableModel):
     class Meta:
         db_table = 'expenses'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['company', '-start_date'], name='expenses_company_start_idx'),
+            models.Index(fields=['company', '-created_at'], name='expenses_company_created_idx'),
+        ]
@@ -0,0 +1,22 @@
+from django.db.models import Case, DecimalField, F, Sum, Value, When
+from apps.finance.models import Expense
+
+
+def monthly_amount():
+    """SQL expression for the monthly equivalent of a recurring expense (yearly / 12, one-time 0)."""
+    return Case(
+        When(period_type='monthly', then=F('amount')),
+        When(period_type='yearly', then=F('amount') / Value(12)),
+        default=Value(0),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+def totals_by_category(queryset):
+    """Sum of amounts per category label, grouped in the database."""
+    labels = dict(Expense.CATEGORY_CHOICES)
+    rows = queryset.order_by().values('category').annotate(total=Sum('amount'))
+    totals = {row['category']: row['total'] or 0 for row in rows}
+    # Keep the choices order, unknown codes last
+    ordered = [code for code in labels if code in totals] + [code for code in totals if code not in labels]
+    return {labels.get(code, code): float(totals[code]) for code in ordered}
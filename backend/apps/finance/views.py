@@ -1,11 +1,14 @@
-from rest_framework import viewsets, permissions, filters, status
+from rest_framework import filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Sum
 from django.utils import timezone
 from datetime import timedelta
+from core.aggregates import count_if, sum_if, summarize
+from core.pagination import PageOrKeysetPagination
+from core.viewsets import CompanyScopedViewSet
 from .models import BankAccount, BankCard, CashBalance, Invoice, Income, Expense
+from .services.expenses import monthly_amount, totals_by_category
 from .serializers import (
     BankAccountSerializer, BankCardSerializer, CashBalanceSerializer,
     InvoiceSerializer, InvoiceListSerializer, IncomeSerializer, 
@@ -13,48 +16,27 @@ from .serializers import (
 )
 
 
-class BankAccountViewSet(viewsets.ModelViewSet):
-    queryset = BankAccount.objects.all()
+class BankAccountViewSet(CompanyScopedViewSet):
+    queryset = BankAccount.objects.order_by('bank_name', 'account_name', 'id')
     serializer_class = BankAccountSerializer
-    permission_classes = [permissions.IsAuthenticated]
 
-    def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser:
-            return BankAccount.objects.all()
-        active_company = user.active_company
-        if active_company:
-            return BankAccount.objects.filter(company=active_company)
-        return BankAccount.objects.none()
 
-    def perform_create(self, serializer):
-        serializer.save(company=self.request.user.active_company, created_by=self.request.user)
-
-
-class InvoiceViewSet(viewsets.ModelViewSet):
+class InvoiceViewSet(CompanyScopedViewSet):
     queryset = Invoice.objects.all()
     serializer_class = InvoiceSerializer
-    permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['customer', 'status']
     search_fields = ['invoice_no', 'customer__company_name']
     ordering_fields = ['issue_date', 'due_date', 'total_amount']
     ordering = ['-issue_date']
+    select_related_fields = ('customer',)
+    pagination_class = PageOrKeysetPagination
 
     def get_serializer_class(self):
         if self.action == 'list':
             return InvoiceListSerializer
         return InvoiceSerializer
 
-    def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser:
-            return Invoice.objects.select_related('customer').all()
-        active_company = user.active_company
-        if active_company:
-            return Invoice.objects.select_related('customer').filter(company=active_company)
-        return Invoice.objects.none()
-
     def perform_create(self, serializer):
         # Calculate tax and total
         amount = serializer.validated_data.get('amount', 0)
@@ -63,8 +45,7 @@ class InvoiceViewSet(viewsets.ModelViewSet):
         total_amount = amount + tax_amount
         
         serializer.save(
-            company=self.request.user.active_company,
-            created_by=self.request.user,
+            **self.get_create_kwargs(),
             tax_amount=tax_amount,
             total_amount=total_amount
         )
@@ -72,22 +53,17 @@ class InvoiceViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def summary(self, request):
         """Get invoice statistics"""
-        queryset = self.get_queryset()
-        today = timezone.now().date()
-        
-        total_amount = queryset.aggregate(total=Sum('total_amount'))['total'] or 0
-        paid_amount = queryset.aggregate(total=Sum('paid_amount'))['total'] or 0
-        
-        summary = {
-            'total_invoices': queryset.count(),
-            'draft': queryset.filter(status='draft').count(),
-            'sent': queryset.filter(status='sent').count(),
-            'paid': queryset.filter(status='paid').count(),
-            'overdue': queryset.filter(status='overdue').count(),
-            'total_amount': float(total_amount),
-            'paid_amount': float(paid_amount),
-            'pending_amount': float(total_amount - paid_amount),
-        }
+        summary = summarize(
+            self.get_queryset(),
+            total_invoices=count_if(),
+            draft=count_if(status='draft'),
+            sent=count_if(status='sent'),
+            paid=count_if(status='paid'),
+            overdue=count_if(status='overdue'),
+            total_amount=sum_if('total_amount'),
+            paid_amount=sum_if('paid_amount'),
+        )
+        summary['pending_amount'] = summary['total_amount'] - summary['paid_amount']
         return Response(summary)
 
     @action(detail=True, methods=['post'])
@@ -101,52 +77,31 @@ class InvoiceViewSet(viewsets.ModelViewSet):
         return Response({'status': 'success'})
 
 
-class IncomeViewSet(viewsets.ModelViewSet):
+class IncomeViewSet(CompanyScopedViewSet):
     queryset = Income.objects.all()
     serializer_class = IncomeSerializer
-    permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['customer', 'payment_method', 'bank_account']
     ordering = ['-received_date']
-
-    def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser:
-            return Income.objects.select_related('customer', 'bank_account').all()
-        active_company = user.active_company
-        if active_company:
-            return Income.objects.select_related('customer', 'bank_account').filter(company=active_company)
-        return Income.objects.none()
-
-    def perform_create(self, serializer):
-        serializer.save(company=self.request.user.active_company, created_by=self.request.user)
+    select_related_fields = ('customer', 'bank_account')
+    pagination_class = PageOrKeysetPagination
 
     @action(detail=False, methods=['get'])
     def summary(self, request):
         """Get income statistics by period"""
-        queryset = self.get_queryset()
         today = timezone.now().date()
-        
-        # This month
-        month_start = today.replace(day=1)
-        this_month = queryset.filter(received_date__gte=month_start).aggregate(total=Sum('amount'))['total'] or 0
-        
-        # This year
-        year_start = today.replace(month=1, day=1)
-        this_year = queryset.filter(received_date__gte=year_start).aggregate(total=Sum('amount'))['total'] or 0
-        
-        summary = {
-            'total_records': queryset.count(),
-            'this_month': float(this_month),
-            'this_year': float(this_year),
-        }
+        summary = summarize(
+            self.get_queryset(),
+            total_records=count_if(),
+            this_month=sum_if('amount', received_date__gte=today.replace(day=1)),
+            this_year=sum_if('amount', received_date__gte=today.replace(month=1, day=1)),
+        )
         return Response(summary)
 
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+class ExpenseViewSet(CompanyScopedViewSet):
     queryset = Expense.objects.all()
     serializer_class = ExpenseSerializer
-    permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['category', 'period_type', 'is_active']
     search_fields = ['title', 'description']
@@ -157,41 +112,20 @@ class ExpenseViewSet(viewsets.ModelViewSet):
             return ExpenseListSerializer
         return ExpenseSerializer
 
-    def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser:
-            return Expense.objects.all()
-        active_company = user.active_company
-        if active_company:
-            return Expense.objects.filter(company=active_company)
-        return Expense.objects.none()
-
-    def perform_create(self, serializer):
-        serializer.save(company=self.request.user.active_company, created_by=self.request.user)
-
     @action(detail=False, methods=['get'])
     def summary(self, request):
         """Get expense statistics"""
         queryset = self.get_queryset()
-        
-        # Monthly recurring
-        monthly = queryset.filter(period_type='monthly', is_active=True).aggregate(total=Sum('amount'))['total'] or 0
-        
-        # One-time expenses this month
-        today = timezone.now().date()
-        month_start = today.replace(day=1)
-        one_time = queryset.filter(period_type='once', start_date__gte=month_start).aggregate(total=Sum('amount'))['total'] or 0
-        
-        # By category
-        by_category = {}
-        for exp in queryset.filter(is_active=True):
-            cat = exp.get_category_display()
-            by_category[cat] = by_category.get(cat, 0) + float(exp.amount)
-        
-        summary = {
-            'total_records': queryset.count(),
-            'monthly_recurring': float(monthly),
-            'one_time_this_month': float(one_time),
-            'by_category': by_category,
-        }
+        month_start = timezone.now().date().replace(day=1)
+
+        summary = summarize(
+            queryset,
+            total_records=count_if(),
+            monthly_recurring=sum_if('amount', period_type='monthly', is_active=True),
+            one_time_this_month=sum_if('amount', period_type='once', start_date__gte=month_start),
+            # Monthly + yearly/12 of active recurring expenses
+            monthly_equivalent=sum_if(monthly_amount(), is_active=True),
+        )
+        summary['monthly_equivalent'] = round(summary['monthly_equivalent'], 2)
+        summary['by_category'] = totals_by_category(queryset.filter(is_active=True))
         return Response(summary)
@@ -30,6 +30,10 @@ class Lead(AuditableModel):
     class Meta:
         db_table = 'leads'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['company', '-created_at'], name='leads_company_created_idx'),
+            models.Index(fields=['company', 'status'], name='leads_company_status_idx'),
+        ]
 
 
 class LeadActivity(AuditableModel):
@@ -44,3 +48,4 @@ class LeadActivity(AuditableModel):
     class Meta:
         db_table = 'lead_activities'
         ordering = ['-contact_date']
+        indexes = [models.Index(fields=['company', '-contact_date'], name='lead_act_company_date_idx')]
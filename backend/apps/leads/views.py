@@ -1,35 +1,29 @@
-from rest_framework import viewsets, permissions, filters, status
+from rest_framework import filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from core.viewsets import CompanyScopedViewSet
+from apps.search.filters import IndexedSearchFilter
 from .models import Lead, LeadActivity
 from .serializers import LeadSerializer, LeadListSerializer, LeadActivitySerializer
 
 
-class LeadViewSet(viewsets.ModelViewSet):
+class LeadViewSet(CompanyScopedViewSet):
     queryset = Lead.objects.all()
     serializer_class = LeadSerializer
-    permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, IndexedSearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'source', 'assigned_to']
     search_fields = ['company_name', 'contact_person', 'email', 'phone']
+    search_kind = 'lead'
     ordering_fields = ['created_at', 'expected_value', 'next_contact_date']
     ordering = ['-created_at']
+    select_related_fields = ('assigned_to', 'created_by')
 
     def get_serializer_class(self):
         if self.action == 'list':
             return LeadListSerializer
         return LeadSerializer
 
-    def get_queryset(self):
-        user = self.request.user
-        # Lead model doesn't have company field, return all leads for authenticated users
-        return Lead.objects.select_related('assigned_to', 'created_by').all()
-
-    def perform_create(self, serializer):
-        user = self.request.user
-        serializer.save(created_by=user)
-
     @action(detail=False, methods=['get'])
     def kanban(self, request):
         """Get leads grouped by status for Kanban view"""
@@ -62,20 +56,14 @@ class LeadViewSet(viewsets.ModelViewSet):
         return Response({'status': 'success', 'new_status': new_status})
 
 
-class LeadActivityViewSet(viewsets.ModelViewSet):
+class LeadActivityViewSet(CompanyScopedViewSet):
     queryset = LeadActivity.objects.all()
     serializer_class = LeadActivitySerializer
-    permission_classes = [permissions.IsAuthenticated]
+    select_related_fields = ('lead', 'created_by')
 
     def get_queryset(self):
-        user = self.request.user
+        qs = super().get_queryset()
         lead_id = self.request.query_params.get('lead')
-        
-        qs = LeadActivity.objects.select_related('lead', 'created_by').all()
         if lead_id:
             qs = qs.filter(lead_id=lead_id)
-        
         return qs
-
-    def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
@@ -5,14 +5,15 @@ from django.shortcuts import get_object_or_404
 from .models import Group, Company
 from .serializers import GroupSerializer, CompanySerializer, CompanyListSerializer
 from apps.accounts.models import UserCompany
+from core.tenancy import clear_tenant
 
 class GroupViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Group.objects.all()
+    queryset = Group.objects.order_by('name', 'id')
     serializer_class = GroupSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 class CompanyViewSet(viewsets.ModelViewSet):
-    queryset = Company.objects.all()
+    queryset = Company.objects.order_by('name', 'id')
     serializer_class = CompanySerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter]
@@ -31,11 +32,11 @@ class CompanyViewSet(viewsets.ModelViewSet):
         """
         user = self.request.user
         if user.is_superuser:
-            return Company.objects.all()
+            return self.queryset.all()
         
         # Kullanıcının üye olduğu şirketlerin ID'leri
         company_ids = user.company_memberships.values_list('company_id', flat=True)
-        return Company.objects.filter(id__in=company_ids)
+        return self.queryset.filter(id__in=company_ids)
 
     @action(detail=False, methods=['get'])
     def mine(self, request):
@@ -71,5 +72,6 @@ class CompanyViewSet(viewsets.ModelViewSet):
         # Seçilen şirketi default yap
         membership.is_default = True
         membership.save()
+        clear_tenant(user)
 
         return Response({'status': 'success', 'message': f'Active company switched to {company.name}'})
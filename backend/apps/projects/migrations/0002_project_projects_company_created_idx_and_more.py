@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0003_customer_customers_company_name_idx_and_more"),
+        ("organization", "0001_initial"),
+        ("projects", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["company", "-created_at"], name="projects_company_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["company", "status"], name="projects_company_status_idx"
+            ),
+        ),
+    ]
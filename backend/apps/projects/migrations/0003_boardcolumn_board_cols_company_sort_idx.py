@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organization", "0001_initial"),
+        ("projects", "0002_project_projects_company_created_idx_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="boardcolumn",
+            index=models.Index(
+                fields=["company", "sort_order"], name="board_cols_company_sort_idx"
+            ),
+        ),
+    ]
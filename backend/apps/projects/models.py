@@ -21,6 +21,10 @@ class Project(AuditableModel):
     class Meta:
         db_table = 'projects'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['company', '-created_at'], name='projects_company_created_idx'),
+            models.Index(fields=['company', 'status'], name='projects_company_status_idx'),
+        ]
 
 
 class BoardColumn(AuditableModel):
@@ -32,3 +36,4 @@ class BoardColumn(AuditableModel):
     class Meta:
         db_table = 'board_columns'
         ordering = ['sort_order']
+        indexes = [models.Index(fields=['company', 'sort_order'], name='board_cols_company_sort_idx')]
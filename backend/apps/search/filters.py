@@ -0,0 +1,22 @@
+from rest_framework import filters
+from .services import index
+
+
+class IndexedSearchFilter(filters.SearchFilter):
+    """
+    ``?search=`` through the full-text index for views that set ``search_kind``,
+    instead of ``ILIKE '%term%'`` over ``search_fields``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        kind = getattr(view, 'search_kind', None)
+        text = request.query_params.get(self.search_param, '')
+        tenant = getattr(request, 'tenant', None)
+        if not kind or not tenant:
+            return super().filter_queryset(request, queryset, view)
+        # Superusers listing every company search every company's documents
+        sees_all = getattr(view, 'superuser_sees_all', False) and request.user.is_superuser
+        ids = index.matching_ids(None if sees_all else tenant.company_id, kind, text)
+        if ids is None:
+            return queryset
+        return queryset.filter(pk__in=ids)
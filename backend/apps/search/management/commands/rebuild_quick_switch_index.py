@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from apps.search.models import QuickSwitchEntry
+from apps.search.services import quickswitch
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the quick switcher prefix index of customers, domains, projects, leads and tasks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=sorted(quickswitch.SOURCES), help='Only rebuild this kind')
+        parser.add_argument('--missing', action='store_true',
+                            help='Skip kinds that already have entries (run after every migrate)')
+
+    def handle(self, *args, **options):
+        kinds = [options['kind']] if options['kind'] else list(quickswitch.SOURCES)
+        if options['missing']:
+            indexed = set(QuickSwitchEntry.objects.filter(kind__in=kinds).values_list('kind', flat=True).order_by().distinct())
+            kinds = [kind for kind in kinds if kind not in indexed]
+        for kind in kinds:
+            count = quickswitch.rebuild(kind)
+            self.stdout.write(self.style.SUCCESS(f'{kind}: {count} row(s) indexed.'))
@@ -0,0 +1,27 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from apps.search.models import SearchDocument
+from apps.search.services import index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the full-text search documents of customers, leads, projects and files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=sorted(index.SOURCES), help='Only rebuild this kind')
+        parser.add_argument('--missing', action='store_true',
+                            help='Skip kinds that already have documents (run after every migrate)')
+
+    def handle(self, *args, **options):
+        kinds = [options['kind']] if options['kind'] else list(index.SOURCES)
+        if options['missing']:
+            indexed = set(SearchDocument.objects.filter(kind__in=kinds).values_list('kind', flat=True).order_by().distinct())
+            kinds = [kind for kind in kinds if kind not in indexed]
+        for kind in kinds:
+            count = index.reindex(kind)
+            # Drop documents of rows deleted without signals (raw SQL, _raw_delete)
+            model = apps.get_model(index.SOURCES[kind][0])
+            stale, _ = SearchDocument.objects.filter(kind=kind).exclude(
+                object_id__in=model._base_manager.values('pk')
+            ).delete()
+            self.stdout.write(self.style.SUCCESS(f'{kind}: {count} document(s) indexed, {stale} stale removed.'))
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organization", "0001_initial"),
+        ("search", "0002_build_documents"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuickSwitchEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("customer", "Müşteri"),
+                            ("domain", "Domain"),
+                            ("project", "Proje"),
+                            ("lead", "Potansiyel Müşteri"),
+                            ("task", "Görev"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("object_id", models.PositiveBigIntegerField()),
+                ("label", models.CharField(max_length=255)),
+                ("key", models.CharField(db_collation="C", max_length=255)),
+                ("position", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "company",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="organization.company",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "quick_switch_entries",
+                "indexes": [
+                    models.Index(
+                        fields=["company", "key"], name="quick_switch_prefix_idx"
+                    ),
+                    models.Index(
+                        fields=["kind", "object_id"], name="quick_switch_object_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
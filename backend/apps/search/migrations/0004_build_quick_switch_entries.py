@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Entries are built after migrate by ``manage.py rebuild_quick_switch_index --missing``,
+    # which uses the current models and index code rather than importing them here
+
+    dependencies = [
+        ("search", "0003_quick_switch_entries"),
+        ("customers", "0004_customernote_cust_notes_company_date_idx"),
+        ("domains", "0002_domain_domains_company_expire_idx_and_more"),
+        ("leads", "0003_leadactivity_lead_act_company_date_idx"),
+        ("projects", "0003_boardcolumn_board_cols_company_sort_idx"),
+        ("tasks", "0003_task_tasks_company_sort_idx_and_more"),
+    ]
+
+    operations = []
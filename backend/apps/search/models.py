@@ -0,0 +1,53 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import models
+from core.models import CompanyOwnedModel
+
+
+class SearchDocument(CompanyOwnedModel):
+    """Aranabilir kaydın katlanmış (Türkçe büyük/küçük harf duyarsız) metni"""
+    KIND_CHOICES = [('customer', 'Müşteri'), ('lead', 'Potansiyel Müşteri'), ('project', 'Proje'), ('file', 'Dosya')]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=255)
+    subtitle = models.CharField(max_length=255, blank=True)
+    title_folded = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    vector = models.GeneratedField(
+        expression=SearchVector('title_folded', weight='A', config='simple') + SearchVector('body', weight='B', config='simple'),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        db_table = 'search_documents'
+        unique_together = ['kind', 'object_id']
+        indexes = [
+            GinIndex(fields=['vector'], name='search_docs_vector_idx'),
+            GinIndex(fields=['title_folded'], name='search_docs_title_trgm_idx', opclasses=['gin_trgm_ops']),
+            models.Index(fields=['company', 'kind'], name='search_docs_company_kind_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind}:{self.object_id}'
+
+
+class QuickSwitchEntry(models.Model):
+    """Hızlı geçiş kutusu için ön ek anahtarı; her kelime başlangıcı bir satır"""
+    KIND_CHOICES = [('customer', 'Müşteri'), ('domain', 'Domain'), ('project', 'Proje'), ('lead', 'Potansiyel Müşteri'), ('task', 'Görev')]
+
+    company = models.ForeignKey('organization.Company', on_delete=models.CASCADE, related_name='+', db_index=False)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    label = models.CharField(max_length=255)
+    # "C" collation: byte order lets the plain index serve both LIKE 'prefix%' and ORDER BY key
+    key = models.CharField(max_length=255, db_collation='C')
+    position = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        db_table = 'quick_switch_entries'
+        indexes = [
+            models.Index(fields=['company', 'key'], name='quick_switch_prefix_idx'),
+            models.Index(fields=['kind', 'object_id'], name='quick_switch_object_idx'),
+        ]
@@ -0,0 +1,145 @@
+"""
+Full-text search index.
+
+Every searchable row has one ``SearchDocument`` holding its text folded with
+``core.text.fold`` (Turkish İ/ı and accents removed, lowercased) and split into
+words of letters and digits. Queries are split the same way, so an email,
+host or file name matches by any of its parts: Postgres's own parser would
+keep ``ali@acme.com`` or ``rapor-final.pdf`` as one lexeme. Postgres
+keeps the weighted ``vector`` column generated from it; a GIN index serves
+word-prefix matches and a pg_trgm GIN index on the folded title serves fuzzy
+matches for misspelled names. Documents follow their rows through the
+signals in ``apps.search.signals``.
+"""
+import re
+from django.apps import apps as django_apps
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import F, Q
+from core.text import fold
+from apps.search.models import SearchDocument
+
+TOKEN_RE = re.compile(r'[^\W_]+')
+
+
+def _words(text):
+    """``text`` folded and reduced to its words, as the vector and the queries see it"""
+    return ' '.join(TOKEN_RE.findall(fold(text)))
+
+
+def _join(*values):
+    return ' '.join(str(value) for value in values if value)
+
+
+def _customer(obj):
+    return obj.company_name, obj.contact_person, _join(obj.contact_person, obj.email, obj.phone, obj.tax_number)
+
+
+def _lead(obj):
+    return obj.company_name, obj.contact_person, _join(obj.contact_person, obj.email, obj.phone)
+
+
+def _project(obj):
+    customer = obj.customer.company_name if obj.customer_id else ''
+    return obj.name, customer, _join(customer, obj.description)
+
+
+def _file(obj):
+    return obj.name, obj.folder.name if obj.folder_id else '', _join(obj.original_name)
+
+
+# kind -> (model label, related rows to load, builder returning (title, subtitle, body))
+SOURCES = {
+    'customer': ('customers.Customer', (), _customer),
+    'lead': ('leads.Lead', (), _lead),
+    'project': ('projects.Project', ('customer',), _project),
+    'file': ('files.File', ('folder',), _file),
+}
+
+
+def _document(kind, obj):
+    title, subtitle, body = SOURCES[kind][2](obj)
+    return SearchDocument(
+        company_id=obj.company_id,
+        kind=kind,
+        object_id=obj.pk,
+        title=(title or '')[:255],
+        subtitle=(subtitle or '')[:255],
+        title_folded=_words(title)[:255],
+        body=_words(body),
+    )
+
+
+def index_object(kind, obj):
+    doc = _document(kind, obj)
+    SearchDocument.objects.update_or_create(
+        kind=kind, object_id=obj.pk,
+        defaults={field: getattr(doc, field) for field in ('company_id', 'title', 'subtitle', 'title_folded', 'body')},
+    )
+
+
+def remove_object(kind, pk):
+    SearchDocument.objects.filter(kind=kind, object_id=pk).delete()
+
+
+def reindex(kind, queryset=None, batch_size=1000):
+    """(Re)build documents of ``kind`` for ``queryset`` (default: every row) in batches"""
+    label, related, _builder = SOURCES[kind]
+    if queryset is None:
+        queryset = django_apps.get_model(label)._base_manager.all()
+    queryset = queryset.select_related(*related).order_by('pk')
+    count = 0
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return count
+        SearchDocument.objects.bulk_create(
+            [_document(kind, obj) for obj in batch],
+            update_conflicts=True,
+            unique_fields=['kind', 'object_id'],
+            update_fields=['company', 'title', 'subtitle', 'title_folded', 'body', 'updated_at'],
+        )
+        count += len(batch)
+        last_pk = batch[-1].pk
+
+
+def build_query(text):
+    """Folded prefix tsquery for ``text`` (every word must match) and the folded text, or (None, '')"""
+    folded = fold(text)
+    tokens = TOKEN_RE.findall(folded)
+    if not tokens:
+        return None, ''
+    return SearchQuery(' & '.join(f'{token}:*' for token in tokens), search_type='raw', config='simple'), folded
+
+
+def _matches(query, folded):
+    # Word-prefix match through the vector index, or a fuzzy title match through the trigram index
+    return Q(vector=query) | Q(title_folded__trigram_similar=folded)
+
+
+def _score(query, folded):
+    return SearchRank(F('vector'), query) + TrigramSimilarity('title_folded', folded)
+
+
+def search(company_id, text, kinds=None, limit=20):
+    """Documents of the company matching ``text``, best first"""
+    query, folded = build_query(text)
+    if query is None:
+        return SearchDocument.objects.none()
+    documents = SearchDocument.objects.filter(company_id=company_id)
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+    return documents.filter(_matches(query, folded)).annotate(
+        score=_score(query, folded)
+    ).order_by('-score', 'title')[:limit]
+
+
+def matching_ids(company_id, kind, text):
+    """Subquery of ``object_id``s of ``kind`` matching ``text`` (any company when ``company_id`` is None)"""
+    query, folded = build_query(text)
+    if query is None:
+        return None
+    documents = SearchDocument.objects.filter(kind=kind)
+    if company_id is not None:
+        documents = documents.filter(company_id=company_id)
+    return documents.filter(_matches(query, folded)).values('object_id')
@@ -0,0 +1,85 @@
+"""
+Prefix index behind the quick switcher.
+
+Each customer, domain, project, lead and task name is stored in
+``QuickSwitchEntry`` once per word start, folded with ``core.text.fold``:
+"Yeni Ünvan AŞ" becomes the keys "yeni unvan as", "unvan as" and "as". A
+keystroke is then one ``key LIKE 'prefix%'`` range scan on the
+(company, key) index, without touching the source tables. Entries follow
+their rows through the signals in ``apps.search.signals``.
+"""
+import re
+from django.apps import apps as django_apps
+from core.text import fold
+from apps.search.models import QuickSwitchEntry
+
+WORD_START_RE = re.compile(r'\w+')
+
+# kind -> (model label, field shown and indexed)
+SOURCES = {
+    'customer': ('customers.Customer', 'company_name'),
+    'domain': ('domains.Domain', 'domain_name'),
+    'project': ('projects.Project', 'name'),
+    'lead': ('leads.Lead', 'company_name'),
+    'task': ('tasks.Task', 'title'),
+}
+
+
+def _entries(kind, obj):
+    label = (getattr(obj, SOURCES[kind][1]) or '')[:255]
+    folded = fold(label)
+    return [
+        QuickSwitchEntry(company_id=obj.company_id, kind=kind, object_id=obj.pk, label=label,
+                         key=folded[match.start():][:255], position=position)
+        for position, match in enumerate(WORD_START_RE.finditer(folded))
+    ]
+
+
+def index_object(kind, obj):
+    label = getattr(obj, SOURCES[kind][1]) or ''
+    current = QuickSwitchEntry.objects.filter(kind=kind, object_id=obj.pk, position=0)
+    if current.filter(label=label[:255], company_id=obj.company_id).exists():
+        return
+    remove_object(kind, obj.pk)
+    QuickSwitchEntry.objects.bulk_create(_entries(kind, obj))
+
+
+def remove_object(kind, pk):
+    QuickSwitchEntry.objects.filter(kind=kind, object_id=pk).delete()
+
+
+def rebuild(kind, batch_size=1000):
+    """Replace every entry of ``kind``; returns the number of rows indexed"""
+    label, field = SOURCES[kind]
+    QuickSwitchEntry.objects.filter(kind=kind).delete()
+    queryset = django_apps.get_model(label)._base_manager.only('pk', 'company_id', field).order_by('pk')
+    count = last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return count
+        QuickSwitchEntry.objects.bulk_create([entry for obj in batch for entry in _entries(kind, obj)])
+        count += len(batch)
+        last_pk = batch[-1].pk
+
+
+def lookup(company_id, text, kinds=None, limit=10):
+    """Up to ``limit`` rows whose name has a word starting with ``text``, name-start matches first"""
+    prefix = fold(text)
+    if not prefix:
+        return []
+    entries = QuickSwitchEntry.objects.filter(company_id=company_id, key__startswith=prefix)
+    if kinds:
+        entries = entries.filter(kind__in=kinds)
+    # Index order only, so the scan stops after a few rows; ranking happens on that small window
+    rows = entries.order_by('key').values_list('kind', 'object_id', 'label', 'position')[:limit * 4]
+
+    seen, results = set(), []
+    for kind, object_id, label, position in sorted(rows, key=lambda row: (row[3] > 0, len(row[2]))):
+        if (kind, object_id) in seen:
+            continue
+        seen.add((kind, object_id))
+        results.append({'type': kind, 'id': object_id, 'label': label})
+        if len(results) == limit:
+            break
+    return results
@@ -0,0 +1,52 @@
+from django.apps import apps
+from django.db.models.signals import post_save, post_delete
+from .services import index, quickswitch
+
+
+def update_search_document(sender, instance, raw=False, **kwargs):
+    if raw or not instance.company_id:
+        return
+    index.index_object(KIND_BY_MODEL[sender], instance)
+
+
+def remove_search_document(sender, instance, **kwargs):
+    index.remove_object(KIND_BY_MODEL[sender], instance.pk)
+
+
+def reindex_customer_projects(sender, instance, created=False, raw=False, **kwargs):
+    # Projects are found by their customer's name as well
+    if not raw and not created:
+        index.reindex('project', instance.projects.all())
+
+
+def reindex_folder_files(sender, instance, created=False, raw=False, **kwargs):
+    if not raw and not created:
+        index.reindex('file', instance.files.all())
+
+
+KIND_BY_MODEL = {apps.get_model(label): kind for kind, (label, _related, _builder) in index.SOURCES.items()}
+
+for model, kind in KIND_BY_MODEL.items():
+    post_save.connect(update_search_document, sender=model, dispatch_uid=f'search-save-{kind}')
+    post_delete.connect(remove_search_document, sender=model, dispatch_uid=f'search-delete-{kind}')
+
+post_save.connect(reindex_customer_projects, sender=apps.get_model('customers.Customer'), dispatch_uid='search-customer-projects')
+post_save.connect(reindex_folder_files, sender=apps.get_model('files.Folder'), dispatch_uid='search-folder-files')
+
+
+def update_quick_switch_entry(sender, instance, raw=False, update_fields=None, **kwargs):
+    field = quickswitch.SOURCES[QUICK_KIND_BY_MODEL[sender]][1]
+    if raw or not instance.company_id or (update_fields is not None and field not in update_fields):
+        return
+    quickswitch.index_object(QUICK_KIND_BY_MODEL[sender], instance)
+
+
+def remove_quick_switch_entry(sender, instance, **kwargs):
+    quickswitch.remove_object(QUICK_KIND_BY_MODEL[sender], instance.pk)
+
+
+QUICK_KIND_BY_MODEL = {apps.get_model(label): kind for kind, (label, _field) in quickswitch.SOURCES.items()}
+
+for model, kind in QUICK_KIND_BY_MODEL.items():
+    post_save.connect(update_quick_switch_entry, sender=model, dispatch_uid=f'quick-switch-save-{kind}')
+    post_delete.connect(remove_quick_switch_entry, sender=model, dispatch_uid=f'quick-switch-delete-{kind}')
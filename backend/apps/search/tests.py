@@ -0,0 +1,36 @@
+from core.testing import QueryCountTestCase
+from apps.customers.models import Customer
+from apps.files.models import File
+
+
+class SearchTokenTests(QueryCountTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.customer = Customer.objects.create(company=cls.company, company_name='Acme Ltd', contact_person='Ali Veli',
+                                               email='ali@acme.com.tr', phone='1')
+        cls.files = {
+            name: File.objects.create(company=cls.company, name=name, original_name=name, mime_type='application/pdf')
+            for name in ('fatura_2024.pdf', 'rapor-final.pdf')
+        }
+
+    def found(self, text, kind):
+        response = self.client.get('/api/v1/search/', {'q': text, 'types': kind})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_email_and_host_parts(self):
+        for text in ('ali@acme.com.tr', 'acme.com', 'acme.com.tr', 'com.tr', 'ali@'):
+            with self.subTest(text=text):
+                self.assertEqual(self.found(text, 'customer'), [self.customer.pk])
+
+    def test_file_name_parts(self):
+        for text, name in (('fatura_2024.pdf', 'fatura_2024.pdf'), ('fatura 2024', 'fatura_2024.pdf'), ('2024', 'fatura_2024.pdf'),
+                           ('rapor-final.pdf', 'rapor-final.pdf'), ('final', 'rapor-final.pdf'), ('rapor-fin', 'rapor-final.pdf')):
+            with self.subTest(text=text):
+                self.assertEqual(self.found(text, 'file'), [self.files[name].pk])
+        self.assertEqual(len(self.found('pdf', 'file')), 2)
+
+    def test_list_filter_uses_the_same_words(self):
+        response = self.client.get('/api/v1/customers/list/', {'search': 'acme.com'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.customer.pk])
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import QuickSwitchView, SearchView
+
+urlpatterns = [
+    path('', SearchView.as_view(), name='search'),
+    path('quick/', QuickSwitchView.as_view(), name='search-quick'),
+]
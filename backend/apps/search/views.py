@@ -0,0 +1,42 @@
+from rest_framework import views
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from core.permissions import IsCompanyMember
+from .services import index, quickswitch
+
+
+class SearchView(views.APIView):
+    """Ranked search across customers, leads, projects and files (?q=, ?types=customer,lead, ?limit=)"""
+    permission_classes = [IsAuthenticated, IsCompanyMember]
+    max_limit = 50
+
+    def get(self, request):
+        text = request.query_params.get('q', '')
+        kinds = [kind for kind in request.query_params.get('types', '').split(',') if kind in index.SOURCES]
+        limit = request.query_params.get('limit', '')
+        limit = min(int(limit), self.max_limit) if limit.isdigit() and int(limit) > 0 else 20
+
+        documents = index.search(request.tenant.company_id, text, kinds, limit)
+        return Response({
+            'query': text,
+            'results': [{
+                'type': doc.kind,
+                'type_display': doc.get_kind_display(),
+                'id': doc.object_id,
+                'title': doc.title,
+                'subtitle': doc.subtitle,
+                'score': round(doc.score, 4),
+            } for doc in documents],
+        })
+
+
+class QuickSwitchView(views.APIView):
+    """Typeahead for the quick switcher (?q=, ?types=customer,task, ?limit=), served from the prefix index only"""
+    permission_classes = [IsAuthenticated, IsCompanyMember]
+    max_limit = 20
+
+    def get(self, request):
+        kinds = [kind for kind in request.query_params.get('types', '').split(',') if kind in quickswitch.SOURCES]
+        limit = request.query_params.get('limit', '')
+        limit = min(int(limit), self.max_limit) if limit.isdigit() and int(limit) > 0 else 10
+        return Response(quickswitch.lookup(request.tenant.company_id, request.query_params.get('q', ''), kinds, limit))
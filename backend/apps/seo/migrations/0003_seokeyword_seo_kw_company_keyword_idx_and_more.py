@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0003_customer_customers_company_name_idx_and_more"),
+        ("domains", "0002_domain_domains_company_expire_idx_and_more"),
+        ("organization", "0001_initial"),
+        ("seo", "0002_align_company_with_package"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="seokeyword",
+            index=models.Index(
+                fields=["company", "keyword"], name="seo_kw_company_keyword_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seopackage",
+            index=models.Index(
+                fields=["company", "-created_at"], name="seo_pkg_company_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seopackage",
+            index=models.Index(
+                fields=["company", "status"], name="seo_pkg_company_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seoreport",
+            index=models.Index(
+                fields=["company", "-report_date"], name="seo_rep_company_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seotask",
+            index=models.Index(
+                fields=["company", "-created_at"], name="seo_task_company_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seotask",
+            index=models.Index(
+                fields=["company", "status"], name="seo_task_company_status_idx"
+            ),
+        ),
+    ]
@@ -32,6 +32,10 @@ class SEOPackage(AuditableModel):
     class Meta:
         db_table = 'seo_packages'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['company', '-created_at'], name='seo_pkg_company_created_idx'),
+            models.Index(fields=['company', 'status'], name='seo_pkg_company_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.customer.company_name} - {self.get_package_type_display()}"
@@ -52,6 +56,7 @@ class SEOKeyword(AuditableModel):
         db_table = 'seo_keywords'
         ordering = ['keyword']
         unique_together = ['package', 'keyword']
+        indexes = [models.Index(fields=['company', 'keyword'], name='seo_kw_company_keyword_idx')]
 
 
 class SEOReport(AuditableModel):
@@ -71,6 +76,7 @@ class SEOReport(AuditableModel):
         db_table = 'seo_reports'
         ordering = ['-report_date']
         unique_together = ['package', 'report_date']
+        indexes = [models.Index(fields=['company', '-report_date'], name='seo_rep_company_date_idx')]
 
 
 class SEOTask(AuditableModel):
@@ -101,3 +107,7 @@ class SEOTask(AuditableModel):
     class Meta:
         db_table = 'seo_tasks'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['company', '-created_at'], name='seo_task_company_created_idx'),
+            models.Index(fields=['company', 'status'], name='seo_task_company_status_idx'),
+        ]
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from core.aggregates import related_count
 from .models import SEOPackage, SEOKeyword, SEOReport, SEOTask
 
 
@@ -47,12 +48,14 @@ class SEOTaskSerializer(serializers.ModelSerializer):
 
 
 class SEOPackageSerializer(serializers.ModelSerializer):
+    annotations = {'keyword_count': related_count(SEOKeyword.objects.all(), 'package')}
+
     customer_name = serializers.CharField(source='customer.company_name', read_only=True)
     domain_name = serializers.CharField(source='domain.domain_name', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     package_type_display = serializers.CharField(source='get_package_type_display', read_only=True)
     keywords = SEOKeywordSerializer(many=True, read_only=True)
-    keyword_count = serializers.SerializerMethodField()
+    keyword_count = serializers.IntegerField(read_only=True, default=0)
 
     class Meta:
         model = SEOPackage
@@ -66,16 +69,15 @@ class SEOPackageSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'customer_name', 'domain_name', 'status_display',
                            'package_type_display', 'keywords', 'keyword_count', 'created_at', 'updated_at']
 
-    def get_keyword_count(self, obj):
-        return obj.keywords.count()
-
 
 class SEOPackageListSerializer(serializers.ModelSerializer):
+    annotations = {'keyword_count': related_count(SEOKeyword.objects.all(), 'package')}
+
     customer_name = serializers.CharField(source='customer.company_name', read_only=True)
     domain_name = serializers.CharField(source='domain.domain_name', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     package_type_display = serializers.CharField(source='get_package_type_display', read_only=True)
-    keyword_count = serializers.SerializerMethodField()
+    keyword_count = serializers.IntegerField(read_only=True, default=0)
 
     class Meta:
         model = SEOPackage
@@ -84,6 +86,3 @@ class SEOPackageListSerializer(serializers.ModelSerializer):
             'package_type', 'package_type_display', 'status', 'status_display',
             'start_date', 'monthly_fee', 'currency', 'keyword_count'
         ]
-
-    def get_keyword_count(self, obj):
-        return obj.keywords.count()
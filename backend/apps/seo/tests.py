@@ -0,0 +1,27 @@
+import datetime
+from core.testing import QueryCountTestCase
+from apps.customers.models import Customer
+from apps.domains.models import Domain
+from .models import SEOKeyword, SEOPackage
+
+
+class SEOQueryCountTests(QueryCountTestCase):
+    def make_package(self, i):
+        today = datetime.date.today()
+        customer = Customer.objects.create(company=self.company, company_name=f'Customer {i}', contact_person='x', email='a@example.com', phone='1')
+        domain = Domain.objects.create(company=self.company, customer=customer, domain_name=f'd{i}.com', registrar='r',
+                                       register_date=today, expire_date=today)
+        package = SEOPackage.objects.create(company=self.company, customer=customer, domain=domain, start_date=today, monthly_fee=10)
+        SEOKeyword.objects.create(company=self.company, package=package, keyword=f'k{i}')
+        return package
+
+    def test_package_list(self):
+        self.assertConstantQueries('/api/v1/seo/packages/', self.make_package)
+
+    def test_package_detail(self):
+        package = self.make_package(0)
+        self.assertConstantQueries(
+            f'/api/v1/seo/packages/{package.pk}/',
+            lambda i: SEOKeyword.objects.create(company=self.company, package=package, keyword=f'extra {i}'),
+        )
+        self.assertEqual(self.client.get(f'/api/v1/seo/packages/{package.pk}/').data['keyword_count'], self.rows + 1)
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.9 on 2026-10-18 10:00
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def align_company(apps, schema_editor):
+    # Tenant filtering now uses the local company_id; copy it from the parent row
+    parents = apps.get_model('tasks', 'Task').objects.filter(pk=OuterRef('task_id'))
+    apps.get_model('tasks', 'TimeEntry').objects.update(company_id=Subquery(parents.values('company_id')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(align_company, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organization", "0001_initial"),
+        ("projects", "0002_project_projects_company_created_idx_and_more"),
+        ("tasks", "0002_align_time_entry_company"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["company", "sort_order", "-created_at"],
+                name="tasks_company_sort_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["company", "status"], name="tasks_company_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="timeentry",
+            index=models.Index(
+                fields=["company", "-started_at"], name="time_entries_company_start_idx"
+            ),
+        ),
+    ]
@@ -24,9 +24,16 @@ class Task(AuditableModel):
     class Meta:
         db_table = 'tasks'
         ordering = ['sort_order', '-created_at']
+        indexes = [
+            models.Index(fields=['company', 'sort_order', '-created_at'], name='tasks_company_sort_idx'),
+            models.Index(fields=['company', 'status'], name='tasks_company_status_idx'),
+        ]
 
     @property
     def total_time_spent(self):
+        # Annotated as ``time_spent`` by the task serializer's queryset
+        if 'time_spent' in self.__dict__:
+            return self.time_spent
         return self.time_entries.aggregate(total=models.Sum('duration_minutes'))['total'] or 0
 
 
@@ -59,6 +66,7 @@ class TimeEntry(AuditableModel):
     class Meta:
         db_table = 'time_entries'
         ordering = ['-started_at']
+        indexes = [models.Index(fields=['company', '-started_at'], name='time_entries_company_start_idx')]
 
     def save(self, *args, **kwargs):
         if self.ended_at and self.started_at:
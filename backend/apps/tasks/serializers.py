@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from core.aggregates import related_count, related_sum
 from .models import Task, TaskTag, TimeEntry
 
 
@@ -19,13 +20,18 @@ class TimeEntrySerializer(serializers.ModelSerializer):
 
 
 class TaskSerializer(serializers.ModelSerializer):
+    annotations = {
+        'subtask_count': related_count(Task.objects.all(), 'parent'),
+        'time_spent': related_sum(TimeEntry.objects.all(), 'task', 'duration_minutes'),
+    }
+
     project_name = serializers.CharField(source='project.name', read_only=True)
     assigned_to_name = serializers.CharField(source='assigned_to.get_full_name', read_only=True)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     priority_display = serializers.CharField(source='get_priority_display', read_only=True)
     total_time_spent = serializers.IntegerField(read_only=True)
-    subtask_count = serializers.IntegerField(read_only=True, default=0)  # Annotated in view
+    subtask_count = serializers.IntegerField(read_only=True, default=0)
 
     class Meta:
         model = Task
@@ -0,0 +1,44 @@
+import datetime
+from django.utils import timezone
+from core.testing import QueryCountTestCase
+from apps.projects.models import Project
+from .models import Task, TaskTag, TimeEntry
+
+
+class TaskQueryCountTests(QueryCountTestCase):
+    def setUp(self):
+        super().setUp()
+        self.project = Project.objects.create(company=self.company, name='Project', status='planning')
+
+    def make_task(self, i):
+        task = Task.objects.create(company=self.company, project=self.project, title=f'Task {i}',
+                                   assigned_to=self.user, created_by=self.user)
+        Task.objects.create(company=self.company, project=self.project, title=f'Subtask {i}', parent=task)
+        TimeEntry.objects.create(company=self.company, task=task, user=self.user, started_at=timezone.now(), duration_minutes=5)
+        return task
+
+    def test_task_list(self):
+        self.assertConstantQueries('/api/v1/tasks/list/', self.make_task)
+
+    def test_task_kanban(self):
+        self.assertConstantQueries('/api/v1/tasks/list/kanban/', self.make_task)
+
+    def test_task_detail(self):
+        task = self.make_task(0)
+        self.assertConstantQueries(
+            f'/api/v1/tasks/list/{task.pk}/',
+            lambda i: TimeEntry.objects.create(company=self.company, task=task, user=self.user,
+                                               started_at=timezone.now() - datetime.timedelta(hours=i), duration_minutes=10),
+        )
+        data = self.client.get(f'/api/v1/tasks/list/{task.pk}/').data
+        self.assertEqual((data['total_time_spent'], data['subtask_count']), (5 + 10 * self.rows, 1))
+
+    def test_time_entry_list(self):
+        task = self.make_task(0)
+        self.assertConstantQueries(
+            '/api/v1/tasks/time-entries/',
+            lambda i: TimeEntry.objects.create(company=self.company, task=task, user=self.user, started_at=timezone.now(), duration_minutes=1),
+        )
+
+    def test_tag_list(self):
+        self.assertConstantQueries('/api/v1/tasks/tags/', lambda i: TaskTag.objects.create(company=self.company, name=f'tag {i}'))
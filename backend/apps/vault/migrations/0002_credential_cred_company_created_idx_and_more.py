@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0004_customernote_cust_notes_company_date_idx"),
+        ("organization", "0001_initial"),
+        ("vault", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="credential",
+            index=models.Index(
+                fields=["company", "-created_at"], name="cred_company_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mailaccount",
+            index=models.Index(
+                fields=["company", "-created_at"], name="mail_acc_company_created_idx"
+            ),
+        ),
+    ]
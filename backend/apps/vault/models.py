@@ -21,6 +21,7 @@ class Credential(AuditableModel):
 
     class Meta:
         db_table = 'credentials'
+        indexes = [models.Index(fields=['company', '-created_at'], name='cred_company_created_idx')]
 
 
 class MailAccount(AuditableModel):
@@ -36,3 +37,4 @@ class MailAccount(AuditableModel):
 
     class Meta:
         db_table = 'mail_accounts'
+        indexes = [models.Index(fields=['company', '-created_at'], name='mail_acc_company_created_idx')]
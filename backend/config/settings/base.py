@@ -10,6 +10,7 @@ ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='localhost,127.0.0.1', cast=Csv(
 DJANGO_APPS = [
     'django.contrib.admin', 'django.contrib.auth', 'django.contrib.contenttypes',
     'django.contrib.sessions', 'django.contrib.messages', 'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 THIRD_PARTY_APPS = [
     'rest_framework', 'rest_framework_simplejwt', 'rest_framework_simplejwt.token_blacklist',
@@ -20,16 +21,19 @@ LOCAL_APPS = [
     'core', 'apps.organization', 'apps.accounts', 'apps.customers', 'apps.leads',
     'apps.domains', 'apps.vault', 'apps.projects', 'apps.tasks', 'apps.seo',
     'apps.finance', 'apps.files', 'apps.whatsapp', 'apps.references',
-    'apps.notifications', 'apps.audit',
+    'apps.notifications', 'apps.audit', 'apps.dashboard', 'apps.search',
 ]
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    # INSTRUMENTATION_ENABLED kapalıyken kendini devreden çıkarır; en dışta, tüm yığını ölçer
+    'core.instrumentation.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware', 'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware', 'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware', 'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django_otp.middleware.OTPMiddleware', 'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware', 'apps.audit.middleware.AuditLogMiddleware',
+    'core.middleware.TenantContextMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -60,15 +64,76 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {'ACCESS_TOKEN_LIFETIME': timedelta(hours=1), 'REFRESH_TOKEN_LIFETIME': timedelta(days=7), 'ROTATE_REFRESH_TOKENS': True, 'BLACKLIST_AFTER_ROTATION': True}
 CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='http://localhost:3000', cast=Csv())
 CORS_ALLOW_CREDENTIALS = True
-CELERY_BROKER_URL = config('REDIS_URL', default='redis://localhost:6379/0')
+REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
+CACHES = {'default': {'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.redis.RedisCache'), 'LOCATION': config('CACHE_URL', default=REDIS_URL), 'KEY_PREFIX': 'crm'}}
+CELERY_BROKER_URL = REDIS_URL
 CELERY_RESULT_BACKEND = 'django-db'
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=False, cast=bool)
+CELERY_BEAT_SCHEDULE = {
+    # Tarihe bağlı sayaçlar (yaklaşan bitişler, bu ay) için periyodik onarım
+    'rebuild-dashboard-snapshots': {'task': 'apps.dashboard.tasks.rebuild_dashboard_snapshots', 'schedule': timedelta(hours=1)},
+    'collect-orphan-file-blobs': {'task': 'apps.files.tasks.collect_orphan_blobs', 'schedule': timedelta(hours=6)},
+    'purge-expired-file-archives': {'task': 'apps.files.tasks.purge_expired_archives', 'schedule': timedelta(hours=1)},
+}
 VAULT_ENCRYPTION_KEY = config('VAULT_ENCRYPTION_KEY', default='')
 
+# Görüntüleme/indirme sayaçları: True ise artışlar Redis'te biriktirilip periyodik olarak toplu yazılır
+COUNTER_BUFFER = config('COUNTER_BUFFER', default=False, cast=bool)
+COUNTER_FLUSH_INTERVAL = config('COUNTER_FLUSH_INTERVAL', default=60, cast=int)
+if COUNTER_BUFFER:
+    CELERY_BEAT_SCHEDULE['flush-counters'] = {'task': 'core.tasks.flush_counters', 'schedule': timedelta(seconds=COUNTER_FLUSH_INTERVAL)}
+
+# RBAC izin önbelleği (süreç içi LRU + paylaşılan cache)
+RBAC_LOCAL_CACHE_SIZE = config('RBAC_LOCAL_CACHE_SIZE', default=1024, cast=int)
+RBAC_CACHE_TIMEOUT = config('RBAC_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Dosya ağacı önbelleği (saniye)
+FILES_TREE_CACHE_TIMEOUT = config('FILES_TREE_CACHE_TIMEOUT', default=300, cast=int)
+
+# Dosya indirme: True ise dosyayı nginx X-Accel-Redirect ile sunar (docker/nginx.conf /protected-media/)
+FILES_X_ACCEL_REDIRECT = config('FILES_X_ACCEL_REDIRECT', default=False, cast=bool)
+FILES_X_ACCEL_PREFIX = config('FILES_X_ACCEL_PREFIX', default='/protected-media/')
+
+# Referanssız dosya içeriklerinin silinmeden önce beklediği süre (saniye)
+FILES_BLOB_GC_GRACE = config('FILES_BLOB_GC_GRACE', default=3600, cast=int)
+
+# Küçük resim / önizleme boyutları (en uzun kenar, piksel); PDF için PyMuPDF kuruluysa ilk sayfa çizilir
+FILES_THUMBNAIL_SIZE = config('FILES_THUMBNAIL_SIZE', default=256, cast=int)
+FILES_PREVIEW_SIZE = config('FILES_PREVIEW_SIZE', default=1024, cast=int)
+
+# Toplu ZIP indirmeleri: en fazla dosya sayısı ve arşivin saklanma süresi (saniye)
+FILES_ARCHIVE_MAX_FILES = config('FILES_ARCHIVE_MAX_FILES', default=5000, cast=int)
+FILES_ARCHIVE_TTL = config('FILES_ARCHIVE_TTL', default=86400, cast=int)
+
 # Google Drive Ayarları
 GOOGLE_DRIVE_CREDENTIALS_PATH = BASE_DIR / 'credentials' / 'google-service-account.json'
 GOOGLE_DRIVE_FOLDER_ID = '11FMbGh_Tm-QqBW6g7talweW5zNAgLcyH'
 
 # Google Drive OAuth 2.0
 GOOGLE_OAUTH_CREDENTIALS_PATH = BASE_DIR / 'credentials' / 'oauth-client.json'
-FRONTEND_URL = 'http://localhost:3001'
\ No newline at end of file
+# Kullanıcı başına Drive istemci önbelleği (iş parçacığı başına LRU, saniye cinsinden TTL)
+GOOGLE_DRIVE_CLIENT_CACHE_SIZE = config('GOOGLE_DRIVE_CLIENT_CACHE_SIZE', default=64, cast=int)
+GOOGLE_DRIVE_CLIENT_TTL = config('GOOGLE_DRIVE_CLIENT_TTL', default=1800, cast=int)
+# Drive API adresi; boşsa Google kullanılır (testlerde yerel sahte sunucu verilebilir)
+GOOGLE_DRIVE_API_ENDPOINT = config('GOOGLE_DRIVE_API_ENDPOINT', default='') or None
+# Drive değişiklik akışının yoklanma aralığı (saniye)
+GOOGLE_DRIVE_SYNC_INTERVAL = config('GOOGLE_DRIVE_SYNC_INTERVAL', default=300, cast=int)
+CELERY_BEAT_SCHEDULE['poll-drive-changes'] = {'task': 'apps.files.tasks.poll_drive_changes', 'schedule': timedelta(seconds=GOOGLE_DRIVE_SYNC_INTERVAL)}
+FRONTEND_URL = 'http://localhost:3001'
+
+# İstek ölçümleri (isteğe bağlı): görünüm/aksiyon başına sorgu sayısı, DB, serializer, önbellek ve dış çağrı süreleri
+INSTRUMENTATION_ENABLED = config('INSTRUMENTATION_ENABLED', default=False, cast=bool)
+# /metrics verisinin tutulduğu yer: 'redis' (tüm worker'lar ortak) veya 'local' (süreç içi, runserver)
+INSTRUMENTATION_METRICS_STORE = config('INSTRUMENTATION_METRICS_STORE', default='redis')
+# Boş değilse /metrics 'Authorization: Bearer <token>' ister
+INSTRUMENTATION_METRICS_TOKEN = config('INSTRUMENTATION_METRICS_TOKEN', default='')
+# Bu süreyi (ms) aşan istekler SQL'leriyle loglanır; loglanan en fazla farklı sorgu sayısı
+INSTRUMENTATION_SLOW_REQUEST_MS = config('INSTRUMENTATION_SLOW_REQUEST_MS', default=1000, cast=int)
+INSTRUMENTATION_SLOW_SQL_LIMIT = config('INSTRUMENTATION_SLOW_SQL_LIMIT', default=20, cast=int)
+# Profillenen isteklerin oranı (0-1); 'pyinstrument' kuruluysa HTML, değilse cProfile (.prof) çıktısı
+INSTRUMENTATION_PROFILE_SAMPLE_RATE = config('INSTRUMENTATION_PROFILE_SAMPLE_RATE', default=0.0, cast=float)
+INSTRUMENTATION_PROFILER = config('INSTRUMENTATION_PROFILER', default='cprofile')
+# Profil dosyaları MEDIA_ROOT dışında tutulur; en yeni N dosya saklanır
+INSTRUMENTATION_PROFILE_DIR = config('INSTRUMENTATION_PROFILE_DIR', default=str(BASE_DIR / 'profiles'))
+INSTRUMENTATION_PROFILE_KEEP = config('INSTRUMENTATION_PROFILE_KEEP', default=200, cast=int)
\ No newline at end of file
@@ -3,6 +3,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from core.instrumentation.views import metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -19,6 +20,11 @@ urlpatterns = [
     path('api/v1/finance/', include('apps.finance.urls')),
     path('api/v1/files/', include('apps.files.urls')),
     path('api/v1/seo/', include('apps.seo.urls')),
+    path('api/v1/dashboard/', include('apps.dashboard.urls')),
+    path('api/v1/search/', include('apps.search.urls')),
+    path('api/v1/audit/', include('apps.audit.urls')),
+    path('api/v1/instrumentation/', include('core.instrumentation.urls')),
+    path('metrics', metrics, name='metrics'),
 ]
 
 if settings.DEBUG:
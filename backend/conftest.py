@@ -0,0 +1,9 @@
+import pytest
+from django.test import override_settings
+
+
+@pytest.fixture(autouse=True, scope='session')
+def media_root(tmp_path_factory):
+    """Keep uploads, blobs, thumbnails and archives written by tests out of backend/media/"""
+    with override_settings(MEDIA_ROOT=str(tmp_path_factory.mktemp('media'))):
+        yield
@@ -0,0 +1,60 @@
+"""
+Single-query summaries.
+
+Summary endpoints describe a queryset with several counts and totals. Instead
+of one COUNT/SUM round trip per figure, each figure is declared as a
+conditional aggregate and the whole summary is evaluated with one
+``aggregate()`` call.
+"""
+from decimal import Decimal
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def count_if(*args, **lookups):
+    """COUNT of the rows matching the given Q objects/lookups (all rows when empty)."""
+    condition = Q(*args, **lookups)
+    return Count('pk', filter=condition) if condition else Count('pk')
+
+
+def sum_if(field, *args, **lookups):
+    """SUM of ``field`` over the rows matching the given Q objects/lookups."""
+    condition = Q(*args, **lookups)
+    return Sum(field, filter=condition) if condition else Sum(field)
+
+
+def status_counts(field, choices):
+    """Conditional counts keyed by every value in ``choices``."""
+    return {value: count_if(**{field: value}) for value, _label in choices}
+
+
+def summarize(queryset, **aggregates):
+    """
+    Evaluate all ``aggregates`` in one query.
+
+    Empty sums come back as 0 and decimals as floats so the result can be
+    returned from an API view as is.
+    """
+    result = queryset.order_by().aggregate(**aggregates)
+    for key, value in result.items():
+        if value is None:
+            result[key] = 0
+        elif isinstance(value, Decimal):
+            result[key] = float(value)
+    return result
+
+
+def related_count(queryset, field):
+    """
+    Per-row COUNT of ``queryset`` rows whose ``field`` points at the outer row,
+    as a correlated subquery: unlike ``Count('<relation>')`` it adds no join,
+    so several can be annotated together without multiplying rows.
+    """
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(n=Count('pk')).values('n')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def related_sum(queryset, field, value):
+    """Per-row SUM of ``value`` over ``queryset`` rows pointing at the outer row, see ``related_count``."""
+    sums = queryset.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(total=Sum(value)).values('total')
+    return Coalesce(Subquery(sums), 0)
@@ -0,0 +1,14 @@
+"""
+Opt-in request instrumentation (``INSTRUMENTATION_ENABLED``).
+
+- ``recorder``: per-request measurements and the hooks that collect them
+- ``metrics``: aggregation per view and action, Prometheus text output (``/metrics``)
+- ``profiling``: sampled cProfile/pyinstrument profiles (``/api/v1/instrumentation/profiles/``)
+- ``middleware``: ties them together and logs slow requests with their SQL
+
+Code calling outside services wraps the call in ``external_call('<service>')``
+or, for googleapiclient, passes ``TimedHttp`` as the service's ``http``.
+"""
+from .recorder import TimedHttp, current, external_call
+
+__all__ = ['TimedHttp', 'current', 'external_call']
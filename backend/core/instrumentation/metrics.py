@@ -0,0 +1,160 @@
+"""
+Aggregated request metrics in the Prometheus text format.
+
+Series are ``(name, labels)`` pairs whose values only ever grow (counters,
+histogram buckets and sums), so the store is a map of running totals:
+- ``redis`` (default): one hash shared by every worker and container, so a
+  scrape of any worker sees the whole deployment;
+- ``local``: in-process totals, for a single process such as runserver.
+If Redis is unreachable the request's increments are dropped.
+"""
+import json
+import logging
+import threading
+from collections import defaultdict
+from django.conf import settings
+
+logger = logging.getLogger('core.instrumentation')
+
+REDIS_KEY = 'crm:instrumentation:metrics'
+PREFIX = 'crm'
+# Request duration histogram buckets (seconds)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+METRICS = {
+    'http_requests_total': ('counter', 'Requests by view, action, method and status'),
+    'http_request_duration_seconds': ('histogram', 'Request wall time'),
+    'db_queries_total': ('counter', 'Database queries'),
+    'db_duration_seconds_total': ('counter', 'Time spent in database queries'),
+    'serializer_duration_seconds_total': ('counter', 'Time spent serializing responses, including the queries it triggers'),
+    'cache_hits_total': ('counter', 'Django cache lookups that found a value'),
+    'cache_misses_total': ('counter', 'Django cache lookups that found nothing'),
+    'external_calls_total': ('counter', 'Calls to outside services'),
+    'external_duration_seconds_total': ('counter', 'Time spent in calls to outside services'),
+    'slow_requests_total': ('counter', 'Requests slower than INSTRUMENTATION_SLOW_REQUEST_MS'),
+    'profiled_requests_total': ('counter', 'Requests sampled for profiling'),
+}
+
+
+class LocalStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = defaultdict(float)
+
+    def add(self, increments):
+        with self._lock:
+            for series, amount in increments:
+                self._values[series] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class RedisStore:
+    def __init__(self):
+        self._client = None
+
+    def _redis(self):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(settings.REDIS_URL)
+        return self._client
+
+    def add(self, increments):
+        try:
+            pipe = self._redis().pipeline(transaction=False)
+            for (name, labels), amount in increments:
+                pipe.hincrbyfloat(REDIS_KEY, json.dumps([name, labels]), amount)
+            pipe.execute()
+        except Exception as e:
+            logger.warning('Instrumentation metrics not stored: %s', e)
+
+    def snapshot(self):
+        values = {}
+        for field, value in self._redis().hgetall(REDIS_KEY).items():
+            name, labels = json.loads(field)
+            values[(name, tuple(tuple(pair) for pair in labels))] = float(value)
+        return values
+
+    def clear(self):
+        self._redis().delete(REDIS_KEY)
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = LocalStore() if settings.INSTRUMENTATION_METRICS_STORE == 'local' else RedisStore()
+    return _store
+
+
+def increments_for(view, action, method, status, seconds, metrics, slow=False, profiled=False):
+    """Series increments of one finished request"""
+    labels = (('view', view), ('action', action))
+    increments = [
+        (('http_requests_total', labels + (('method', method), ('status', str(status)))), 1),
+        (('http_request_duration_seconds_count', labels), 1),
+        (('http_request_duration_seconds_sum', labels), seconds),
+        (('db_queries_total', labels), metrics.queries),
+        (('db_duration_seconds_total', labels), metrics.db_ms / 1000),
+        (('serializer_duration_seconds_total', labels), metrics.serializer_ms / 1000),
+        (('cache_hits_total', labels), metrics.cache_hits),
+        (('cache_misses_total', labels), metrics.cache_misses),
+    ]
+    # Buckets are cumulative: a request counts in every bucket at or above its duration.
+    # The others get 0 so every bucket series exists, as Prometheus expects.
+    for bound in BUCKETS:
+        increments.append((('http_request_duration_seconds_bucket', labels + (('le', str(bound)),)), int(seconds <= bound)))
+    increments.append((('http_request_duration_seconds_bucket', labels + (('le', '+Inf'),)), 1))
+    for service, (calls, ms) in metrics.external.items():
+        service_labels = labels + (('service', service),)
+        increments.append((('external_calls_total', service_labels), calls))
+        increments.append((('external_duration_seconds_total', service_labels), ms / 1000))
+    if slow:
+        increments.append((('slow_requests_total', labels), 1))
+    if profiled:
+        increments.append((('profiled_requests_total', labels), 1))
+    return increments
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+def render(values):
+    """Prometheus text exposition of a store snapshot"""
+    by_metric = defaultdict(list)
+    for (name, labels), value in values.items():
+        base = name
+        for suffix in ('_bucket', '_count', '_sum'):
+            if name.endswith(suffix) and name[:-len(suffix)] in METRICS:
+                base = name[:-len(suffix)]
+        by_metric[base].append((name, labels, value))
+
+    lines = []
+    for base, (kind, description) in METRICS.items():
+        lines.append(f'# HELP {PREFIX}_{base} {description}')
+        lines.append(f'# TYPE {PREFIX}_{base} {kind}')
+        for name, labels, value in sorted(by_metric.get(base, ()), key=_sort_key):
+            label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels)
+            lines.append(f'{PREFIX}_{name}{{{label_text}}} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def _sort_key(item):
+    name, labels, _value = item
+    # Keep histogram buckets in bound order after the other labels
+    plain = tuple(pair for pair in labels if pair[0] != 'le')
+    bound = next((float(val) for key, val in labels if key == 'le'), 0.0)
+    return plain, name, bound
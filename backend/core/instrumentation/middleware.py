@@ -0,0 +1,102 @@
+import logging
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from . import metrics as metrics_store, profiling, recorder
+
+logger = logging.getLogger('core.instrumentation')
+
+EXCLUDED_PREFIXES = ('/metrics', '/static/', '/media/')
+
+
+def view_labels(request):
+    """(view, action) of the resolved view; DRF viewsets report their action"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved', request.method.lower()
+    view = getattr(match.func, 'cls', None) or getattr(match.func, 'view_class', None) or match.func
+    actions = getattr(match.func, 'actions', None) or {}
+    return f'{view.__module__}.{view.__qualname__}', actions.get(request.method.lower(), request.method.lower())
+
+
+class InstrumentationMiddleware:
+    """
+    Opt-in (``INSTRUMENTATION_ENABLED``) per-request measurements: queries, DB,
+    serializer, cache and external call time, aggregated per view and action
+    for ``/metrics``. Slow requests are logged with their SQL, and a sampled
+    fraction is profiled. Each response carries a ``Server-Timing`` header.
+    """
+
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        recorder.install()
+
+    def __call__(self, request):
+        if request.path.startswith(EXCLUDED_PREFIXES):
+            return self.get_response(request)
+
+        metrics = recorder.start()
+        profiler = None
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder.query_timer))
+                started = time.perf_counter()
+                if profiling.should_profile():
+                    profiler = profiling.start()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profile = profiler.stop() if profiler else None
+                elapsed = time.perf_counter() - started
+        finally:
+            recorder.stop()
+
+        self.finish(request, response, metrics, elapsed, profile)
+        return response
+
+    def finish(self, request, response, metrics, elapsed, profile):
+        view, action = view_labels(request)
+        elapsed_ms = elapsed * 1000
+        slow = elapsed_ms >= settings.INSTRUMENTATION_SLOW_REQUEST_MS
+        if slow:
+            logger.warning(self.slow_request_message(request, view, action, elapsed_ms, metrics))
+        if profile:
+            try:
+                profiling.save(*profile, view, action, elapsed_ms)
+            except OSError as e:
+                logger.warning('Profile of %s.%s not saved: %s', view, action, e)
+
+        metrics_store.get_store().add(metrics_store.increments_for(
+            view, action, request.method, response.status_code, elapsed, metrics, slow=slow, profiled=bool(profile),
+        ))
+        response['Server-Timing'] = ', '.join(
+            [f'db;dur={metrics.db_ms:.1f}', f'serializer;dur={metrics.serializer_ms:.1f}']
+            + [f'{service};dur={ms:.1f}' for service, (_calls, ms) in metrics.external.items()]
+            + [f'total;dur={elapsed_ms:.1f}']
+        )
+
+    @staticmethod
+    def slow_request_message(request, view, action, elapsed_ms, metrics):
+        external = ', '.join(f'{service} {calls}x {ms:.0f} ms' for service, (calls, ms) in metrics.external.items()) or 'none'
+        lines = [
+            f'Slow request {request.method} {request.path} ({view}.{action}) {elapsed_ms:.0f} ms: '
+            f'{metrics.queries} queries in {metrics.db_ms:.0f} ms, serializer {metrics.serializer_ms:.0f} ms, '
+            f'cache {metrics.cache_hits} hits / {metrics.cache_misses} misses, external {external}'
+        ]
+        # Identical statements grouped, so a query per row shows up as one line with a high count
+        grouped = defaultdict(lambda: [0, 0.0])
+        for ms, sql in metrics.sql:
+            grouped[sql][0] += 1
+            grouped[sql][1] += ms
+        top = sorted(grouped.items(), key=lambda item: item[1][1], reverse=True)
+        for sql, (count, ms) in top[:settings.INSTRUMENTATION_SLOW_SQL_LIMIT]:
+            lines.append(f'  {ms:8.1f} ms  {count:>4}x  {sql}')
+        if len(top) > settings.INSTRUMENTATION_SLOW_SQL_LIMIT:
+            lines.append(f'  ... {len(top) - settings.INSTRUMENTATION_SLOW_SQL_LIMIT} more distinct statements')
+        return '\n'.join(lines)
@@ -0,0 +1,102 @@
+"""
+Sampled request profiles.
+
+A fraction (``INSTRUMENTATION_PROFILE_SAMPLE_RATE``) of requests runs under
+cProfile, or pyinstrument when it is installed and selected. The output is
+written to ``INSTRUMENTATION_PROFILE_DIR``, outside MEDIA_ROOT so nginx never
+serves it, and only the newest ``INSTRUMENTATION_PROFILE_KEEP`` files are kept.
+``.prof`` files open with ``python -m pstats`` or snakeviz, ``.html`` files in
+a browser.
+"""
+import cProfile
+import marshal
+import random
+import re
+import threading
+import uuid
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+
+try:
+    import pyinstrument  # optional
+except ImportError:
+    pyinstrument = None
+
+NAME_RE = re.compile(r'^[\w.-]+\.(prof|html)$')
+# The interpreter allows one active profiler (Python 3.12+ raises otherwise), so
+# a sample is skipped while another thread's request is being profiled
+_lock = threading.Lock()
+
+
+def should_profile():
+    rate = settings.INSTRUMENTATION_PROFILE_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+class Profiler:
+    """Running profiler; ``stop()`` returns (content, file extension)"""
+
+    def __init__(self):
+        if settings.INSTRUMENTATION_PROFILER == 'pyinstrument' and pyinstrument is not None:
+            self._profiler = pyinstrument.Profiler()
+            self._profiler.start()
+        else:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self):
+        try:
+            if isinstance(self._profiler, cProfile.Profile):
+                self._profiler.disable()
+                self._profiler.create_stats()
+                # Same bytes as Profile.dump_stats(), without a temporary file
+                return marshal.dumps(self._profiler.stats), 'prof'
+            self._profiler.stop()
+            return self._profiler.output_html().encode(), 'html'
+        finally:
+            _lock.release()
+
+
+def start():
+    """A running ``Profiler``, or None when another profiler is active"""
+    if not _lock.acquire(blocking=False):
+        return None
+    try:
+        return Profiler()
+    except (ValueError, RuntimeError):
+        # Another profiling tool (a debugger, coverage) holds the interpreter's profiler
+        _lock.release()
+        return None
+
+
+def storage():
+    return FileSystemStorage(location=settings.INSTRUMENTATION_PROFILE_DIR)
+
+
+def save(content, extension, view, action, elapsed_ms):
+    """Store one profile and drop the oldest beyond the retention limit; returns its name"""
+    view_name = view.rsplit('.', 1)[-1]
+    name = f'{timezone.now():%Y%m%dT%H%M%S}-{view_name}-{action}-{elapsed_ms:.0f}ms-{uuid.uuid4().hex[:8]}.{extension}'
+    name = re.sub(r'[^\w.-]', '_', name)
+    store = storage()
+    store.save(name, ContentFile(content))
+    prune(store)
+    return name
+
+
+def list_profiles(store=None):
+    """Stored profiles, newest first"""
+    store = store or storage()
+    try:
+        _dirs, files = store.listdir('')
+    except FileNotFoundError:
+        return []
+    # Names start with a sortable timestamp
+    return sorted((name for name in files if NAME_RE.match(name)), reverse=True)
+
+
+def prune(store):
+    for name in list_profiles(store)[settings.INSTRUMENTATION_PROFILE_KEEP:]:
+        store.delete(name)
@@ -0,0 +1,192 @@
+"""
+Per-request measurements.
+
+``InstrumentationMiddleware`` starts a ``RequestMetrics`` for the current
+thread; the hooks below add to it while the request runs:
+- a database execute wrapper counts queries, their time and their SQL;
+- ``Serializer.data`` / ``ListSerializer.data`` time the outermost
+  serialization (including any queries it triggers);
+- Django cache backends count hits and misses of ``get`` / ``get_many``;
+- ``external_call`` / ``TimedHttp`` time calls to outside services.
+Outside a measured request every hook is a pass-through.
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+_state = threading.local()
+_MISSING = object()
+# Statements kept per request for the slow request log
+MAX_SQL = 500
+
+
+@dataclass
+class RequestMetrics:
+    queries: int = 0
+    db_ms: float = 0.0
+    serializer_ms: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    # service -> [calls, ms]
+    external: dict = field(default_factory=lambda: defaultdict(lambda: [0, 0.0]))
+    # (ms, sql) in execution order, parameters left out
+    sql: list = field(default_factory=list)
+    _busy: set = field(default_factory=set)
+
+    @contextmanager
+    def _outermost(self, kind):
+        """Yields True unless a ``kind`` measurement is already running (nested calls)"""
+        if kind in self._busy:
+            yield False
+            return
+        self._busy.add(kind)
+        try:
+            yield True
+        finally:
+            self._busy.discard(kind)
+
+
+def current():
+    """Metrics of the request being measured on this thread, or None"""
+    return getattr(_state, 'metrics', None)
+
+
+def start():
+    _state.metrics = RequestMetrics()
+    return _state.metrics
+
+
+def stop():
+    metrics = current()
+    _state.metrics = None
+    return metrics
+
+
+def query_timer(execute, sql, params, many, context):
+    """``connection.execute_wrapper`` hook"""
+    metrics = current()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        metrics.queries += 1
+        metrics.db_ms += elapsed
+        if len(metrics.sql) < MAX_SQL:
+            metrics.sql.append((elapsed, sql))
+
+
+@contextmanager
+def external_call(service):
+    """Time a call to an outside service (``'drive'``, ``'llm'``, ...)"""
+    metrics = current()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry = metrics.external[service]
+        entry[0] += 1
+        entry[1] += (time.perf_counter() - started) * 1000
+
+
+class TimedHttp:
+    """
+    Wraps an httplib2-style client (what googleapiclient's ``build(http=...)``
+    takes) so every HTTP round trip, including media chunks and batches, is
+    recorded as an external call to ``service``.
+    """
+
+    def __init__(self, http, service):
+        self._http = http
+        self._service = service
+
+    def request(self, *args, **kwargs):
+        with external_call(self._service):
+            return self._http.request(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._http, name)
+
+
+def _timed_data(prop):
+    def data(self):
+        metrics = current()
+        if metrics is None:
+            return prop.fget(self)
+        with metrics._outermost('serializer') as outermost:
+            if not outermost:
+                return prop.fget(self)
+            started = time.perf_counter()
+            try:
+                return prop.fget(self)
+            finally:
+                metrics.serializer_ms += (time.perf_counter() - started) * 1000
+    data.__wrapped__ = prop
+    return property(data)
+
+
+def _instrument_cache(backend):
+    if getattr(backend, '_instrumented', False):
+        return backend
+    get, get_many = backend.get, backend.get_many
+
+    def timed_get(key, default=None, version=None):
+        metrics = current()
+        if metrics is None or 'cache' in metrics._busy:
+            return get(key, default, version)
+        value = get(key, _MISSING, version)
+        if value is _MISSING:
+            metrics.cache_misses += 1
+            return default
+        metrics.cache_hits += 1
+        return value
+
+    def timed_get_many(keys, version=None):
+        metrics = current()
+        if metrics is None:
+            return get_many(keys, version)
+        keys = list(keys)
+        # Backends without a native get_many fall back to get(); count those once
+        with metrics._outermost('cache'):
+            values = get_many(keys, version)
+        metrics.cache_hits += len(values)
+        metrics.cache_misses += len(keys) - len(values)
+        return values
+
+    backend.get, backend.get_many = timed_get, timed_get_many
+    backend._instrumented = True
+    return backend
+
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def install():
+    """Add the serializer and cache hooks (once per process)"""
+    global _installed
+    from django.core.cache import CacheHandler, caches
+    from rest_framework import serializers
+
+    with _install_lock:
+        if _installed:
+            return
+        for cls in (serializers.Serializer, serializers.ListSerializer):
+            cls.data = _timed_data(cls.__dict__['data'])
+
+        create_connection = CacheHandler.create_connection
+
+        def instrumented_connection(self, alias):
+            return _instrument_cache(create_connection(self, alias))
+
+        CacheHandler.create_connection = instrumented_connection
+        for backend in caches.all(initialized_only=True):
+            _instrument_cache(backend)
+        _installed = True
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import ProfileDownloadView, ProfileListView
+
+urlpatterns = [
+    path('profiles/', ProfileListView.as_view(), name='instrumentation-profiles'),
+    path('profiles/<str:name>/', ProfileDownloadView.as_view(), name='instrumentation-profile-download'),
+]
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from rest_framework import status, views
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from . import metrics as metrics_store, profiling
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint. Not routed by nginx, so it is reached on the
+    backend port; with INSTRUMENTATION_METRICS_TOKEN set it also needs
+    ``Authorization: Bearer <token>``.
+    """
+    if not settings.INSTRUMENTATION_ENABLED:
+        raise Http404
+    token = settings.INSTRUMENTATION_METRICS_TOKEN
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    body = metrics_store.render(metrics_store.get_store().snapshot())
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class ProfileListView(views.APIView):
+    """Stored request profiles, newest first (staff only)"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        store = profiling.storage()
+        return Response([
+            {'name': name, 'size': store.size(name), 'url': request.build_absolute_uri(f'{name}/')}
+            for name in profiling.list_profiles(store)
+        ])
+
+
+class ProfileDownloadView(views.APIView):
+    """Download one stored profile (staff only)"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, name):
+        store = profiling.storage()
+        if not profiling.NAME_RE.match(name) or not store.exists(name):
+            return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(store.open(name, 'rb'), as_attachment=True, filename=name)
@@ -0,0 +1,16 @@
+from django.utils.functional import SimpleLazyObject
+from .tenancy import resolve_tenant
+
+
+class TenantContextMiddleware:
+    """
+    Attaches a lazy ``request.tenant``. It is evaluated on first access, which for
+    API views happens after DRF authentication has set ``request.user``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.tenant = SimpleLazyObject(lambda: resolve_tenant(request.user))
+        return self.get_response(request)
@@ -13,8 +13,16 @@ class UUIDModel(models.Model):
     class Meta:
         abstract = True
 
+class CompanyQuerySet(models.QuerySet):
+    def for_company(self, company_id):
+        return self.filter(company_id=company_id)
+
+    def for_tenant(self, tenant):
+        return self.for_company(tenant.company_id) if tenant else self.none()
+
 class CompanyOwnedModel(TimeStampedModel):
     company = models.ForeignKey('organization.Company', on_delete=models.CASCADE, related_name='%(class)s_items')
+    objects = CompanyQuerySet.as_manager()
     class Meta:
         abstract = True
 
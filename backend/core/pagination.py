@@ -1,6 +1,257 @@
-from rest_framework.pagination import PageNumberPagination
+"""
+List pagination.
+
+``StandardResultsSetPagination`` is the page-number default. Every page runs
+``COUNT(*)`` and ``OFFSET``, so cost grows with the table and the page number.
+
+``KeysetPagination`` pages by position instead: the cursor holds the ordering
+values of the last row seen and the next page is
+``WHERE (ordering) after (cursor) ORDER BY ... LIMIT n+1``, one index range
+scan whatever the depth. The ordering is the queryset's (``?ordering=``, the
+view's ``ordering`` or the model's ``Meta.ordering``) plus ``id`` as the tie
+breaker. No count is run unless ``?include_count=true``; small tables then get
+an exact count cached for ``count_cache_timeout`` seconds, large ones (by
+``pg_class.reltuples``) the planner's row estimate.
+
+``PageOrKeysetPagination`` keeps page numbers for existing clients and switches
+to keyset pages when the request carries ``cursor`` (empty for the first page).
+"""
+import base64
+import hashlib
+import json
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connection
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
 
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
+
+
+def table_estimate(model):
+    """Row count of the model's table from the planner statistics (-1 before the first ANALYZE)"""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+        row = cursor.fetchone()
+    return int(row[0]) if row else -1
+
+
+def estimated_count(queryset):
+    """Planner estimate of the rows ``queryset`` returns, without running it"""
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(BasePagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'include_count'
+    # Tables up to this many rows (reltuples) get an exact, cached count; larger ones an estimate
+    exact_count_limit = 100_000
+    count_cache_timeout = 60
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        self.ordering = self.get_ordering(queryset)
+        values, self.reverse = self.decode_cursor(request)
+        self.has_cursor = values is not None
+
+        self.count = self.count_is_estimate = None
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes'):
+            self.count, self.count_is_estimate = self.get_count(queryset)
+
+        ordering = [(name, not descending) for name, descending in self.ordering] if self.reverse else self.ordering
+        queryset = queryset.order_by(*[f'-{name}' if descending else name for name, descending in ordering])
+        if values is not None:
+            queryset = queryset.filter(self.after(ordering, values))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.has_cursor
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(size, self.max_page_size) if size > 0 else self.page_size
+
+    def get_ordering(self, queryset):
+        """[(field path, descending)] from the queryset's ordering, ending with the primary key"""
+        model = queryset.model
+        ordering = [o for o in (queryset.query.order_by or model._meta.ordering) if isinstance(o, str)]
+        pk_name = model._meta.pk.name
+        result = []
+        for item in ordering:
+            descending = item.startswith('-')
+            name = item.lstrip('-')
+            name = pk_name if name == 'pk' else name
+            if name == '?':
+                continue
+            result.append((name, descending))
+            if name == pk_name:
+                return result
+        # Unique tie breaker in the direction of the leading column
+        result.append((pk_name, result[0][1] if result else True))
+        return result
+
+    def _field(self, model, name):
+        field = None
+        for part in name.split(LOOKUP_SEP):
+            field = model._meta.get_field(part)
+            model = field.related_model or model
+        return field.target_field if field.is_relation else field
+
+    def _value(self, obj, name):
+        for part in name.split(LOOKUP_SEP):
+            if obj is None:
+                return None
+            obj = getattr(obj, part)
+        return getattr(obj, 'pk', obj)
+
+    def encode_cursor(self, obj, reverse):
+        values = []
+        for name, _ in self.ordering:
+            value = self._value(obj, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        payload = json.dumps({'v': values, 'r': reverse}, separators=(',', ':'), default=str)
+        url = replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param,
+                                  base64.urlsafe_b64encode(payload.encode()).decode().rstrip('='))
+        return remove_query_param(url, 'page')
+
+    def decode_cursor(self, request):
+        """(ordering values, reverse) from the cursor parameter; (None, False) for the first page"""
+        raw = request.query_params.get(self.cursor_query_param)
+        if not raw:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(raw + '=' * (-len(raw) % 4)))
+            values = payload['v']
+            if len(values) != len(self.ordering):
+                raise ValueError
+            values = [
+                None if value is None else self._field(self.model, name).to_python(value)
+                for (name, _), value in zip(self.ordering, values)
+            ]
+            return values, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError, FieldDoesNotExist):
+            raise NotFound(self.invalid_cursor_message)
+
+    def after(self, ordering, values):
+        """
+        Rows strictly after ``values`` in ``ordering``, expanded as
+        ``a > x OR (a = x AND b > y) OR ...``. NULLs sort as Postgres does:
+        last when ascending, first when descending.
+        """
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, descending), value in zip(ordering, values):
+            if value is None:
+                # NULLs sort first descending, so every non-NULL follows; ascending nothing but NULLs does
+                step = Q(**{f'{name}__isnull': False}) if descending else Q(pk__in=[])
+                same = Q(**{f'{name}__isnull': True})
+            else:
+                step = Q(**{f'{name}__lt' if descending else f'{name}__gt': value})
+                if not descending:
+                    step |= Q(**{f'{name}__isnull': True})
+                same = Q(**{name: value})
+            condition |= equal & step
+            equal &= same
+        return condition
+
+    def get_count(self, queryset):
+        """(row count, whether it is an estimate)"""
+        if table_estimate(queryset.model) > self.exact_count_limit:
+            return estimated_count(queryset), True
+        sql, params = queryset.order_by().query.sql_with_params()
+        key = 'pagination:count:' + hashlib.md5(f'{sql}{params}'.encode()).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = queryset.order_by().count()
+            cache.set(key, count, self.count_cache_timeout)
+        return count, False
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], True)
+
+    def get_paginated_response(self, data):
+        body = {'next': self.get_next_link(), 'previous': self.get_previous_link()}
+        if self.count is not None:
+            body['count'] = self.count
+            body['count_is_estimate'] = self.count_is_estimate
+        body['results'] = data
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer'},
+                'count_is_estimate': {'type': 'boolean'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {'name': self.cursor_query_param, 'required': False, 'in': 'query',
+             'description': 'Cursor from the previous response; empty for the first page.', 'schema': {'type': 'string'}},
+            {'name': self.page_size_query_param, 'required': False, 'in': 'query',
+             'description': 'Number of results per page.', 'schema': {'type': 'integer'}},
+            {'name': self.count_query_param, 'required': False, 'in': 'query',
+             'description': 'Add the total (exact or estimated) to the response.', 'schema': {'type': 'boolean'}},
+        ]
+
+
+class PageOrKeysetPagination(StandardResultsSetPagination):
+    """Page numbers by default; keyset pages when the request carries ``cursor``"""
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        page_params = super().get_schema_operation_parameters(view)
+        names = {param['name'] for param in page_params}
+        return page_params + [
+            param for param in self.keyset_class().get_schema_operation_parameters(view) if param['name'] not in names
+        ]
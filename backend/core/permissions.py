@@ -1,14 +1,28 @@
 from rest_framework import permissions
+from .tenancy import get_tenant
 
 class IsCompanyMember(permissions.BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated and hasattr(request.user, 'active_company')
+        return request.user.is_authenticated and bool(get_tenant(request))
 
 class HasModulePermission(permissions.BasePermission):
     def has_permission(self, request, view):
         if not request.user.is_authenticated:
             return False
         module = getattr(view, 'module_name', None)
-        action_map = {'GET': 'view', 'POST': 'create', 'PUT': 'edit', 'DELETE': 'delete'}
+        if not module:
+            return True
+        action_map = {'GET': 'view', 'POST': 'create', 'PUT': 'edit', 'PATCH': 'edit', 'DELETE': 'delete'}
         action = action_map.get(request.method, 'view')
-        return request.user.has_module_permission(module, action) if module else True
+        return get_module_permissions(request).allows(module, action)
+
+
+def get_module_permissions(request):
+    """Compiled permission set of the requesting user in the active company."""
+    from apps.accounts.services.rbac import get_permissions
+    return get_permissions(request.user, get_tenant(request).company_id)
+
+
+def get_module_actions(request, module):
+    """All actions the requesting user may perform on ``module``, e.g. ``{'view', 'edit'}``."""
+    return get_module_permissions(request).module_actions(module)
@@ -0,0 +1,234 @@
+"""
+Synthetic multi-tenant data for performance tests and load tests.
+
+``seed_tenants`` creates a group with ``companies`` companies, an owner per
+company and, for each, rows in every module sized by ``scale`` (1.0 is about
+a thousand customers and a couple of thousand invoices, tasks and files per
+company). Rows are written with ``bulk_create`` and a fixed random seed, so
+two runs with the same arguments produce the same shape of data. Signal
+driven side tables (search and quick switch indexes, dashboard snapshots) are
+rebuilt once at the end instead of per row.
+"""
+import datetime
+import random
+from dataclasses import dataclass, field
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+# rows per company at scale 1.0
+COUNTS = {
+    'customers': 1000, 'contacts': 500, 'notes': 500, 'leads': 300, 'lead_activities': 300,
+    'domains': 600, 'hostings': 200, 'credentials': 100, 'mail_accounts': 50,
+    'invoices': 2000, 'incomes': 1000, 'expenses': 200, 'projects': 100, 'tasks': 1000, 'time_entries': 2000,
+    'seo_packages': 50, 'seo_keywords': 500, 'seo_reports': 100, 'seo_tasks': 100,
+    'folders': 50, 'files': 2000, 'file_shares': 100, 'audit_logs': 2000,
+}
+DEFAULT_PASSWORD = 'password123'
+BATCH_SIZE = 1000
+
+
+@dataclass
+class SeededCompany:
+    company: object
+    owner: object
+    counts: dict = field(default_factory=dict)
+
+
+def _n(name, scale):
+    return max(1, int(COUNTS[name] * scale))
+
+
+def _choice(rng, model, field_name):
+    return rng.choice([value for value, _label in model._meta.get_field(field_name).choices])
+
+
+def _bulk(model, rows):
+    return model.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+
+
+def seed_company(company, owner, scale=1.0, rng=None):
+    """Fill ``company`` with ``scale`` times ``COUNTS`` rows; returns the per-model row counts"""
+    from apps.audit.models import AuditLog
+    from apps.customers.models import Customer, CustomerContact, CustomerNote
+    from apps.domains.models import Domain, Hosting
+    from apps.files.models import File, FileShare, Folder
+    from apps.finance.models import BankAccount, Expense, Income, Invoice
+    from apps.leads.models import Lead, LeadActivity
+    from apps.projects.models import BoardColumn, Project
+    from apps.seo.models import SEOKeyword, SEOPackage, SEOReport, SEOTask
+    from apps.tasks.models import Task, TaskTag, TimeEntry
+    from apps.vault.encryption import encrypt_password
+    from apps.vault.models import Credential, MailAccount
+
+    rng = rng or random.Random(company.pk)
+    today = timezone.localdate()
+    now = timezone.now()
+    days = lambda low, high: datetime.timedelta(days=rng.randint(low, high))
+    owned = {'company': company, 'created_by': owner}
+
+    customers = _bulk(Customer, [
+        Customer(**owned, company_name=f'{rng.choice(["Anadolu", "Ege", "Marmara", "Öztürk", "İstanbul"])} {i} Ltd',
+                 contact_person=f'Contact {i}', email=f'customer{i}@example.com', phone=f'555{i:07d}')
+        for i in range(_n('customers', scale))
+    ])
+    _bulk(CustomerContact, [
+        CustomerContact(**owned, customer=rng.choice(customers), name=f'Person {i}', email=f'person{i}@example.com')
+        for i in range(_n('contacts', scale))
+    ])
+    _bulk(CustomerNote, [
+        CustomerNote(**owned, customer=rng.choice(customers), content=f'Note {i}', contact_date=now - days(0, 365))
+        for i in range(_n('notes', scale))
+    ])
+    leads = _bulk(Lead, [
+        Lead(**owned, company_name=f'Lead {i}', contact_person=f'Lead Contact {i}', phone=f'544{i:07d}')
+        for i in range(_n('leads', scale))
+    ])
+    _bulk(LeadActivity, [
+        LeadActivity(**owned, lead=rng.choice(leads), activity_type=_choice(rng, LeadActivity, 'activity_type'),
+                     description=f'Activity {i}', contact_date=now - days(0, 180))
+        for i in range(_n('lead_activities', scale))
+    ])
+    _bulk(Domain, [
+        Domain(**owned, customer=rng.choice(customers), domain_name=f'site{i}-{company.pk}.com', registrar='Registrar',
+               register_date=today - days(30, 900), expire_date=today + days(-30, 365))
+        for i in range(_n('domains', scale))
+    ])
+    _bulk(Hosting, [
+        Hosting(**owned, customer=rng.choice(customers), provider='Provider', plan_name=f'Plan {i % 5}',
+                start_date=today - days(30, 600), expire_date=today + days(-30, 365), monthly_cost=rng.randint(5, 50))
+        for i in range(_n('hostings', scale))
+    ])
+    secret = encrypt_password('secret')
+    _bulk(Credential, [
+        Credential(**owned, customer=rng.choice(customers), credential_type=_choice(rng, Credential, 'credential_type'),
+                   title=f'Login {i}', username=f'user{i}', password_encrypted=secret)
+        for i in range(_n('credentials', scale))
+    ])
+    _bulk(MailAccount, [
+        MailAccount(**owned, customer=rng.choice(customers), email=f'mail{i}@example.com', password_encrypted=secret,
+                    smtp_server='smtp.example.com')
+        for i in range(_n('mail_accounts', scale))
+    ])
+
+    account = BankAccount.objects.create(**owned, bank_name='Bank', account_name='Main', iban=f'TR{company.pk:024d}')
+    invoices = _bulk(Invoice, [
+        Invoice(**owned, customer=rng.choice(customers), invoice_no=f'INV-{company.pk}-{i:06d}',
+                amount=(amount := rng.randint(100, 10000)), total_amount=amount + amount // 5,
+                issue_date=(issued := today - days(0, 720)), due_date=issued + days(7, 45),
+                status=_choice(rng, Invoice, 'status'))
+        for i in range(_n('invoices', scale))
+    ])
+    _bulk(Income, [
+        Income(**owned, customer=invoice.customer, invoice=invoice, bank_account=account, amount=invoice.total_amount,
+               payment_method=_choice(rng, Income, 'payment_method'), received_date=invoice.due_date)
+        for invoice in rng.sample(invoices, min(len(invoices), _n('incomes', scale)))
+    ])
+    _bulk(Expense, [
+        Expense(**owned, category=_choice(rng, Expense, 'category'), title=f'Expense {i}', amount=rng.randint(10, 5000),
+                period_type=_choice(rng, Expense, 'period_type'), start_date=today - days(0, 720))
+        for i in range(_n('expenses', scale))
+    ])
+
+    _bulk(BoardColumn, [
+        BoardColumn(**owned, name=name, sort_order=i) for i, name in enumerate(['Todo', 'Doing', 'Review', 'Done'])
+    ])
+    projects = _bulk(Project, [
+        Project(**owned, customer=rng.choice(customers), name=f'Project {i}', status=_choice(rng, Project, 'status'))
+        for i in range(_n('projects', scale))
+    ])
+    tasks = _bulk(Task, [
+        Task(**owned, project=rng.choice(projects), title=f'Task {i}', assigned_to=owner, sort_order=i,
+             status=_choice(rng, Task, 'status'), priority=_choice(rng, Task, 'priority'), due_date=today + days(-30, 60))
+        for i in range(_n('tasks', scale))
+    ])
+    _bulk(Task, [
+        Task(**owned, project=parent.project, parent=parent, title=f'{parent.title} / step')
+        for parent in rng.sample(tasks, len(tasks) // 3)
+    ])
+    _bulk(TaskTag, [TaskTag(**owned, name=f'Tag {i}') for i in range(10)])
+    _bulk(TimeEntry, [
+        TimeEntry(**owned, task=rng.choice(tasks), user=owner, started_at=now - days(0, 180),
+                  duration_minutes=rng.randint(5, 240), is_billable=rng.random() < 0.7)
+        for _ in range(_n('time_entries', scale))
+    ])
+
+    packages = _bulk(SEOPackage, [
+        SEOPackage(**owned, customer=rng.choice(customers), start_date=today - days(0, 365), monthly_fee=rng.randint(100, 1000))
+        for _ in range(_n('seo_packages', scale))
+    ])
+    _bulk(SEOKeyword, [
+        SEOKeyword(**owned, package=rng.choice(packages), keyword=f'keyword {i}', current_position=rng.randint(1, 100))
+        for i in range(_n('seo_keywords', scale))
+    ])
+    # One report per package and day: draw distinct (package, day) slots
+    slots = rng.sample(range(len(packages) * 366), min(_n('seo_reports', scale), len(packages) * 366))
+    _bulk(SEOReport, [
+        SEOReport(**owned, package=packages[slot % len(packages)], report_date=today - datetime.timedelta(days=slot // len(packages)),
+                  organic_traffic=rng.randint(0, 10000))
+        for slot in slots
+    ])
+    _bulk(SEOTask, [
+        SEOTask(**owned, package=rng.choice(packages), task_type=_choice(rng, SEOTask, 'task_type'), title=f'SEO task {i}',
+                assigned_to=owner)
+        for i in range(_n('seo_tasks', scale))
+    ])
+
+    # Folders go through save() for their materialized path
+    folders = []
+    for i in range(_n('folders', scale)):
+        parent = rng.choice(folders) if folders and rng.random() < 0.6 else None
+        folders.append(Folder.objects.create(**owned, name=f'Folder {i}', parent=parent))
+    files = _bulk(File, [
+        File(**owned, folder=rng.choice(folders + [None]), name=f'document-{i}.pdf', original_name=f'document-{i}.pdf',
+             mime_type='application/pdf', size=rng.randint(1_000, 5_000_000))
+        for i in range(_n('files', scale))
+    ])
+    _bulk(FileShare, [
+        FileShare(**owned, file=file_obj, shared_with=owner) for file_obj in rng.sample(files, min(len(files), _n('file_shares', scale)))
+    ])
+
+    _bulk(AuditLog, [
+        AuditLog(company=company, user=owner, action=_choice(rng, AuditLog, 'action'), module=rng.choice(['customers', 'finance', 'tasks']),
+                 record_type='Customer', record_id=rng.choice(customers).pk, ip_address='127.0.0.1')
+        for _ in range(_n('audit_logs', scale))
+    ])
+    return {name: _n(name, scale) for name in COUNTS}
+
+
+def rebuild_side_tables(company_ids):
+    """Search and quick switch indexes and dashboard snapshots for bulk-created rows"""
+    from django.apps import apps
+    from apps.dashboard.services import snapshot
+    from apps.search.services import index, quickswitch
+    for kind, (label, _related, _builder) in index.SOURCES.items():
+        index.reindex(kind, apps.get_model(label)._base_manager.filter(company_id__in=company_ids))
+    for kind in quickswitch.SOURCES:
+        quickswitch.rebuild(kind)
+    for company_id in company_ids:
+        snapshot.rebuild(company_id)
+
+
+def seed_tenants(companies=2, scale=1.0, prefix='perf', password=DEFAULT_PASSWORD, seed=0):
+    """
+    A group of ``companies`` companies, each with an owner
+    (``<prefix>-owner-<n>@example.com``) and ``seed_company`` data.
+    Returns a list of ``SeededCompany``.
+    """
+    from apps.accounts.models import Role, UserCompany
+    from apps.organization.models import Company, Group
+
+    rng = random.Random(seed)
+    seeded = []
+    with transaction.atomic():
+        group = Group.objects.create(name=f'{prefix} group', slug=f'{prefix}-group')
+        for n in range(companies):
+            company = Company.objects.create(group=group, name=f'{prefix} company {n}', slug=f'{prefix}-company-{n}')
+            owner = get_user_model().objects.create_user(
+                email=f'{prefix}-owner-{n}@example.com', password=password, first_name='Owner', last_name=str(n)
+            )
+            role = Role.objects.create(company=company, name='Admin')
+            UserCompany.objects.create(user=owner, company=company, role=role, is_owner=True, is_default=True)
+            seeded.append(SeededCompany(company, owner, seed_company(company, owner, scale, rng)))
+        rebuild_side_tables([entry.company.pk for entry in seeded])
+    return seeded
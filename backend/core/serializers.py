@@ -0,0 +1,79 @@
+"""
+Serializer-declared eager loading.
+
+A serializer knows which related rows and computed values its fields read;
+``setup_eager_loading`` turns that into one queryset so a page costs the same
+number of queries whatever its size:
+
+* dotted ``source``s over forward relations (``customer.company_name``) and
+  nested single serializers become ``select_related``;
+* many-valued nested serializers and related fields become ``prefetch_related``;
+* ``select_related_fields`` / ``prefetch_related_fields`` / ``annotations``
+  declared on the serializer are added as is. Annotations are expressions
+  keyed by attribute name; use ``core.aggregates.related_count``/``related_sum``
+  so several of them never multiply each other's rows.
+
+``CompanyScopedViewSet`` applies it to the querysets it serializes.
+"""
+from functools import lru_cache
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField
+
+
+def _forward_path(model, source):
+    """Longest prefix of a dotted source that follows forward FK/one-to-one fields, as a lookup"""
+    path = []
+    for part in source.split('.'):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            break
+        if not (field.concrete and field.is_relation and (field.many_to_one or field.one_to_one)):
+            break
+        path.append(part)
+        model = field.related_model
+    return '__'.join(path)
+
+
+@lru_cache(maxsize=None)
+def eager_loading(serializer_class):
+    """(select_related, prefetch_related, annotations) needed by ``serializer_class``"""
+    select = set(getattr(serializer_class, 'select_related_fields', ()))
+    prefetch = set(getattr(serializer_class, 'prefetch_related_fields', ()))
+    annotations = dict(getattr(serializer_class, 'annotations', {}))
+    model = getattr(getattr(serializer_class, 'Meta', None), 'model', None)
+    if model is None:
+        return (), (), {}
+
+    for field in serializer_class().fields.values():
+        if field.source == '*' or not field.source:
+            continue
+        if isinstance(field, (serializers.ListSerializer, ManyRelatedField)):
+            if '.' not in field.source:
+                prefetch.add(field.source)
+            continue
+        if isinstance(field, serializers.BaseSerializer):
+            # Nested object: the relation itself
+            source = field.source
+        elif '.' in field.source:
+            # Attribute of a related object: the relation it is read from
+            source = field.source.rsplit('.', 1)[0]
+        else:
+            continue
+        path = _forward_path(model, source)
+        if path:
+            select.add(path)
+    return tuple(sorted(select)), tuple(sorted(prefetch)), annotations
+
+
+def setup_eager_loading(serializer_class, queryset):
+    """``queryset`` with everything ``serializer_class`` reads loaded up front"""
+    select, prefetch, annotations = eager_loading(serializer_class)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if annotations:
+        queryset = queryset.annotate(**annotations)
+    return queryset
@@ -0,0 +1,8 @@
+from celery import shared_task
+from . import counters
+
+
+@shared_task
+def flush_counters():
+    """Write buffered counter increments to the database."""
+    return counters.flush()
@@ -0,0 +1,44 @@
+class TenantContext:
+    """Active company membership of a user, resolved once and reused for the whole request."""
+
+    def __init__(self, user=None, membership=None):
+        self.user = user
+        self.membership = membership
+        self.company = membership.company if membership else None
+        self.company_id = membership.company_id if membership else None
+        self.role = membership.role if membership else None
+        self.is_owner = bool(membership and membership.is_owner)
+
+    def __bool__(self):
+        return self.company_id is not None
+
+    def __repr__(self):
+        return f'<TenantContext user={getattr(self.user, "pk", None)} company={self.company_id}>'
+
+
+def resolve_tenant(user):
+    """Return the user's TenantContext, memoized on the user instance."""
+    if user is None or not user.is_authenticated:
+        return TenantContext(user)
+    context = getattr(user, '_tenant_context', None)
+    if context is None:
+        from apps.accounts.models import UserCompany
+        membership = UserCompany.objects.select_related('company', 'role').filter(
+            user=user, is_default=True
+        ).first()
+        context = TenantContext(user, membership)
+        user._tenant_context = context
+    return context
+
+
+def clear_tenant(user):
+    """Drop the memoized context, e.g. after the active company is switched."""
+    if user is not None and hasattr(user, '_tenant_context'):
+        del user._tenant_context
+
+
+def get_tenant(request):
+    tenant = getattr(request, 'tenant', None)
+    if tenant is None:
+        return resolve_tenant(getattr(request, 'user', None))
+    return tenant
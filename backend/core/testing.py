@@ -0,0 +1,52 @@
+"""
+Test helpers.
+
+``QueryCountTestCase`` checks that an endpoint's query count does not depend on
+how many rows it returns: the count is taken with one row and again with
+several, and the two must match. An extra query per row (a serializer reading a
+relation or counting children) makes the second count grow.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class QueryCountTestCase(APITestCase):
+    rows = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        from apps.accounts.models import Role, UserCompany
+        from apps.organization.models import Company, Group
+        group = Group.objects.create(name='Test Group', slug='test-group')
+        cls.company = Company.objects.create(group=group, name='Test Company')
+        cls.user = get_user_model().objects.create_user(email='owner@example.com', password='x', first_name='Test')
+        role = Role.objects.create(company=cls.company, name='Owner')
+        UserCompany.objects.create(user=cls.user, company=cls.company, role=role, is_owner=True, is_default=True)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content[:200])
+        return len(ctx.captured_queries)
+
+    def assertConstantQueries(self, url, make_row):
+        """
+        ``make_row(i)`` creates the i-th row ``url`` lists (and anything it reads).
+        Asserts one row and ``rows`` rows take the same number of queries.
+        """
+        make_row(0)
+        self.count_queries(url)  # warm per-user caches (tenant, permissions)
+        single = self.count_queries(url)
+        for i in range(1, self.rows):
+            make_row(i)
+        many = self.count_queries(url)
+        self.assertEqual(single, many, f'{url}: {single} queries for 1 row, {many} for {self.rows}')
@@ -0,0 +1,15 @@
+import unicodedata
+
+# Turkish dotted/dotless I and the other Turkish letters map to their ASCII base
+# before lowercasing, so "İSTANBUL", "istanbul" and "ıstanbul" compare equal
+TURKISH_FOLD = str.maketrans({
+    'İ': 'i', 'I': 'i', 'ı': 'i', 'Ş': 's', 'ş': 's', 'Ğ': 'g', 'ğ': 'g',
+    'Ç': 'c', 'ç': 'c', 'Ö': 'o', 'ö': 'o', 'Ü': 'u', 'ü': 'u',
+})
+
+
+def fold(value):
+    """Case- and accent-insensitive form of ``value`` for search keys, with whitespace collapsed."""
+    text = str(value or '').translate(TURKISH_FOLD)
+    text = ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+    return ' '.join(text.lower().split())
@@ -0,0 +1,61 @@
+from rest_framework import viewsets, permissions
+from .exceptions import CompanyRequiredException
+from .serializers import setup_eager_loading
+
+
+class CompanyScopedViewSet(viewsets.ModelViewSet):
+    """
+    ModelViewSet for CompanyOwnedModel subclasses.
+
+    Tenant filtering is always the single indexed predicate ``company_id = <active company>``
+    and eager loading is declared once through ``select_related_fields`` /
+    ``prefetch_related_fields``. Subclasses add annotations or extra static filters in
+    ``get_base_queryset`` and request-dependent filters in ``get_queryset``.
+
+    For ``eager_loading_actions`` the serializer's own needs (related objects its
+    fields read, declared annotations; see ``core.serializers``) are loaded too, so
+    list and detail responses take a fixed number of queries. Custom actions that
+    serialize rows call ``eager_load`` themselves; summaries keep the bare queryset.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    select_related_fields = ()
+    prefetch_related_fields = ()
+    superuser_sees_all = True
+    eager_loading_actions = ('list', 'retrieve', 'update', 'partial_update')
+
+    def get_base_queryset(self):
+        queryset = self.queryset.all()
+        if self.select_related_fields:
+            queryset = queryset.select_related(*self.select_related_fields)
+        if self.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*self.prefetch_related_fields)
+        return queryset
+
+    def eager_load(self, queryset, serializer_class=None):
+        return setup_eager_loading(serializer_class or self.get_serializer_class(), queryset)
+
+    def get_queryset(self):
+        queryset = self.get_base_queryset()
+        if getattr(self, 'action', None) in self.eager_loading_actions:
+            queryset = self.eager_load(queryset)
+        if self.superuser_sees_all and self.request.user.is_superuser:
+            return queryset
+        return queryset.for_tenant(self.request.tenant)
+
+    @classmethod
+    def get_company_queryset(cls, company_id):
+        """Default list query of ``company_id`` built without a request, for benchmarks and EXPLAIN checks."""
+        view = cls()
+        view.action = 'list'
+        queryset = view.eager_load(view.get_base_queryset()).for_company(company_id)
+        ordering = getattr(cls, 'ordering', None) or queryset.model._meta.ordering
+        return queryset.order_by(*ordering) if ordering else queryset
+
+    def get_create_kwargs(self):
+        tenant = self.request.tenant
+        if not tenant:
+            raise CompanyRequiredException()
+        return {'company': tenant.company, 'created_by': self.request.user}
+
+    def perform_create(self, serializer):
+        serializer.save(**self.get_create_kwargs())
@@ -0,0 +1,20 @@
+"""
+Synthetic load for the REST API.
+
+Virtual users log in through ``/api/v1/auth/login/`` and then loop over
+weighted scenarios that mirror what the frontend does (``scenarios.py``),
+against a running server. The runner reports per-endpoint RPS and
+p50/p95/p99 latency. It only uses the standard library, so it can run
+from any machine that reaches the server.
+
+Against the production image with the compose Postgres and Redis:
+
+    docker compose -f docker/docker-compose.yml up -d db redis
+    cd backend
+    python manage.py migrate
+    python scripts/create_test_data.py --scale 5
+    gunicorn --bind 0.0.0.0:8000 --workers 2 --threads 4 config.wsgi:application
+    python -m loadtest --users 20 --duration 60 --json loadtest-results.json
+
+or ``make loadtest-data`` and ``make loadtest`` from the repository root.
+"""
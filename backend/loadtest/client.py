@@ -0,0 +1,98 @@
+"""
+HTTP session of one virtual user.
+
+Each session keeps one keep-alive connection, like a browser tab, and records
+every request's latency under a step name into the shared ``Stats``.
+"""
+import http.client
+import json
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+
+@dataclass
+class Result:
+    status: int
+    body: bytes
+    elapsed_ms: float
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 400
+
+    def json(self):
+        try:
+            return json.loads(self.body or b'null')
+        except ValueError:
+            return None
+
+
+class Session:
+    def __init__(self, base_url, stats, email, password, timeout=30):
+        parts = urlsplit(base_url)
+        self.scheme, self.netloc = parts.scheme or 'http', parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.stats = stats
+        self.email, self.password = email, password
+        self.timeout = timeout
+        self.token = None
+        self.etags = {}
+        self._connection = None
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        return connection_class(self.netloc, timeout=self.timeout)
+
+    def request(self, method, path, name=None, body=None, revalidate=False):
+        """Send one request and record it as ``name`` (default: method and path without the query)"""
+        name = name or f'{method} {path.split("?")[0]}'
+        headers = {'Accept': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        if body is not None:
+            body = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        if revalidate and path in self.etags:
+            headers['If-None-Match'] = self.etags[path]
+
+        start = time.perf_counter()
+        for attempt in (1, 2):
+            try:
+                if self._connection is None:
+                    self._connection = self._connect()
+                self._connection.request(method, self.prefix + path, body=body, headers=headers)
+                response = self._connection.getresponse()
+                data = response.read()
+                break
+            except (OSError, http.client.HTTPException) as e:
+                # The server may close an idle keep-alive connection; retry once on a fresh one
+                self.close()
+                if attempt == 2:
+                    elapsed = (time.perf_counter() - start) * 1000
+                    self.stats.record(name, 0, elapsed, error=type(e).__name__)
+                    return Result(0, b'', elapsed)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        if revalidate and response.getheader('ETag'):
+            self.etags[path] = response.getheader('ETag')
+        result = Result(response.status, data, elapsed)
+        self.stats.record(name, response.status, elapsed, error=None if result.ok else f'HTTP {response.status}')
+        return result
+
+    def get(self, path, name=None, revalidate=False):
+        return self.request('GET', path, name=name, revalidate=revalidate)
+
+    def post(self, path, body, name=None):
+        return self.request('POST', path, name=name, body=body)
+
+    def login(self):
+        result = self.post('/api/v1/auth/login/', {'email': self.email, 'password': self.password})
+        data = result.json() if result.ok else None
+        self.token = data.get('access') if data else None
+        return self.token is not None
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,86 @@
+"""
+Command line entry point: starts ``--users`` virtual users, each signing in
+once and then running weighted scenarios with think time in between, for
+``--duration`` seconds, and prints p50/p95/p99 latency and throughput per
+endpoint.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from .client import Session
+from .scenarios import SCENARIOS
+from .stats import Stats, format_table
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m loadtest', description='Synthetic load against a running API')
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--email', default='test@example.com')
+    parser.add_argument('--password', default='password123')
+    parser.add_argument('--users', type=int, default=10, help='concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=60, help='seconds of load after ramp-up starts')
+    parser.add_argument('--ramp-up', type=float, default=10, help='seconds over which users are started')
+    parser.add_argument('--think-time', type=float, default=1.0, help='mean pause between scenarios, in seconds')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='run only these scenarios (repeatable); default: all, by weight')
+    parser.add_argument('--json', metavar='PATH', help='also write the summary to PATH')
+    parser.add_argument('--seed', type=int, default=None, help='random seed for reproducible scenario mixes')
+    return parser.parse_args(argv)
+
+
+def virtual_user(number, args, stats, deadline, rng, delay):
+    time.sleep(delay)
+    session = Session(args.base_url, stats, args.email, args.password)
+    names = args.scenario or sorted(SCENARIOS)
+    weights = [SCENARIOS[name][0] for name in names]
+    try:
+        if not session.login():
+            print(f'user {number}: login failed, stopping', file=sys.stderr)
+            return
+        while time.monotonic() < deadline:
+            name = rng.choices(names, weights)[0]
+            SCENARIOS[name][1](session, rng)
+            # Exponential think time, so users do not march in lockstep
+            if args.think_time > 0:
+                time.sleep(max(0, min(rng.expovariate(1 / args.think_time), deadline - time.monotonic())))
+    finally:
+        session.close()
+
+
+def run(args):
+    stats = Stats()
+    master = random.Random(args.seed)
+    start = time.monotonic()
+    deadline = start + args.duration
+    threads = []
+    for number in range(args.users):
+        delay = args.ramp_up * number / args.users
+        rng = random.Random(master.random())
+        thread = threading.Thread(target=virtual_user, args=(number, args, stats, deadline, rng, delay), daemon=True)
+        threads.append(thread)
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats, time.monotonic() - start
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f'{args.users} users against {args.base_url} for {args.duration:g}s '
+          f'(ramp-up {args.ramp_up:g}s, think time {args.think_time:g}s)', file=sys.stderr)
+    stats, elapsed = run(args)
+    rows = stats.summary(elapsed)
+    print(format_table(rows))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'base_url': args.base_url,
+                'users': args.users,
+                'duration_s': round(elapsed, 2),
+                'scenarios': args.scenario or sorted(SCENARIOS),
+                'endpoints': rows,
+            }, f, indent=2)
+    return 1 if rows['TOTAL']['requests'] == 0 or rows['TOTAL']['errors'] else 0
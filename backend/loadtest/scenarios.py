@@ -0,0 +1,95 @@
+"""
+User flows, each a function of (session, rng) that issues the requests one
+screen of the frontend makes. ``SCENARIOS`` maps a name to (weight, flow);
+virtual users pick flows in proportion to their weights.
+"""
+from urllib.parse import quote
+
+# Words the seeder (core.seeding) puts into customer names
+SEARCH_TERMS = ['anadolu', 'ege', 'marmara', 'ozturk', 'istanbul']
+
+
+def _results(result):
+    data = result.json() if result.ok else None
+    if isinstance(data, dict):
+        return data.get('results', [])
+    return data if isinstance(data, list) else []
+
+
+def login(session, rng):
+    """A fresh sign-in: token and profile"""
+    session.login()
+    session.get('/api/v1/auth/me/')
+
+
+def dashboard(session, rng):
+    """Dashboard page: snapshot and the module summary cards"""
+    session.get('/api/v1/dashboard/')
+    for path in ('/api/v1/finance/invoices/summary/', '/api/v1/finance/incomes/summary/',
+                 '/api/v1/finance/expenses/summary/', '/api/v1/domains/list/summary/',
+                 '/api/v1/projects/list/summary/', '/api/v1/seo/packages/summary/'):
+        session.get(path)
+
+
+def customers(session, rng):
+    """Customer list, a search, one customer, and quick switcher typeahead"""
+    rows = _results(session.get('/api/v1/customers/list/'))
+    term = rng.choice(SEARCH_TERMS)
+    session.get(f'/api/v1/customers/list/?search={quote(term)}', name='GET /api/v1/customers/list/?search')
+    if rows:
+        session.get(f'/api/v1/customers/list/{rng.choice(rows)["id"]}/', name='GET /api/v1/customers/list/{id}/')
+    for length in range(2, 5):
+        session.get(f'/api/v1/search/quick/?q={quote(term[:length])}', name='GET /api/v1/search/quick/')
+    session.get(f'/api/v1/search/?q={quote(term)}', name='GET /api/v1/search/')
+
+
+def kanban(session, rng):
+    """Task and lead boards"""
+    session.get('/api/v1/tasks/list/kanban/')
+    session.get('/api/v1/tasks/list/my_tasks/')
+    session.get('/api/v1/leads/list/kanban/')
+
+
+def files(session, rng):
+    """File manager: folder tree (revalidated by ETag, as the browser does) and a folder's files"""
+    tree = session.get('/api/v1/files/folders/tree/', revalidate=True)
+    data = tree.json() if tree.status == 200 else None
+    if data:
+        session.folder_ids = _folder_ids(data)
+    folder_ids = getattr(session, 'folder_ids', None)
+    folder = rng.choice(folder_ids) if folder_ids else 'root'
+    session.get(f'/api/v1/files/list/?folder={folder}', name='GET /api/v1/files/list/?folder')
+
+
+def _folder_ids(tree):
+    nodes = tree if isinstance(tree, list) else tree.get('folders') or tree.get('results') or []
+    ids, stack = [], list(nodes)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict) and 'id' in node:
+            ids.append(node['id'])
+            stack.extend(node.get('children') or [])
+    return ids
+
+
+def finance(session, rng):
+    """Invoice and income lists, scrolled with keyset cursors"""
+    page = session.get('/api/v1/finance/invoices/?cursor=', name='GET /api/v1/finance/invoices/?cursor')
+    for _ in range(2):
+        data = page.json() if page.ok else None
+        next_url = data.get('next') if isinstance(data, dict) else None
+        if not next_url:
+            break
+        path = next_url[next_url.index('/api/'):]
+        page = session.get(path, name='GET /api/v1/finance/invoices/?cursor')
+    session.get('/api/v1/finance/incomes/')
+
+
+SCENARIOS = {
+    'login': (1, login),
+    'dashboard': (4, dashboard),
+    'customers': (4, customers),
+    'kanban': (3, kanban),
+    'files': (3, files),
+    'finance': (2, finance),
+}
@@ -0,0 +1,64 @@
+"""Per-endpoint latency samples and the summary printed at the end of a run."""
+import threading
+from collections import Counter, defaultdict
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(Counter)
+        self.statuses = defaultdict(Counter)
+
+    def record(self, name, status, elapsed_ms, error=None):
+        with self._lock:
+            self.latencies[name].append(elapsed_ms)
+            self.statuses[name][status] += 1
+            if error:
+                self.errors[name][error] += 1
+
+    def summary(self, duration):
+        """{name: figures} for every endpoint plus a ``TOTAL`` row"""
+        with self._lock:
+            names = sorted(self.latencies)
+            rows = {name: self._figures(self.latencies[name], self.errors[name], duration) for name in names}
+            every = [value for name in names for value in self.latencies[name]]
+            errors = sum((self.errors[name] for name in names), Counter())
+        rows['TOTAL'] = self._figures(every, errors, duration)
+        return rows
+
+    @staticmethod
+    def _figures(latencies, errors, duration):
+        values = sorted(latencies)
+        return {
+            'requests': len(values),
+            'errors': sum(errors.values()),
+            'error_kinds': dict(errors),
+            'rps': round(len(values) / duration, 2) if duration else 0.0,
+            'p50_ms': round(percentile(values, 50), 1),
+            'p95_ms': round(percentile(values, 95), 1),
+            'p99_ms': round(percentile(values, 99), 1),
+            'max_ms': round(values[-1], 1) if values else 0.0,
+        }
+
+
+def format_table(rows):
+    width = max(len(name) for name in rows)
+    header = f'{"endpoint":<{width}}  {"reqs":>7} {"errors":>6} {"rps":>8} {"p50":>8} {"p95":>8} {"p99":>8} {"max":>8}'
+    lines = [header, '-' * len(header)]
+    for name, row in rows.items():
+        if name == 'TOTAL':
+            lines.append('-' * len(header))
+        lines.append(
+            f'{name:<{width}}  {row["requests"]:>7} {row["errors"]:>6} {row["rps"]:>8.2f} '
+            f'{row["p50_ms"]:>8.1f} {row["p95_ms"]:>8.1f} {row["p99_ms"]:>8.1f} {row["max_ms"]:>8.1f}'
+        )
+    return '\n'.join(lines)
@@ -1,9 +1,11 @@
+import argparse
 import os
 import django
 import sys
 
 # Setup Django environment
 sys.path.append('/app')
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
 django.setup()
 
@@ -13,7 +15,7 @@ from apps.accounts.models import UserCompany, Role
 
 User = get_user_model()
 
-def create_data():
+def create_data(scale=0):
     print("Creating test data...")
     
     # 1. Create User
@@ -71,5 +73,32 @@ def create_data():
     )
     print("User assigned to Subsidiary")
 
+    # 8. Bulk rows for load testing (python -m loadtest)
+    if scale > 0:
+        seed_companies(user, [main_company, sub_company], scale)
+
+
+def seed_companies(user, companies, scale):
+    from django.db import transaction
+    from core.seeding import rebuild_side_tables, seed_company
+    from apps.customers.models import Customer
+
+    seeded = []
+    for company in companies:
+        if Customer.objects.filter(company=company).exists():
+            print(f"{company.name} already has data, not seeding")
+            continue
+        with transaction.atomic():
+            counts = seed_company(company, user, scale=scale)
+        seeded.append(company.pk)
+        print(f"{company.name} seeded: " + ", ".join(f"{name}={count}" for name, count in counts.items()))
+    if seeded:
+        rebuild_side_tables(seeded)
+        print("Search indexes and dashboard snapshots rebuilt")
+
+
 if __name__ == "__main__":
-    create_data()
+    parser = argparse.ArgumentParser(description="Create the test user and companies")
+    parser.add_argument('--scale', type=float, default=0,
+                        help="also bulk-create scale x core.seeding.COUNTS rows per company (0: none)")
+    create_data(parser.parse_args().scale)
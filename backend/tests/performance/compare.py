@@ -0,0 +1,53 @@
+"""
+Compare two performance suite results.
+
+    python tests/performance/compare.py baseline.json perf-results.json [--slower 1.5]
+
+Prints every endpoint whose query count changed or whose median time moved
+by more than the ``--slower`` factor, and exits with 1 when any endpoint
+runs more queries than in the baseline.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare two performance suite JSON results.')
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--slower', type=float, default=1.5, help='median time ratio reported as a slowdown')
+    args = parser.parse_args(argv)
+
+    baseline, current = load(args.baseline), load(args.current)
+    print(f"baseline {baseline.get('commit') or '?'} (scale {baseline.get('scale')}) -> "
+          f"current {current.get('commit') or '?'} (scale {current.get('scale')})")
+
+    regressions = 0
+    for name in sorted(set(baseline['endpoints']) | set(current['endpoints'])):
+        old, new = baseline['endpoints'].get(name), current['endpoints'].get(name)
+        if old is None or new is None:
+            print(f"{'added' if old is None else 'removed':>10}  {name}")
+            continue
+        notes = []
+        if new['queries'] != old['queries']:
+            notes.append(f"queries {old['queries']} -> {new['queries']}")
+            regressions += new['queries'] > old['queries']
+        old_ms, new_ms = old['time_ms']['median'], new['time_ms']['median']
+        if old_ms and (new_ms / old_ms >= args.slower or old_ms / max(new_ms, 0.01) >= args.slower):
+            notes.append(f'median {old_ms:.1f} -> {new_ms:.1f} ms')
+        if notes:
+            print(f"{'':>10}  {name}: {', '.join(notes)}")
+
+    if regressions:
+        print(f'{regressions} endpoint(s) run more queries than the baseline')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Performance suite fixtures.
+
+The suite seeds its data once per session with ``core.seeding.seed_tenants``
+and removes it at the end. It is configured through the environment:
+
+* ``PERF_SCALE``: seed size per company; 1.0 is about 1000 customers and
+  2000 invoices, tasks and files. The default is 0.2.
+* ``PERF_COMPANIES``: number of seeded companies. The default is 2.
+* ``PERF_REPEAT``: timed requests per endpoint. The default is 3.
+* ``PERF_OUTPUT``: where the JSON results are written. The default is
+  ``perf-results.json``.
+
+    pytest tests/performance
+    python tests/performance/compare.py baseline.json perf-results.json
+"""
+import datetime
+import json
+import os
+import subprocess
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework.test import APIClient
+from core.seeding import seed_tenants
+from core.testing import LOCAL_CACHE
+
+SCALE = float(os.environ.get('PERF_SCALE', '0.2'))
+COMPANIES = int(os.environ.get('PERF_COMPANIES', '2'))
+REPEAT = int(os.environ.get('PERF_REPEAT', '3'))
+OUTPUT = os.environ.get('PERF_OUTPUT', 'perf-results.json')
+PREFIX = 'perf'
+
+
+def pytest_collection_modifyitems(items):
+    for item in items:
+        if 'tests/performance' in str(item.fspath).replace(os.sep, '/'):
+            item.add_marker(pytest.mark.performance)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@pytest.fixture(scope='session')
+def perf_tenants(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock(), override_settings(CACHES=LOCAL_CACHE):
+        tenants = seed_tenants(companies=COMPANIES, scale=SCALE, prefix=PREFIX)
+    yield tenants
+    with django_db_blocker.unblock():
+        for tenant in tenants:
+            tenant.company.delete()
+        tenants[0].company.group.delete()
+        get_user_model().objects.filter(email__startswith=f'{PREFIX}-owner-').delete()
+
+
+@pytest.fixture
+def perf_client(perf_tenants, django_db_blocker):
+    """Client of the first company's owner; the seeded data is visible without a per-test transaction"""
+    client = APIClient()
+    client.force_authenticate(perf_tenants[0].owner)
+    with django_db_blocker.unblock(), override_settings(CACHES=LOCAL_CACHE):
+        yield client
+
+
+@pytest.fixture(scope='session')
+def perf_results():
+    results = {}
+    yield results
+    report = {
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'commit': _git_commit(),
+        'scale': SCALE,
+        'companies': COMPANIES,
+        'repeat': REPEAT,
+        'endpoints': dict(sorted(results.items())),
+    }
+    with open(OUTPUT, 'w') as handle:
+        json.dump(report, handle, indent=2)
@@ -0,0 +1,114 @@
+"""
+GET endpoints of the API, discovered from the URLconf.
+
+Every router route (list, detail and extra actions) and every plain API view
+under ``/api/v1/`` that answers GET is returned, except the ones in ``SKIP``.
+Detail routes are filled with a row of the seeded company.
+"""
+import re
+from dataclasses import dataclass
+from django.urls import get_resolver
+from rest_framework.viewsets import ViewSetMixin
+from core.viewsets import CompanyScopedViewSet
+
+API_PREFIX = '/api/v1/'
+PARAM_RE = re.compile(r'\(\?P<(\w+)>[^)]*\)|<(?:\w+:)?(\w+)>')
+LOOKUP_RE = re.compile(r'\{(\w+)\}')
+
+# action or route prefix -> why it is not measured here
+SKIP = {
+    'reveal_password': 'decrypts a secret and writes an audit trail',
+    'download': 'streams stored file content; seeded files have none',
+    'thumbnail': 'serves generated derivatives; seeded files have none',
+    'drive_files': 'calls the Google Drive API',
+    'drive_status': 'calls the Google Drive API',
+    '/api/v1/files/oauth/': 'Google OAuth flow',
+    '/api/v1/instrumentation/': 'staff-only diagnostics',
+}
+
+# route -> query string the endpoint needs to do real work
+QUERY_PARAMS = {
+    '/api/v1/search/': 'q=anadolu',
+    '/api/v1/search/quick/': 'q=ana',
+}
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    route: str
+    view: type
+    action: str
+
+    @property
+    def name(self):
+        return f'GET {self.route}'
+
+    @property
+    def is_list(self):
+        return self.action == 'list'
+
+    @property
+    def lookup(self):
+        match = LOOKUP_RE.search(self.route)
+        return match and match.group(1)
+
+
+def _walk(patterns, prefix=''):
+    for pattern in patterns:
+        if hasattr(pattern, 'url_patterns'):
+            yield from _walk(pattern.url_patterns, prefix + str(pattern.pattern))
+        else:
+            yield prefix + str(pattern.pattern), pattern.callback
+
+
+def _route(raw):
+    route = '/' + raw.replace('^', '').replace('$', '')
+    return PARAM_RE.sub(lambda m: '{%s}' % (m.group(1) or m.group(2)), route)
+
+
+def iter_endpoints():
+    seen = set()
+    for raw, callback in _walk(get_resolver().url_patterns):
+        view = getattr(callback, 'cls', None)
+        if view is None or 'format' in raw:
+            continue
+        route = _route(raw)
+        if not route.startswith(API_PREFIX) or route in seen:
+            continue
+        if issubclass(view, ViewSetMixin):
+            action = (getattr(callback, 'actions', None) or {}).get('get')
+        else:
+            action = 'get' if hasattr(view, 'get') else None
+        if action is None or action in SKIP or any(route.startswith(prefix) for prefix in SKIP if prefix.startswith('/')):
+            continue
+        seen.add(route)
+        yield Endpoint(route, view, action)
+
+
+def lookup_object(endpoint, company):
+    """A row of ``company`` the detail route can show, or None"""
+    from apps.organization.models import Company, Group
+    view = endpoint.view
+    if issubclass(view, CompanyScopedViewSet):
+        return view.get_company_queryset(company.pk).first()
+    model = view.queryset.model
+    if model is Company:
+        return company
+    if model is Group:
+        return company.group
+    if any(field.name == 'company' for field in model._meta.fields):
+        return model._base_manager.filter(company=company).order_by('pk').first()
+    return model._base_manager.order_by('pk').first()
+
+
+def build_url(endpoint, company, **params):
+    """URL of ``endpoint`` for ``company``; None when a detail route has no row to show"""
+    url = endpoint.route
+    if endpoint.lookup:
+        obj = lookup_object(endpoint, company)
+        if obj is None:
+            return None
+        url = url.replace('{%s}' % endpoint.lookup, str(getattr(obj, getattr(endpoint.view, 'lookup_field', 'pk'))))
+    query = [QUERY_PARAMS[endpoint.route]] if endpoint.route in QUERY_PARAMS else []
+    query += [f'{key}={value}' for key, value in params.items()]
+    return f'{url}?{"&".join(query)}' if query else url
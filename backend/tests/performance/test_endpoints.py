@@ -0,0 +1,72 @@
+"""
+Query count, latency and response size of every GET endpoint.
+
+Each endpoint is requested once to warm per-user caches, then ``PERF_REPEAT``
+times under measurement. The test fails when:
+- it answers with an error status;
+- it runs more queries than its budget;
+- a list endpoint runs more queries for a big page than for a one-row page,
+  meaning a query per row.
+Wall times are recorded in the JSON results for comparison between releases,
+not asserted, because they depend on the machine.
+"""
+import statistics
+import time
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from .conftest import REPEAT
+from .endpoints import build_url, iter_endpoints
+
+DEFAULT_BUDGET = 6
+# route -> query budget where the default does not fit, with the reason as a comment
+BUDGETS = {}
+SMALL_PAGE, LARGE_PAGE = 1, 50
+
+ENDPOINTS = list(iter_endpoints())
+
+
+def measure(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        response = client.get(url)
+        elapsed = time.perf_counter() - start
+    return response, len(ctx.captured_queries), elapsed * 1000
+
+
+@pytest.mark.parametrize('endpoint', ENDPOINTS, ids=[endpoint.name for endpoint in ENDPOINTS])
+def test_endpoint(endpoint, perf_client, perf_tenants, perf_results):
+    company = perf_tenants[0].company
+    url = build_url(endpoint, company)
+    if url is None:
+        pytest.skip('no seeded row for the detail route')
+
+    perf_client.get(url)
+    timings, queries = [], []
+    for _ in range(max(REPEAT, 1)):
+        response, count, elapsed = measure(perf_client, url)
+        assert response.status_code < 400, f'{url}: {response.status_code} {response.content[:300]!r}'
+        timings.append(elapsed)
+        queries.append(count)
+
+    result = {
+        'url': url,
+        'view': f'{endpoint.view.__module__}.{endpoint.view.__name__}',
+        'action': endpoint.action,
+        'status': response.status_code,
+        'queries': max(queries),
+        'time_ms': {'min': round(min(timings), 2), 'median': round(statistics.median(timings), 2), 'max': round(max(timings), 2)},
+        'bytes': len(response.content),
+    }
+
+    if endpoint.is_list and response.status_code == 200 and 'results' in response.data:
+        _, small, _ = measure(perf_client, build_url(endpoint, company, page_size=SMALL_PAGE))
+        large_response, large, _ = measure(perf_client, build_url(endpoint, company, page_size=LARGE_PAGE))
+        result['page_queries'] = {str(SMALL_PAGE): small, str(LARGE_PAGE): large}
+        result['page_rows'] = len(large_response.data['results'])
+    perf_results[endpoint.name] = result
+
+    budget = BUDGETS.get(endpoint.route, DEFAULT_BUDGET)
+    assert result['queries'] <= budget, f'{url}: {result["queries"]} queries, budget {budget}'
+    if 'page_queries' in result:
+        assert small == large, f'{url}: {small} queries for {SMALL_PAGE} row(s), {large} for {result["page_rows"]}'
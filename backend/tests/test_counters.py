@@ -0,0 +1,62 @@
+from unittest import mock
+from urllib.parse import urlsplit
+import redis
+from django.conf import settings
+from django.test import override_settings
+from core import counters
+from core.testing import QueryCountTestCase
+from apps.files.models import File
+
+# A database of its own, so the test never flushes buffered counts of a running instance
+REDIS_URL = urlsplit(settings.REDIS_URL)._replace(path='/15').geturl()
+
+
+def redis_available():
+    try:
+        return redis.Redis.from_url(REDIS_URL, socket_connect_timeout=0.5).ping()
+    except redis.RedisError:
+        return False
+
+
+class CounterTests(QueryCountTestCase):
+    def setUp(self):
+        super().setUp()
+        self.file = File.objects.create(company=self.company, name='f', original_name='f', mime_type='text/plain')
+        patcher = mock.patch.object(counters, '_client', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def download_count(self):
+        return File.objects.values_list('download_count', flat=True).get(pk=self.file.pk)
+
+    def test_direct_increment_leaves_updated_at(self):
+        updated_at = self.file.updated_at
+        counters.increment(self.file, 'download_count')
+        counters.increment_many(File, [self.file.pk], 'download_count', 2)
+        self.assertEqual((self.file.download_count, self.download_count()), (1, 3))
+        self.assertEqual(File.objects.get(pk=self.file.pk).updated_at, updated_at)
+
+    @override_settings(COUNTER_BUFFER=True, REDIS_URL='redis://127.0.0.1:1/0')
+    def test_unreachable_buffer_writes_directly(self):
+        with self.assertLogs('core.counters', 'WARNING'):
+            counters.increment(self.file, 'download_count')
+        self.assertEqual(self.download_count(), 1)
+
+    @override_settings(COUNTER_BUFFER=True, REDIS_URL=REDIS_URL)
+    def test_buffered_increments_flush(self):
+        if not redis_available():
+            self.skipTest('Redis is not reachable')
+        client = counters._redis()
+        client.flushdb()
+        self.addCleanup(client.flushdb)
+        other = File.objects.create(company=self.company, name='g', original_name='g', mime_type='text/plain')
+
+        counters.increment(self.file, 'download_count')
+        counters.increment(self.file, 'download_count')
+        counters.increment_many(File, [self.file.pk, other.pk], 'download_count')
+        self.assertEqual(self.download_count(), 0)
+
+        self.assertEqual(counters.flush(), 2)
+        self.assertEqual(self.download_count(), 3)
+        self.assertEqual(File.objects.get(pk=other.pk).download_count, 1)
+        self.assertEqual(counters.flush(), 0)
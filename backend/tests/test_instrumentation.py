@@ -0,0 +1,137 @@
+import tempfile
+import threading
+from unittest import mock
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from core.instrumentation import external_call, metrics, profiling, recorder
+from core.instrumentation.middleware import InstrumentationMiddleware
+from core.testing import LOCAL_CACHE, QueryCountTestCase
+
+ENABLED = dict(
+    INSTRUMENTATION_ENABLED=True,
+    INSTRUMENTATION_METRICS_STORE='local',
+    INSTRUMENTATION_METRICS_TOKEN='',
+    INSTRUMENTATION_SLOW_REQUEST_MS=60_000,
+    INSTRUMENTATION_PROFILE_SAMPLE_RATE=0.0,
+)
+
+
+class RecorderTests(SimpleTestCase):
+    @override_settings(CACHES=LOCAL_CACHE)
+    def test_cache_and_external_calls(self):
+        recorder.install()
+        metrics = recorder.start()
+        try:
+            cache.get('instrumentation-test')
+            cache.set('instrumentation-test', 1)
+            self.assertEqual(cache.get('instrumentation-test'), 1)
+            cache.get_many(['instrumentation-test', 'instrumentation-missing'])
+            with external_call('llm'):
+                pass
+        finally:
+            recorder.stop()
+            cache.delete('instrumentation-test')
+        self.assertEqual((metrics.cache_hits, metrics.cache_misses), (2, 2))
+        self.assertEqual(metrics.external['llm'][0], 1)
+
+    def test_render(self):
+        request = recorder.RequestMetrics(queries=3, db_ms=12.0)
+        store = metrics.LocalStore()
+        store.add(metrics.increments_for('apps.x.views.XViewSet', 'list', 'GET', 200, 0.2, request))
+        text = metrics.render(store.snapshot())
+        self.assertIn('crm_db_queries_total{view="apps.x.views.XViewSet",action="list"} 3', text)
+        self.assertIn('crm_http_request_duration_seconds_bucket{view="apps.x.views.XViewSet",action="list",le="0.1"} 0', text)
+        self.assertIn('le="0.25"} 1', text)
+
+
+@override_settings(**ENABLED)
+class MiddlewareTests(QueryCountTestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.get_store().clear()
+
+    def test_metrics_per_view_and_action(self):
+        response = self.client.get('/api/v1/customers/list/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+        text = self.client.get('/metrics').content.decode()
+        self.assertIn(
+            'crm_http_requests_total{view="apps.customers.views.CustomerViewSet",action="list",method="GET",status="200"} 1',
+            text,
+        )
+        queries = [line for line in text.splitlines() if line.startswith('crm_db_queries_total{view="apps.customers')]
+        self.assertTrue(queries and int(queries[0].rsplit(' ', 1)[1]) > 0)
+
+    def test_slow_request_logged_with_sql(self):
+        with self.settings(INSTRUMENTATION_SLOW_REQUEST_MS=0), self.assertLogs('core.instrumentation', 'WARNING') as logs:
+            self.client.get('/api/v1/customers/list/')
+        self.assertIn('CustomerViewSet.list', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    def test_metrics_token(self):
+        with self.settings(INSTRUMENTATION_METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
+
+    def test_sampled_profile_download(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                self.settings(INSTRUMENTATION_PROFILE_SAMPLE_RATE=1.0, INSTRUMENTATION_PROFILE_DIR=directory):
+            self.client.get('/api/v1/customers/list/')
+            self.assertEqual(self.client.get('/api/v1/instrumentation/profiles/').status_code, 403)
+
+            self.user.is_staff = True
+            self.user.save(update_fields=['is_staff'])
+            profiles = self.client.get('/api/v1/instrumentation/profiles/').data
+            self.assertTrue(profiles[-1]['name'].endswith('.prof'))
+            response = self.client.get(f'/api/v1/instrumentation/profiles/{profiles[-1]["name"]}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(b''.join(response.streaming_content))
+
+
+@override_settings(**{**ENABLED, 'INSTRUMENTATION_PROFILE_SAMPLE_RATE': 1.0})
+class ConcurrentProfilingTests(SimpleTestCase):
+    def run_requests(self, count, view):
+        middleware = InstrumentationMiddleware(view)
+        statuses, errors = [], []
+
+        def request():
+            try:
+                statuses.append(middleware(RequestFactory().get('/profiled/')).status_code)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=request) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return statuses, errors
+
+    def test_overlapping_samples(self):
+        # Both requests are inside the view, profiler started, before either returns
+        barrier = threading.Barrier(2)
+
+        def view(request):
+            barrier.wait(timeout=5)
+            return HttpResponse('ok')
+
+        with tempfile.TemporaryDirectory() as directory, self.settings(INSTRUMENTATION_PROFILE_DIR=directory):
+            statuses, errors = self.run_requests(2, view)
+            self.assertEqual((statuses, errors), ([200, 200], []))
+            self.assertEqual(len(profiling.list_profiles()), 1)
+
+    def test_profiler_already_active(self):
+        with tempfile.TemporaryDirectory() as directory, self.settings(INSTRUMENTATION_PROFILE_DIR=directory), \
+                mock.patch.object(profiling.cProfile.Profile, 'enable', side_effect=ValueError('Another profiling tool is already active')):
+            statuses, errors = self.run_requests(1, lambda request: HttpResponse('ok'))
+            self.assertEqual((statuses, errors), ([200], []))
+            self.assertEqual(profiling.list_profiles(), [])
+        self.assertFalse(profiling._lock.locked())
+
+
+class DisabledTests(SimpleTestCase):
+    @override_settings(INSTRUMENTATION_ENABLED=False)
+    def test_metrics_not_found(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
@@ -0,0 +1,66 @@
+import datetime
+from urllib.parse import parse_qs, urlsplit
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from core.pagination import KeysetPagination
+from core.testing import QueryCountTestCase
+from apps.tasks.models import Task, TimeEntry
+
+DAY = datetime.date(2026, 1, 1)
+# Repeated dates and NULLs so pages split inside groups of equal values
+DUE_DATES = [None, DAY, DAY, None, DAY.replace(day=2), DAY.replace(day=3), DAY, None, DAY.replace(day=2), None, DAY]
+
+
+def cursor_of(link):
+    return parse_qs(urlsplit(link).query)['cursor'][0]
+
+
+class KeysetPaginationTests(QueryCountTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Task.objects.bulk_create([
+            Task(company=cls.company, title=f'Task {i}', due_date=due_date) for i, due_date in enumerate(DUE_DATES)
+        ])
+
+    def page(self, ordering, cursor=''):
+        """(ids, next link, previous link) of one three-row page"""
+        request = Request(APIRequestFactory().get('/tasks/', {'cursor': cursor, 'page_size': 3}))
+        paginator = KeysetPagination()
+        rows = paginator.paginate_queryset(Task.objects.order_by(ordering), request)
+        return [row.pk for row in rows], paginator.get_next_link(), paginator.get_previous_link()
+
+    def walk(self, ordering, cursor='', link=1):
+        """Pages from ``cursor`` on, following next (1) or previous (2) links; also returns the last page"""
+        pages = []
+        while True:
+            page = self.page(ordering, cursor)
+            pages.append(page[0])
+            if page[link] is None:
+                return pages, page
+            cursor = cursor_of(page[link])
+
+    def test_pages_over_nullable_column(self):
+        for ordering, expected in (('due_date', ('due_date', 'id')), ('-due_date', ('-due_date', '-id'))):
+            with self.subTest(ordering=ordering):
+                pages, _last = self.walk(ordering)
+                self.assertEqual([len(page) for page in pages], [3, 3, 3, 2])
+                self.assertEqual([pk for page in pages for pk in page], list(Task.objects.order_by(*expected).values_list('pk', flat=True)))
+
+    def test_previous_links_retrace_pages(self):
+        for ordering in ('due_date', '-due_date'):
+            with self.subTest(ordering=ordering):
+                forward, last = self.walk(ordering)
+                backward, first = self.walk(ordering, cursor_of(last[2]), link=2)
+                self.assertEqual(backward, forward[-2::-1])
+                self.assertIsNotNone(first[1])
+
+    def test_invalid_cursor(self):
+        # Not base64 JSON, and a cursor with fewer values than the ordering
+        for cursor in ('not-a-cursor', 'eyJ2IjpbMV19'):
+            with self.subTest(cursor=cursor), self.assertRaises(NotFound):
+                self.page('due_date', cursor)
+        TimeEntry.objects.create(company=self.company, task=Task.objects.first(), user=self.user, started_at=timezone.now(), duration_minutes=1)
+        self.assertEqual(self.client.get('/api/v1/tasks/time-entries/?cursor=not-a-cursor').status_code, 404)
@@ -5,6 +5,10 @@ source venv/bin/activate
 echo "Running migrations..."
 python manage.py migrate
 
+echo "Building search indexes..."
+python manage.py rebuild_search_index --missing
+python manage.py rebuild_quick_switch_index --missing
+
 echo "Creating permissions..."
 python manage.py shell << END
 from apps.accounts.models import Permission